@@ -1,14 +1,22 @@
+import heapq
 import logging
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
-from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
 from app.models.schemas import (
     GeoEvent, GeoEventResponse, EventSource, EventType,
     SearchQuery, RelationshipResult, FeedStatus
 )
 from app.scheduler import get_event_store, get_feed_statuses, register_ws, unregister_ws, run_ingestors
 from app.services.vector_store import vector_store
+from app.services.aircraft_store import aircraft_store
+from app.services.track_store import track_store
 from app.services.embeddings import embedding_service
+from app.services.entity_extractor import ner_service
+from app.services.http_client import http_client
+from app.services.geocoder import geocoder
+from app.services.gazetteer import gazetteer
+from app.services.readiness import readiness
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -24,47 +32,163 @@ async def get_events(
     max_lat: Optional[float] = None,
     min_lon: Optional[float] = None,
     max_lon: Optional[float] = None,
+    lat: Optional[float] = Query(default=None, ge=-90, le=90),
+    lon: Optional[float] = Query(default=None, ge=-180, le=180),
+    radius_km: Optional[float] = Query(default=None, gt=0),
     since: Optional[str] = None,
+    cursor: Optional[str] = None,
 ):
-    """Get events with optional filters."""
-    filtered = get_event_store()
-    if source:
-        filtered = [e for e in filtered if e.source == source]
-    if event_type:
-        filtered = [e for e in filtered if e.event_type == event_type]
-    if min_lat is not None:
-        filtered = [e for e in filtered if e.lat and e.lat >= min_lat]
-    if max_lat is not None:
-        filtered = [e for e in filtered if e.lat and e.lat <= max_lat]
-    if min_lon is not None:
-        filtered = [e for e in filtered if e.lon and e.lon >= min_lon]
-    if max_lon is not None:
-        filtered = [e for e in filtered if e.lon and e.lon <= max_lon]
+    """Get events with optional filters, newest first.
+
+    `min_lon` > `max_lon` selects a box crossing the antimeridian; `lat`,
+    `lon` and `radius_km` together select events within a radius. Pass a
+    returned `next_cursor`/`prev_cursor` as `cursor` to page older/newer
+    events; `offset` is only honoured without a cursor.
+    """
+    since_dt = None
     if since:
         try:
             since_dt = datetime.fromisoformat(since)
-            filtered = [e for e in filtered if e.timestamp >= since_dt]
         except ValueError:
             pass
-
-    total = len(filtered)
-    filtered = filtered[offset:offset + limit]
+    try:
+        page = get_event_store().page(
+            limit=limit,
+            cursor=cursor,
+            offset=offset,
+            sources=[source] if source else None,
+            event_types=[event_type] if event_type else None,
+            min_lat=min_lat,
+            max_lat=max_lat,
+            min_lon=min_lon,
+            max_lon=max_lon,
+            near=(lat, lon, radius_km) if lat is not None and lon is not None and radius_km else None,
+            since=since_dt,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     sources_active = list(set(s.source.value for s in get_feed_statuses().values() if s.event_count > 0))
     sources_unavailable = list(set(s.source.value for s in get_feed_statuses().values() if not s.configured or s.error))
 
     return GeoEventResponse(
-        events=filtered,
-        total=total,
+        events=page.events,
+        total=page.total,
         sources_active=sources_active,
-        sources_unavailable=sources_unavailable
+        sources_unavailable=sources_unavailable,
+        next_cursor=page.next_cursor,
+        prev_cursor=page.prev_cursor,
+    )
+
+
+@router.get("/events/nearest")
+async def get_nearest_events(
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+    k: int = Query(default=10, ge=1, le=500),
+    source: Optional[EventSource] = None,
+    event_type: Optional[EventType] = None,
+):
+    """The k events closest to a point, with great-circle distances."""
+    nearest = get_event_store().nearest(
+        lat,
+        lon,
+        k,
+        sources=[source] if source else None,
+        event_types=[event_type] if event_type else None,
+    )
+    return {
+        "lat": lat,
+        "lon": lon,
+        "results": [{"event": event, "distance_km": round(distance, 3)} for event, distance in nearest],
+    }
+
+
+@router.get("/aircraft")
+async def get_aircraft(
+    limit: int = Query(default=5000, le=50000),
+    min_lat: Optional[float] = None,
+    max_lat: Optional[float] = None,
+    min_lon: Optional[float] = None,
+    max_lon: Optional[float] = None,
+    include_ground: bool = False,
+    at: Optional[float] = None,
+):
+    """Latest aircraft positions from the columnar store, as parallel arrays.
+
+    With `at` (epoch seconds), positions are dead-reckoned to that time.
+    """
+    return aircraft_store.query(
+        limit=limit,
+        at=at,
+        min_lat=min_lat,
+        max_lat=max_lat,
+        min_lon=min_lon,
+        max_lon=max_lon,
+        include_ground=include_ground,
     )
 
 
+@router.get("/aircraft/positions")
+async def get_aircraft_positions(
+    at: Optional[float] = None,
+    limit: int = Query(default=50000, le=50000),
+    min_lat: Optional[float] = None,
+    max_lat: Optional[float] = None,
+    min_lon: Optional[float] = None,
+    max_lon: Optional[float] = None,
+    include_ground: bool = False,
+):
+    """Compact aircraft positions dead-reckoned to `at` (default: now)."""
+    return aircraft_store.positions(
+        at=at,
+        limit=limit,
+        min_lat=min_lat,
+        max_lat=max_lat,
+        min_lon=min_lon,
+        max_lon=max_lon,
+        include_ground=include_ground,
+    )
+
+
+@router.get("/tracks")
+async def get_tracks(
+    limit: int = Query(default=1000, le=10000),
+    min_lat: Optional[float] = None,
+    max_lat: Optional[float] = None,
+    min_lon: Optional[float] = None,
+    max_lon: Optional[float] = None,
+    since: Optional[float] = None,
+):
+    """Aircraft trails as GeoJSON LineStrings, for tracks whose latest fix is in the bbox."""
+    return track_store.query(
+        min_lat=min_lat,
+        max_lat=max_lat,
+        min_lon=min_lon,
+        max_lon=max_lon,
+        since=since,
+        limit=limit,
+    )
+
+
+@router.get("/tracks/{icao24}")
+async def get_track(icao24: str, since: Optional[float] = None):
+    """Position history of one aircraft, oldest fix first."""
+    track = track_store.track(icao24, since)
+    if track is None:
+        return {"error": "Track not found", "icao24": icao24}
+    return track
+
+
 @router.post("/search")
 async def search_events(query: SearchQuery):
-    """Semantic search across all events via vector DB."""
-    embedding = embedding_service.embed(query.query)
+    """Semantic search across all events via vector DB (keyword match until warm)."""
+    if not (readiness.is_ready("embeddings") and readiness.is_ready("qdrant")):
+        # Still warming up (or degraded): plain keyword match over recent events
+        results = _keyword_search(query)
+        return {"results": results, "total": len(results), "mode": "keyword"}
+
+    embedding = await embedding_service.embed(query.query)
     source_filter = query.sources[0].value if query.sources and len(query.sources) == 1 else None
     type_filter = query.event_types[0].value if query.event_types and len(query.event_types) == 1 else None
 
@@ -79,20 +203,76 @@ async def search_events(query: SearchQuery):
         type_filter=type_filter,
         time_range=time_range,
     )
-    return {"results": results, "total": len(results)}
+    return {"results": results, "total": len(results), "mode": "semantic"}
+
+
+def _search_hit(event: GeoEvent, score: float) -> dict:
+    """In-memory event shaped like a Qdrant search result."""
+    return {
+        "id": event.id,
+        "score": round(score, 3),
+        "source": event.source.value,
+        "event_type": event.event_type.value,
+        "title": event.title,
+        "description": event.description,
+        "lat": event.lat,
+        "lon": event.lon,
+        "timestamp": event.timestamp.timestamp(),
+        "entities": [e.model_dump() for e in event.entities],
+        "metadata": event.metadata,
+        "url": event.url,
+        "severity": event.severity,
+    }
+
+
+def _keyword_search(query: SearchQuery) -> List[dict]:
+    terms = query.query.lower().split()
+    _, candidates = get_event_store().query(
+        sources=query.sources or None,
+        event_types=query.event_types or None,
+        since=query.start_time,
+        until=query.end_time,
+    )
+    scored = []
+    for event in candidates:
+        text = f"{event.title} {event.description}".lower()
+        hits = sum(1 for term in terms if term in text)
+        if hits:
+            scored.append((hits / len(terms), event))
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    return [_search_hit(event, score) for score, event in scored[:query.limit]]
+
+
+def _related_by_entities(event: GeoEvent, limit: int) -> List[dict]:
+    store = get_event_store()
+    row = store.index.get(event.id)
+    slots = store.entities.entities_of(row) if row is not None else []
+    if not slots:
+        return []
+    shared: Dict[int, int] = {}
+    for slot in slots:
+        for other in store.entities.rows(slot):
+            shared[other] = shared.get(other, 0) + 1
+    shared.pop(row, None)
+    top = heapq.nlargest(limit, shared.items(), key=lambda pair: pair[1])
+    return [_search_hit(store.events[other], count / len(slots)) for other, count in top]
 
 
 @router.get("/relationships/{event_id}")
 async def get_relationships(event_id: str, limit: int = 20):
     """Find related events via vector similarity."""
     # Find the event in memory
-    event = next((e for e in get_event_store() if e.id == event_id), None)
+    event = get_event_store().get(event_id)
     if not event:
         return {"error": "Event not found", "related": []}
 
+    if not (readiness.is_ready("embeddings") and readiness.is_ready("qdrant")):
+        # Vector search not warm yet: relate events through shared entities instead
+        return {"event": event, "related": _related_by_entities(event, limit), "mode": "entities"}
+
     # Embed and search
     text = f"{event.title} {event.description}"
-    embedding = embedding_service.embed(text)
+    embedding = await embedding_service.embed(text)
     related = await vector_store.search_similar(
         embedding=embedding,
         limit=limit + 1,  # +1 because it'll match itself
@@ -100,7 +280,7 @@ async def get_relationships(event_id: str, limit: int = 20):
     )
     # Filter out self
     related = [r for r in related if r["id"] != event_id][:limit]
-    return {"event": event, "related": related}
+    return {"event": event, "related": related, "mode": "semantic"}
 
 
 @router.get("/feeds")
@@ -119,6 +299,23 @@ async def list_feed_statuses():
     return {"feeds": statuses}
 
 
+@router.get("/feeds/http")
+async def get_feed_http_stats():
+    """Get connection and latency stats of the shared HTTP client, per feed."""
+    return {"feeds": http_client.get_stats()}
+
+
+@router.get("/feeds/nitter")
+async def get_nitter_health():
+    """Get health scores of the Nitter instances used by X OSINT, best first."""
+    from app.ingestors.registry import ALL_INGESTORS
+    from app.ingestors.x_osint import XOSINTIngestor
+    for ingestor in ALL_INGESTORS:
+        if isinstance(ingestor, XOSINTIngestor):
+            return {"instances": ingestor.instances.get_stats()}
+    return {"instances": []}
+
+
 @router.post("/feeds/refresh")
 async def refresh_feeds():
     """Manually trigger feed ingestion."""
@@ -127,44 +324,54 @@ async def refresh_feeds():
 
 
 @router.get("/entities")
-async def search_entities(q: str, limit: int = 50):
-    """Search entities across all events."""
-    results = []
-    seen = set()
-    q_lower = q.lower()
-    for event in get_event_store():
-        for entity in event.entities:
-            if q_lower in entity.name.lower() and entity.name not in seen:
-                seen.add(entity.name)
-                results.append({
-                    "name": entity.name,
-                    "type": entity.type,
-                    "event_id": event.id,
-                    "event_title": event.title,
-                    "source": event.source.value,
-                })
-                if len(results) >= limit:
-                    break
-        if len(results) >= limit:
-            break
+async def search_entities(q: str, limit: int = Query(default=50, ge=1, le=500)):
+    """Search entities by name substring, most mentioned first."""
+    index = get_event_store().entities
+    results = [index.describe(slot) for slot in index.search(q, limit)]
     return {"entities": results, "total": len(results)}
 
 
+@router.get("/entities/{entity_id}/events")
+async def get_entity_events(
+    entity_id: str,
+    source: Optional[EventSource] = None,
+    limit: int = Query(default=100, ge=1, le=5000),
+    offset: int = Query(default=0, ge=0),
+):
+    """Events mentioning an entity, newest first.
+
+    Entity ids are derived from the normalized name, so they stay valid
+    across restarts; an entity no event in memory mentions is a 404.
+    """
+    store = get_event_store()
+    slot = store.entities.slot_of(entity_id)
+    entity = store.entities.describe(slot) if slot is not None else None
+    if entity is None:
+        raise HTTPException(status_code=404, detail="Entity not found")
+    total, events = store.entity_events(entity_id, limit, offset, sources=[source] if source else None)
+    return {"entity": entity, "events": events, "total": total}
+
+
 @router.get("/stats")
 async def get_stats():
     """Get platform statistics."""
     vector_count = await vector_store.get_event_count()
-    source_counts = {}
-    type_counts = {}
-    for event in get_event_store():
-        source_counts[event.source.value] = source_counts.get(event.source.value, 0) + 1
-        type_counts[event.event_type.value] = type_counts.get(event.event_type.value, 0) + 1
+    store = get_event_store().get_stats()
 
     return {
-        "total_events": len(get_event_store()),
+        "total_events": store["events"],
         "vector_db_count": vector_count,
-        "by_source": source_counts,
-        "by_type": type_counts,
+        "by_source": store["by_source"],
+        "by_type": store["by_type"],
         "active_feeds": sum(1 for s in get_feed_statuses().values() if s.event_count > 0),
         "total_feeds": len(get_feed_statuses()),
+        "aircraft": aircraft_store.get_stats(),
+        "tracks": track_store.get_stats(),
+        "embedding_batches": embedding_service.batcher.get_stats(),
+        "enrichment_cache": {
+            "embeddings": embedding_service.cache.get_stats() if embedding_service.cache else None,
+            "entities": ner_service.cache.get_stats() if ner_service.cache else None,
+        },
+        "geocoder": geocoder.get_stats(),
+        "gazetteer": gazetteer.get_stats(),
     }
@@ -6,6 +6,7 @@ class Settings(BaseSettings):
     # Qdrant
     qdrant_host: str = "localhost"
     qdrant_port: int = 6333
+    qdrant_connect_wait: float = 60  # Seconds to keep retrying Qdrant during startup
 
     # Redis
     redis_host: str = "localhost"
@@ -13,6 +14,17 @@ class Settings(BaseSettings):
 
     # Embedding
     embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_backend: str = "torch"  # torch | onnx
+    embedding_onnx_quantize: bool = True  # Dynamic int8 quantization for the onnx backend
+    embedding_parity_threshold: float = 0.99  # Min cosine vs torch before onnx is used
+    embedding_workers: int = 1  # Threads running model inference off the event loop
+    embedding_batch_size: int = 64  # Max texts per micro-batch
+    embedding_batch_wait_ms: float = 10  # Max wait for a micro-batch to fill
+
+    # Entity extraction (spaCy NER)
+    ner_batch_size: int = 64  # Texts per nlp.pipe batch
+    ner_processes: int = 1  # >1 fans large batches out to worker processes
+    ner_multiprocess_min_texts: int = 500  # Smaller batches stay in-process
 
     # API Keys (all optional — feeds degrade gracefully)
     cesium_ion_token: Optional[str] = None
@@ -26,9 +38,82 @@ class Settings(BaseSettings):
     acled_password: Optional[str] = None  # myACLED password
     nasa_firms_api_key: Optional[str] = None
 
+    # Feed resilience (per-feed deadline, retries, circuit breaker)
+    feed_deadline_seconds: float = 180  # Hard limit on one fetch including retries; feeds may override
+    feed_retries: int = 2  # Retries on timeouts, network errors, 429 and 5xx
+    feed_retry_base_seconds: float = 2  # Full-jitter exponential backoff base
+    feed_retry_max_seconds: float = 30
+    circuit_failure_threshold: int = 3  # Consecutive failed fetches before a feed's circuit opens
+    circuit_reset_seconds: float = 300  # Open circuit skips the feed this long, then probes once
+    circuit_max_reset_seconds: float = 3600  # Each failed probe doubles the wait up to this
+
     # X OSINT feed scraping (via Nitter RSS)
     x_osint_handles: Optional[str] = None
     nitter_instances: Optional[str] = None
+    x_osint_concurrency: int = 4  # Handles fetched at once
+    nitter_hedge_after: float = 5.0  # Seconds before racing a slow instance against the next one (0 = off)
+    nitter_cooldown_seconds: float = 60  # Skip a failing instance this long, doubling per consecutive failure
+    nitter_max_cooldown_seconds: float = 1800
+
+    # News feeds (RSS and Reddit)
+    rss_feeds: Optional[str] = None  # Comma-separated "Name|URL" or bare URLs; replaces the built-in list
+    rss_feeds_file: Optional[str] = None  # Same, one per line, for long lists
+    rss_concurrency: int = 16  # Feeds fetched at once
+    subreddits: Optional[str] = None  # Comma-separated; replaces the built-in list
+    reddit_concurrency: int = 4  # Subreddits fetched at once (Reddit rate-limits anonymous clients)
+
+    # Geocoding of place names (shared by ingestors)
+    geocoder_providers: str = "nominatim"  # Comma-separated, tried in order: nominatim, photon
+    geocoder_nominatim_rate: float = 1.0  # Requests per second (Nominatim usage policy)
+    geocoder_photon_rate: float = 2.0
+    geocoder_batch_timeout: float = 30  # Seconds a fetch waits on lookups; the rest finish in the background
+    geocoder_negative_ttl_hours: float = 168  # Retry places no provider knew after this long
+    geocoder_cache_memory_items: int = 20_000
+
+    # Offline gazetteer (country centroids + GeoNames place index built into the image)
+    gazetteer_dir: str = "/app/gazetteer"
+
+    # NASA FIRMS (full 24h global file, streamed)
+    firms_min_confidence: int = 50  # Drop detections below this confidence (%)
+    firms_min_frp: float = 0.0  # Drop detections below this fire radiative power (MW)
+    firms_cluster_km: float = 0.0  # >0 aggregates detections into grid clusters of this size
+
+    # Sanctions lists (full-list snapshots, only changes become events)
+    sanctions_baseline_events: bool = False  # Emit every entry on the very first pass
+    sanctions_min_list_ratio: float = 0.5  # Skip a pass that read fewer entries than this share of the last
+
+    # Aircraft (OpenSky state vectors, kept in a columnar store instead of events)
+    aircraft_stale_seconds: float = 600  # Drop aircraft missing from polls for this long
+    aircraft_extrapolate_seconds: float = 300  # Max dead-reckoning beyond an aircraft's last fix
+    aircraft_tick_seconds: float = 2.0  # Interval of /ws/aircraft position ticks
+    track_depth: int = 120  # Positions kept per aircraft track (ring buffer)
+    track_memory_mb: float = 64  # Budget for all track buffers; sets how many aircraft fit
+    track_idle_seconds: float = 1800  # Free a track after this long without a new fix
+
+    # Ingestion
+    ingest_concurrency: int = 6  # Max ingestors fetching at the same time
+    max_events: int = 50_000  # Recent events kept in memory for the API
+    max_events_per_source: int = 15_000  # Cap per source so one bulk feed cannot evict the rest (0 = none)
+    event_grid_degrees: float = 1.0  # Cell size of the in-memory events' spatial grid index
+
+    # Shared HTTP client
+    http_max_connections: int = 100
+    http_max_keepalive: int = 40
+    http_keepalive_expiry: float = 120.0  # Seconds an idle connection stays pooled
+    http2_enabled: bool = False
+    http_cache_enabled: bool = True  # Conditional-GET cache for large feed documents
+
+    # Persistent data (HTTP cache, indexes, snapshots)
+    data_dir: str = "/app/data"
+
+    # De-duplication of re-fetched events
+    dedup_exact_capacity: int = 500_000  # Recent IDs tracked exactly (with content fingerprint)
+    dedup_bloom_bits: int = 1 << 25  # Bloom filter generation for older IDs (4 MB; two are kept)
+
+    # Enrichment caches (embeddings + NER keyed by text hash and model version)
+    embedding_cache_memory_items: int = 50_000
+    embedding_cache_disk_items: int = 500_000  # ~770 MB at 384 float32 dims
+    entity_cache_memory_items: int = 50_000
 
     # Backend
     backend_host: str = "0.0.0.0"
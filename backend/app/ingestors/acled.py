@@ -1,10 +1,9 @@
-import httpx
 import logging
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Any, Dict, List, Tuple
 from app.ingestors.base import BaseIngestor
+from app.services.http_client import FeedHttpClient
 from app.models.schemas import GeoEvent, EventSource, EventType
-from app.services.entity_extractor import extract_entities
 from app.config import settings
 
 LOGIN_URL = "https://acleddata.com/user/login?_format=json"
@@ -12,20 +11,33 @@ API_URL = "https://acleddata.com/api/acled/read"
 
 logger = logging.getLogger(__name__)
 
-# Cache session cookies across fetch cycles
-_session_cookies: Optional[httpx.Cookies] = None
+# Session cookies persist in the shared client's cookie jar across fetch cycles
+_logged_in = False
+
+
+def _event_key(item: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Natural key of an ACLED row: event_id_cnty, or the event's own fields when that is missing."""
+    if item.get("event_id_cnty"):
+        return (item["event_id_cnty"],)
+    return tuple(
+        item.get(field) for field in
+        ("event_date", "latitude", "longitude", "sub_event_type", "actor1", "actor2")
+    )
 
 
 class ACLEDIngestor(BaseIngestor):
     name = "ACLED Conflict Data"
     source = EventSource.ACLED
     requires_key = True
+    poll_interval = 21600
+    min_interval = 3600
+    max_interval = 86400
 
     def is_configured(self) -> bool:
         return bool(settings.acled_username and settings.acled_password)
 
-    async def _login(self, client: httpx.AsyncClient) -> bool:
-        global _session_cookies
+    async def _login(self, client: FeedHttpClient) -> bool:
+        global _logged_in
         try:
             resp = await client.post(
                 LOGIN_URL,
@@ -34,9 +46,10 @@ class ACLEDIngestor(BaseIngestor):
                     "pass": settings.acled_password,
                 },
                 headers={"Content-Type": "application/json"},
+                follow_redirects=True,
             )
             if resp.status_code == 200:
-                _session_cookies = resp.cookies
+                _logged_in = True
                 logger.info("ACLED login successful")
                 return True
             else:
@@ -47,19 +60,33 @@ class ACLEDIngestor(BaseIngestor):
             return False
 
     async def fetch(self) -> List[GeoEvent]:
-        global _session_cookies
+        global _logged_in
         events = []
+        ner_texts = []
         week_ago = (datetime.utcnow() - timedelta(days=7)).strftime("%Y-%m-%d")
 
-        async with httpx.AsyncClient(timeout=30, follow_redirects=True) as client:
-            # Login if no cached session
-            if not _session_cookies:
-                if not await self._login(client):
-                    return events
-
-            # Set cookies on client
-            client.cookies = _session_cookies
+        client = self.http
+        # Login if no cached session
+        if not _logged_in:
+            if not await self._login(client):
+                return events
 
+        resp = await client.get(
+            API_URL,
+            params={
+                "event_date": f"{week_ago}|",
+                "event_date_where": ">=",
+                "limit": 100,
+            },
+            follow_redirects=True,
+        )
+
+        # If 403, try re-login once
+        if resp.status_code == 403:
+            logger.info("ACLED session expired, re-authenticating...")
+            _logged_in = False
+            if not await self._login(client):
+                return events
             resp = await client.get(
                 API_URL,
                 params={
@@ -67,63 +94,48 @@ class ACLEDIngestor(BaseIngestor):
                     "event_date_where": ">=",
                     "limit": 100,
                 },
+                follow_redirects=True,
             )
 
-            # If 403, try re-login once
-            if resp.status_code == 403:
-                logger.info("ACLED session expired, re-authenticating...")
-                _session_cookies = None
-                if not await self._login(client):
-                    return events
-                client.cookies = _session_cookies
-                resp = await client.get(
-                    API_URL,
-                    params={
-                        "event_date": f"{week_ago}|",
-                        "event_date_where": ">=",
-                        "limit": 100,
-                    },
-                )
-
-            if resp.status_code != 200:
-                logger.error(f"ACLED API request failed: {resp.status_code} {resp.text[:300]}")
-                return events
-
-            data = resp.json()
-            for item in data.get("data", []):
-                lat = float(item.get("latitude", 0)) if item.get("latitude") else None
-                lon = float(item.get("longitude", 0)) if item.get("longitude") else None
-                try:
-                    ts = datetime.strptime(item.get("event_date", ""), "%Y-%m-%d")
-                except (ValueError, TypeError):
-                    ts = datetime.utcnow()
-
-                title = f"{item.get('event_type', 'Event')}: {item.get('country', '')}"
-                notes = item.get("notes", "")
-                entities_found = extract_entities(notes)
-
-                fatalities = int(item.get("fatalities", 0) or 0)
-                severity = "critical" if fatalities >= 10 else "high" if fatalities >= 1 else "medium"
-
-                events.append(GeoEvent(
-                    source=EventSource.ACLED,
-                    event_type=EventType.CONFLICT,
-                    title=title,
-                    description=notes[:500],
-                    lat=lat,
-                    lon=lon,
-                    timestamp=ts,
-                    entities=entities_found,
-                    severity=severity,
-                    metadata={
-                        "event_type": item.get("event_type"),
-                        "sub_event_type": item.get("sub_event_type"),
-                        "actor1": item.get("actor1"),
-                        "actor2": item.get("actor2"),
-                        "fatalities": fatalities,
-                        "country": item.get("country"),
-                        "region": item.get("region"),
-                        "source": item.get("source"),
-                    }
-                ))
-        return events
+        if resp.status_code != 200:
+            logger.error(f"ACLED API request failed: {resp.status_code} {resp.text[:300]}")
+        resp.raise_for_status()
+
+        data = resp.json()
+        for item in data.get("data", []):
+            lat = float(item.get("latitude", 0)) if item.get("latitude") else None
+            lon = float(item.get("longitude", 0)) if item.get("longitude") else None
+            try:
+                ts = datetime.strptime(item.get("event_date", ""), "%Y-%m-%d")
+            except (ValueError, TypeError):
+                ts = datetime.utcnow()
+
+            title = f"{item.get('event_type', 'Event')}: {item.get('country', '')}"
+            notes = item.get("notes", "")
+
+            fatalities = int(item.get("fatalities", 0) or 0)
+            severity = "critical" if fatalities >= 10 else "high" if fatalities >= 1 else "medium"
+
+            events.append(GeoEvent(
+                id=self.event_id(*_event_key(item)),
+                source=EventSource.ACLED,
+                event_type=EventType.CONFLICT,
+                title=title,
+                description=notes[:500],
+                lat=lat,
+                lon=lon,
+                timestamp=ts,
+                severity=severity,
+                metadata={
+                    "event_type": item.get("event_type"),
+                    "sub_event_type": item.get("sub_event_type"),
+                    "actor1": item.get("actor1"),
+                    "actor2": item.get("actor2"),
+                    "fatalities": fatalities,
+                    "country": item.get("country"),
+                    "region": item.get("region"),
+                    "source": item.get("source"),
+                }
+            ))
+            ner_texts.append(notes)
+        return await self.attach_entities(events, ner_texts)
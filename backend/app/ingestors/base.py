@@ -1,16 +1,110 @@
+import asyncio
 import logging
 from abc import ABC, abstractmethod
-from typing import List
-from app.models.schemas import GeoEvent, EventSource
+from typing import List, Optional, Tuple
+from app.config import settings
+from app.models.schemas import GeoEvent, EventSource, stable_event_id
+from app.services.entity_extractor import ner_service
+from app.services.gazetteer import Place, gazetteer
+from app.services.http_client import FeedHttpClient, HttpClientService, http_client
+from app.services.readiness import readiness
+from app.services.resilience import CircuitBreaker, backoff_delay, is_retryable
 
 logger = logging.getLogger(__name__)
 
+# NER labels that name a location
+PLACE_LABELS = ("GPE", "LOC", "FAC")
+
+
+class FeedUnchanged(Exception):
+    """Raised from fetch() when upstream reports the data has not changed (e.g. HTTP 304)."""
+
 
 class BaseIngestor(ABC):
     name: str = "base"
     source: EventSource = None
     requires_key: bool = False
 
+    # Polling cadence in seconds. The scheduler starts at poll_interval and
+    # adapts between min_interval and max_interval based on feed novelty.
+    poll_interval: float = 300
+    min_interval: float = 60
+    max_interval: float = 3600
+
+    # Timeout profile for the shared HTTP client (see TIMEOUT_PROFILES)
+    timeout_profile: str = "default"
+
+    # Feeds that keep their data outside the event pipeline (e.g. aircraft
+    # positions) set (records fetched, new records) here during fetch(), so
+    # the feed status and adaptive polling still see their activity.
+    direct_counts: Optional[Tuple[int, int]] = None
+
+    # Hard limit in seconds on one fetch including retries (None: FEED_DEADLINE_SECONDS)
+    fetch_deadline: Optional[float] = None
+
+    def __init__(self, http: Optional[HttpClientService] = None):
+        self._http_service = http or http_client
+        self.breaker = CircuitBreaker(
+            threshold=settings.circuit_failure_threshold,
+            reset=settings.circuit_reset_seconds,
+            max_reset=settings.circuit_max_reset_seconds,
+        )
+        # Error of the last failed fetch, cleared by the next successful one
+        self.last_error: Optional[str] = None
+        self._deadline: Optional[asyncio.Timeout] = None
+
+    @property
+    def http(self) -> FeedHttpClient:
+        """Pooled HTTP client shared across feeds, with this feed's timeouts and stats."""
+        return self._http_service.for_feed(self.name, self.timeout_profile)
+
+    def event_id(self, *key) -> str:
+        """Stable event ID from the upstream natural key (e.g. USGS id, CVE, URL)."""
+        return stable_event_id(self.source, *key)
+
+    async def attach_entities(self, events: List[GeoEvent], texts: List[str], locate: bool = False) -> List[GeoEvent]:
+        """Run NER over texts[i] for events[i] in a single batch and attach the results.
+
+        With locate=True, events without coordinates are then placed from
+        their location entities (see locate_by_entities).
+        """
+        # Model warm-up at startup is not the feed's fault; pause the deadline meanwhile
+        deadline = self._deadline if self._deadline is not None and self._deadline.when() is not None else None
+        if deadline is not None:
+            loop = asyncio.get_running_loop()
+            remaining = deadline.when() - loop.time()
+            deadline.reschedule(None)
+        await readiness.wait("ner")
+        if deadline is not None:
+            deadline.reschedule(loop.time() + remaining)
+        for event, entities in zip(events, await ner_service.extract(texts)):
+            event.entities = entities
+        if locate:
+            self.locate_by_entities(events)
+        return events
+
+    def locate_by_entities(self, events: List[GeoEvent]) -> List[GeoEvent]:
+        """Place events lacking coordinates at their first location entity the offline gazetteer knows."""
+        for event in events:
+            if event.lat is not None and event.lon is not None:
+                continue
+            for entity in event.entities:
+                if entity.type not in PLACE_LABELS:
+                    continue
+                place = gazetteer.resolve(entity.name)
+                if place:
+                    self.set_location(event, place)
+                    break
+        return events
+
+    @staticmethod
+    def set_location(event: GeoEvent, place: Place) -> GeoEvent:
+        """Put an event at a gazetteer Place, recording how precise that is."""
+        event.lat, event.lon = place.lat, place.lon
+        event.metadata["geocoded"] = place.kind
+        event.metadata["geocoded_name"] = place.name
+        return event
+
     @abstractmethod
     def is_configured(self) -> bool:
         """Check if required API keys/config are present."""
@@ -21,15 +115,71 @@ class BaseIngestor(ABC):
         """Fetch and return normalized GeoEvents."""
         return []
 
-    async def safe_fetch(self) -> List[GeoEvent]:
-        """Fetch with error handling."""
+    async def commit(self):
+        """Called by the scheduler once the events of the last fetch are stored.
+
+        Only then do the cached documents it read count as delivered, so a
+        fetch whose events were lost reads them again instead of getting a 304.
+        """
+        self.http.acknowledge()
+
+    def rollback(self):
+        """Called by the scheduler when the events of the last fetch could not be stored."""
+        self.http.discard_pending()
+
+    async def _fetch_with_retries(self) -> List[GeoEvent]:
+        """fetch(), retried with jittered exponential backoff on transient errors."""
+        retries = max(0, settings.feed_retries)
+        for attempt in range(retries + 1):
+            try:
+                return await self.fetch()
+            except Exception as e:
+                if attempt >= retries or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt, settings.feed_retry_base_seconds, settings.feed_retry_max_seconds, e)
+                logger.info(f"{self.name}: {e!r} — retry {attempt + 1}/{retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def safe_fetch(self) -> Optional[List[GeoEvent]]:
+        """Fetch with a deadline, retries and a circuit breaker.
+
+        Returns None when the feed reports its data is unchanged since the
+        last fetch, or when its circuit is open and the fetch was skipped,
+        so callers can skip the enrichment pipeline entirely. Failures are
+        recorded in last_error and the breaker.
+        """
+        # Documents a cancelled fetch read but never stored are read again
+        self.rollback()
         if not self.is_configured():
             logger.info(f"{self.name}: not configured (missing API key)")
             return []
+        if not self.breaker.allow():
+            logger.debug(f"{self.name}: circuit open — next probe in {self.breaker.retry_in():.0f}s")
+            return None
+        deadline = self.fetch_deadline or settings.feed_deadline_seconds
         try:
-            events = await self.fetch()
+            async with asyncio.timeout(deadline) as self._deadline:
+                events = await self._fetch_with_retries()
             logger.info(f"{self.name}: fetched {len(events)} events")
+            self._succeeded()
             return events
+        except FeedUnchanged:
+            logger.info(f"{self.name}: unchanged since last fetch")
+            self._succeeded()
+            return None
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
         except Exception as e:
-            logger.error(f"{self.name}: fetch failed — {e}")
+            if isinstance(e, TimeoutError) and self._deadline is not None and self._deadline.expired():
+                e = TimeoutError(f"deadline of {deadline:g}s exceeded")
+            self.last_error = str(e) or type(e).__name__
+            self.breaker.failure()
+            logger.error(f"{self.name}: fetch failed — {self.last_error} (circuit {self.breaker.state})")
             return []
+        finally:
+            self._deadline = None
+
+    def _succeeded(self):
+        self.last_error = None
+        self.breaker.success()
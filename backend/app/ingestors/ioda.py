@@ -1,14 +1,17 @@
-import httpx
 from datetime import datetime, timedelta
 from typing import List
 from app.ingestors.base import BaseIngestor
 from app.models.schemas import GeoEvent, EventSource, EventType
+from app.services.gazetteer import gazetteer
 
 
 class IODAIngestor(BaseIngestor):
     name = "IODA Internet Outages"
     source = EventSource.IODA
     requires_key = False
+    poll_interval = 900
+    min_interval = 300
+    max_interval = 3600
 
     def is_configured(self) -> bool:
         return True
@@ -19,37 +22,39 @@ class IODAIngestor(BaseIngestor):
         since = int((now - timedelta(hours=24)).timestamp())
         until = int(now.timestamp())
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.get(
-                "https://api.ioda.inetintel.cc.gatech.edu/v2/alerts/country",
-                params={"from": since, "until": until}
-            )
-            if resp.status_code != 200:
-                return events
-            data = resp.json()
-            for alert in data.get("data", [])[:50]:
-                entity = alert.get("entity", {})
-                name = entity.get("name", "Unknown")
-                code = entity.get("code", "")
-                level = alert.get("level", "")
-                condition = alert.get("condition", "")
+        client = self.http
+        resp = await client.get(
+            "https://api.ioda.inetintel.cc.gatech.edu/v2/alerts/country",
+            params={"from": since, "until": until}
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        for alert in data.get("data", [])[:50]:
+            entity = alert.get("entity", {})
+            name = entity.get("name", "Unknown")
+            code = entity.get("code", "")
+            level = alert.get("level", "")
+            condition = alert.get("condition", "")
 
-                severity = "critical" if level == "critical" else "high" if level == "warning" else "medium"
+            severity = "critical" if level == "critical" else "high" if level == "warning" else "medium"
+            place = gazetteer.country(code) or gazetteer.country(name)
 
-                events.append(GeoEvent(
-                    source=EventSource.IODA,
-                    event_type=EventType.INFRASTRUCTURE,
-                    title=f"Internet Outage: {name} ({code})",
-                    description=f"Level: {level} | Condition: {condition}",
-                    lat=None, lon=None,
-                    timestamp=datetime.utcfromtimestamp(alert.get("time", 0)) if alert.get("time") else now,
-                    severity=severity,
-                    metadata={
-                        "country": name,
-                        "country_code": code,
-                        "level": level,
-                        "condition": condition,
-                        "datasource": alert.get("datasource"),
-                    }
-                ))
+            events.append(GeoEvent(
+                id=self.event_id(code, alert.get("datasource"), alert.get("time")),
+                source=EventSource.IODA,
+                event_type=EventType.INFRASTRUCTURE,
+                title=f"Internet Outage: {name} ({code})",
+                description=f"Level: {level} | Condition: {condition}",
+                lat=place.lat if place else None,
+                lon=place.lon if place else None,
+                timestamp=datetime.utcfromtimestamp(alert.get("time", 0)) if alert.get("time") else now,
+                severity=severity,
+                metadata={
+                    "country": name,
+                    "country_code": code,
+                    "level": level,
+                    "condition": condition,
+                    "datasource": alert.get("datasource"),
+                }
+            ))
         return events
@@ -1,68 +1,199 @@
-import httpx
-import csv
-import io
-from datetime import datetime
-from typing import List
-from app.ingestors.base import BaseIngestor
+import logging
+from typing import Dict, List
+import numpy as np
+from app.config import settings
+from app.ingestors.base import BaseIngestor, FeedUnchanged
 from app.models.schemas import GeoEvent, EventSource, EventType
+from app.services.csv_stream import ColumnarCsv, iter_line_blocks
+
+logger = logging.getLogger(__name__)
+
+FIRMS_URL = "https://firms.modaps.eosdis.nasa.gov/data/active_fire/modis-c6.1/csv/MODIS_C6_1_Global_24h.csv"
+COLUMNS = ["latitude", "longitude", "brightness", "acq_date", "acq_time", "satellite", "confidence", "frp", "daynight"]
+# VIIRS products report confidence as low/nominal/high instead of a percentage
+CONFIDENCE_CLASSES = {"l": 30.0, "n": 60.0, "h": 90.0}
+KM_PER_DEGREE = 111.32
+
+
+def _parse_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return float("nan")
+
+
+def _to_float(column: np.ndarray) -> np.ndarray:
+    """Floats of a string column; empty or non-numeric values become NaN."""
+    try:
+        return np.where(np.char.str_len(column) == 0, "nan", column).astype(np.float64)
+    except ValueError:
+        # Rare garbage in the block: convert value by value instead of failing the feed
+        return np.array([_parse_float(v) for v in column.tolist()], dtype=np.float64)
+
+
+def _confidence(column: np.ndarray) -> np.ndarray:
+    conf = np.full(column.shape, -1.0)
+    numeric = np.char.isdigit(column)
+    conf[numeric] = column[numeric].astype(np.float64)
+    for label, value in CONFIDENCE_CLASSES.items():
+        conf[column == label] = value
+    return conf
+
+
+def _acquired_minutes(acq_date: np.ndarray, acq_time: np.ndarray) -> np.ndarray:
+    """Acquisition times as datetime64[m] from YYYY-MM-DD dates and HHMM times."""
+    hhmm = acq_time.astype(np.int64)
+    return acq_date.astype("datetime64[D]").astype("datetime64[m]") + (hhmm // 100) * 60 + hhmm % 100
 
 
 class NASAFIRMSIngestor(BaseIngestor):
     name = "NASA FIRMS Wildfires"
     source = EventSource.NASA_FIRMS
     requires_key = False  # CSV feed is public
+    timeout_profile = "bulk"
+    fetch_deadline = 900  # Streams a multi-MB bulk file
+    poll_interval = 3600
+    min_interval = 900
+    max_interval = 21600
 
     def is_configured(self) -> bool:
         return True
 
     async def fetch(self) -> List[GeoEvent]:
+        # MODIS active fire data — last 24h, global CSV. Parsed block by block
+        # as it streams in; only rows passing the filters are kept.
+        parser = ColumnarCsv(COLUMNS)
+        kept: Dict[str, List[np.ndarray]] = {name: [] for name in COLUMNS + ["lat", "lon", "conf", "frp_mw", "when"]}
+        async with self.http.stream_cached(FIRMS_URL) as body:
+            if body.status_code == 304:
+                raise FeedUnchanged()
+            body.raise_for_status()
+            async for lines in iter_line_blocks(body.aiter_bytes()):
+                block = parser.feed(lines)
+                if block is not None:
+                    self._filter_block(block, kept)
+        if body.unchanged:
+            raise FeedUnchanged()
+
+        columns = {name: np.concatenate(parts) if parts else np.empty(0) for name, parts in kept.items()}
+        n = len(columns["conf"])
+        logger.info(
+            f"{self.name}: {n} of {parser.rows} detections passed filters"
+            + (f" ({parser.skipped} malformed rows)" if parser.skipped else "")
+        )
+        if not n:
+            return []
+        if settings.firms_cluster_km > 0:
+            return self._cluster_events(columns)
+        return self._detection_events(columns)
+
+    @staticmethod
+    def _filter_block(block: Dict[str, np.ndarray], kept: Dict[str, List[np.ndarray]]):
+        conf = _confidence(block["confidence"])
+        frp = _to_float(block["frp"])
+        lat = _to_float(block["latitude"])
+        lon = _to_float(block["longitude"])
+        mask = np.isfinite(lat) & np.isfinite(lon) & (conf >= settings.firms_min_confidence)
+        if settings.firms_min_frp > 0:
+            mask &= frp >= settings.firms_min_frp
+        mask &= (np.char.str_len(block["acq_date"]) == 10) & np.char.isdigit(block["acq_time"])
+        if not mask.any():
+            return
+        for name, column in block.items():
+            kept[name].append(column[mask])
+        kept["lat"].append(lat[mask])
+        kept["lon"].append(lon[mask])
+        kept["conf"].append(conf[mask])
+        kept["frp_mw"].append(frp[mask])
+        kept["when"].append(_acquired_minutes(block["acq_date"][mask], block["acq_time"][mask]))
+
+    def _detection_events(self, c: Dict[str, np.ndarray]) -> List[GeoEvent]:
+        events = []
+        lats = c["lat"].tolist()
+        lons = c["lon"].tolist()
+        timestamps = c["when"].astype("datetime64[us]").tolist()
+        rows = zip(
+            lats, lons, timestamps, c["conf"].tolist(), c["confidence"].tolist(), c["brightness"].tolist(),
+            c["frp"].tolist(), c["acq_date"].tolist(), c["acq_time"].tolist(), c["satellite"].tolist(),
+            c["daynight"].tolist(),
+        )
+        for lat, lon, ts, conf_val, confidence, brightness, frp, acq_date, acq_time, satellite, daynight in rows:
+            events.append(GeoEvent(
+                id=self.event_id(lat, lon, acq_date, acq_time, satellite),
+                source=EventSource.NASA_FIRMS,
+                event_type=EventType.WILDFIRE,
+                title=f"Active Fire Detection ({confidence}% confidence)",
+                description=f"Brightness: {brightness}K | FRP: {frp or 'N/A'}MW",
+                lat=lat,
+                lon=lon,
+                timestamp=ts,
+                severity="high" if conf_val >= 80 else "medium",
+                metadata={
+                    "brightness": brightness,
+                    "confidence": confidence,
+                    "frp": frp,
+                    "satellite": satellite,
+                    "daynight": daynight,
+                }
+            ))
+        return events
+
+    def _cluster_events(self, c: Dict[str, np.ndarray]) -> List[GeoEvent]:
+        """Aggregate detections into fire clusters on a FIRMS_CLUSTER_KM grid."""
+        km = settings.firms_cluster_km
+        cell = km / KM_PER_DEGREE
+        lat, lon = c["lat"], c["lon"]
+        rows = np.floor(lat / cell).astype(np.int64)
+        cols = np.floor(lon / cell).astype(np.int64)
+        cells, inverse, counts = np.unique(
+            np.stack([rows, cols], axis=1), axis=0, return_inverse=True, return_counts=True
+        )
+        inverse = inverse.reshape(-1)
+        k = len(cells)
+        frp = np.nan_to_num(c["frp_mw"])
+        frp_total = np.bincount(inverse, weights=frp, minlength=k)
+        frp_max = np.zeros(k)
+        np.maximum.at(frp_max, inverse, frp)
+        conf_max = np.zeros(k)
+        np.maximum.at(conf_max, inverse, c["conf"])
+        minutes = c["when"].astype(np.int64)
+        first = np.full(k, np.iinfo(np.int64).max)
+        np.minimum.at(first, inverse, minutes)
+        last = np.full(k, np.iinfo(np.int64).min)
+        np.maximum.at(last, inverse, minutes)
+        # Centroid weighted by FRP so the marker sits on the most intense part
+        weights = frp + 1.0
+        weight_sum = np.bincount(inverse, weights=weights, minlength=k)
+        lat_c = np.bincount(inverse, weights=lat * weights, minlength=k) / weight_sum
+        lon_c = np.bincount(inverse, weights=lon * weights, minlength=k) / weight_sum
+        first_ts = first.astype("datetime64[m]").astype("datetime64[us]").tolist()
+        last_ts = last.astype("datetime64[m]").astype("datetime64[us]").tolist()
+
         events = []
-        # MODIS/VIIRS active fire data — last 24h, global CSV
-        async with httpx.AsyncClient(timeout=60) as client:
-            resp = await client.get(
-                "https://firms.modaps.eosdis.nasa.gov/data/active_fire/modis-c6.1/csv/MODIS_C6_1_Global_24h.csv"
-            )
-            if resp.status_code != 200:
-                return events
-            reader = csv.DictReader(io.StringIO(resp.text))
-            count = 0
-            for row in reader:
-                if count >= 200:  # Limit
-                    break
-                try:
-                    lat = float(row.get("latitude", 0))
-                    lon = float(row.get("longitude", 0))
-                    confidence = row.get("confidence", "0")
-                    brightness = row.get("brightness", "")
-                    acq_date = row.get("acq_date", "")
-                    acq_time = row.get("acq_time", "0000")
-
-                    # Only high-confidence fires
-                    conf_val = int(confidence) if confidence.isdigit() else 0
-                    if conf_val < 50:
-                        continue
-
-                    ts = datetime.strptime(f"{acq_date} {acq_time}", "%Y-%m-%d %H%M")
-                    severity = "high" if conf_val >= 80 else "medium"
-
-                    events.append(GeoEvent(
-                        source=EventSource.NASA_FIRMS,
-                        event_type=EventType.WILDFIRE,
-                        title=f"Active Fire Detection ({confidence}% confidence)",
-                        description=f"Brightness: {brightness}K | FRP: {row.get('frp', 'N/A')}MW",
-                        lat=lat,
-                        lon=lon,
-                        timestamp=ts,
-                        severity=severity,
-                        metadata={
-                            "brightness": brightness,
-                            "confidence": confidence,
-                            "frp": row.get("frp"),
-                            "satellite": row.get("satellite"),
-                            "daynight": row.get("daynight"),
-                        }
-                    ))
-                    count += 1
-                except (ValueError, KeyError):
-                    continue
+        for i, (row, col) in enumerate(cells.tolist()):
+            count = int(counts[i])
+            severity = "critical" if count >= 50 else "high" if count >= 5 or conf_max[i] >= 80 else "medium"
+            events.append(GeoEvent(
+                id=self.event_id("cluster", km, row, col),
+                source=EventSource.NASA_FIRMS,
+                event_type=EventType.WILDFIRE,
+                title=f"Active Fire Cluster ({count} detection{'s' if count != 1 else ''})",
+                description=(
+                    f"Total FRP: {frp_total[i]:.1f}MW | Peak FRP: {frp_max[i]:.1f}MW"
+                    f" | Peak confidence: {conf_max[i]:.0f}%"
+                ),
+                lat=round(float(lat_c[i]), 5),
+                lon=round(float(lon_c[i]), 5),
+                timestamp=last_ts[i],
+                severity=severity,
+                metadata={
+                    "detections": count,
+                    "frp_total": round(float(frp_total[i]), 1),
+                    "frp_max": round(float(frp_max[i]), 1),
+                    "confidence_max": round(float(conf_max[i]), 1),
+                    "cell_km": km,
+                    "first_detection": first_ts[i].isoformat(),
+                    "last_detection": last_ts[i].isoformat(),
+                }
+            ))
         return events
@@ -1,61 +1,109 @@
-import httpx
 import csv
-import io
+import logging
 from datetime import datetime
 from typing import List
-from app.ingestors.base import BaseIngestor
+from app.config import settings
+from app.ingestors.base import BaseIngestor, FeedUnchanged
 from app.models.schemas import GeoEvent, EventSource, EventType, Entity
+from app.services.csv_stream import iter_line_blocks
+from app.services.sanctions_snapshot import ADDED, REMOVED, SnapshotDiff, record_hash
+
+logger = logging.getLogger(__name__)
+
+SDN_URL = "https://www.treasury.gov/ofac/downloads/sdn.csv"
+SDN_NULL = "-0-"  # OFAC's placeholder for empty fields
+SEVERITY = {ADDED: "high", REMOVED: "low"}
 
 
 class OFACIngestor(BaseIngestor):
     name = "OFAC Sanctions"
     source = EventSource.OFAC
     requires_key = False
+    timeout_profile = "bulk"
+    fetch_deadline = 900  # Streams a multi-MB bulk file
+    poll_interval = 21600
+    min_interval = 3600
+    max_interval = 86400
+
+    def __init__(self):
+        super().__init__()
+        self.snapshot = SnapshotDiff("ofac_sdn")
 
     def is_configured(self) -> bool:
         return True
 
+    async def commit(self):
+        # The snapshot only advances once the changes it produced are stored
+        await self.snapshot.save()
+        await super().commit()
+
     async def fetch(self) -> List[GeoEvent]:
+        # The full SDN list is diffed against the last snapshot as it streams
+        # in; only additions, amendments and removals become events.
         events = []
-        async with httpx.AsyncClient(timeout=60) as client:
-            # OFAC SDN list in CSV
-            resp = await client.get(
-                "https://www.treasury.gov/ofac/downloads/sdn.csv"
-            )
-            if resp.status_code != 200:
-                return events
-            reader = csv.reader(io.StringIO(resp.text))
-            count = 0
-            for row in reader:
-                if count >= 100 or len(row) < 4:
-                    break
-                ent_num = row[0].strip()
-                name = row[1].strip()
-                sdn_type = row[2].strip()
-                program = row[3].strip()
-                remarks = row[5].strip() if len(row) > 5 else ""
-
-                if not name:
-                    continue
-
-                entity_type = "PERSON" if sdn_type == "individual" else "ORG"
-
-                events.append(GeoEvent(
-                    source=EventSource.OFAC,
-                    event_type=EventType.SANCTIONS,
-                    title=f"OFAC SDN: {name}",
-                    description=f"Type: {sdn_type} | Program: {program} | {remarks}"[:500],
-                    lat=38.8977,
-                    lon=-77.0365,  # DC
-                    timestamp=datetime.utcnow(),
-                    entities=[Entity(name=name, type=entity_type)],
-                    severity="high",
-                    metadata={
-                        "sdn_number": ent_num,
-                        "sdn_type": sdn_type,
-                        "program": program,
-                        "remarks": remarks,
-                    }
-                ))
-                count += 1
+        self.snapshot.begin()
+        emit = not self.snapshot.baseline or settings.sanctions_baseline_events
+        now = datetime.utcnow()
+        async with self.http.stream_cached(SDN_URL) as body:
+            if body.status_code == 304:
+                raise FeedUnchanged()
+            body.raise_for_status()
+            async for lines in iter_line_blocks(body.aiter_bytes()):
+                for row in csv.reader(lines):
+                    if len(row) < 4:
+                        continue
+                    fields = ["" if f.strip() == SDN_NULL else f.strip() for f in row]
+                    ent_num, name = fields[0], fields[1]
+                    if not ent_num.isdigit() or not name:
+                        continue
+                    content_hash = record_hash(fields)
+                    change = self.snapshot.observe(ent_num, content_hash, name)
+                    if change and emit:
+                        events.append(self._event(fields, change, content_hash, now))
+        if body.unchanged:
+            raise FeedUnchanged()
+
+        removed = await self.snapshot.finish()
+        if not emit:
+            logger.info(f"{self.name}: recorded baseline snapshot of {len(self.snapshot.current)} SDN entries")
+            return []
+        for ent_num, content_hash, name in removed:
+            events.append(GeoEvent(
+                id=self.event_id(ent_num, REMOVED, content_hash),
+                source=EventSource.OFAC,
+                event_type=EventType.SANCTIONS,
+                title=f"OFAC SDN removed: {name}",
+                description=f"Entry {ent_num} was removed from the SDN list",
+                lat=38.8977,
+                lon=-77.0365,  # DC
+                timestamp=now,
+                entities=[Entity(name=name, type="ORG")],
+                severity=SEVERITY[REMOVED],
+                metadata={"sdn_number": ent_num, "change": REMOVED},
+            ))
+        logger.info(f"{self.name}: {len(events)} changes across {len(self.snapshot.current)} SDN entries")
         return events
+
+    def _event(self, fields: List[str], change: str, content_hash: int, now: datetime) -> GeoEvent:
+        ent_num, name, sdn_type, program = fields[:4]
+        remarks = fields[11] if len(fields) > 11 else ""
+        entity_type = "PERSON" if sdn_type == "individual" else "ORG"
+        return GeoEvent(
+            id=self.event_id(ent_num, change, content_hash),
+            source=EventSource.OFAC,
+            event_type=EventType.SANCTIONS,
+            title=f"OFAC SDN {change}: {name}",
+            description=f"Type: {sdn_type or 'entity'} | Program: {program} | {remarks}"[:500],
+            lat=38.8977,
+            lon=-77.0365,  # DC
+            timestamp=now,
+            entities=[Entity(name=name, type=entity_type)],
+            severity=SEVERITY.get(change, "medium"),
+            metadata={
+                "sdn_number": ent_num,
+                "sdn_type": sdn_type,
+                "program": program,
+                "remarks": remarks,
+                "change": change,
+            }
+        )
@@ -1,52 +1,129 @@
-import httpx
+import csv
+import logging
 from datetime import datetime
-from typing import List
-from app.ingestors.base import BaseIngestor
+from typing import Dict, List
+from app.config import settings
+from app.ingestors.base import BaseIngestor, FeedUnchanged
 from app.models.schemas import GeoEvent, EventSource, EventType, Entity
+from app.services.csv_stream import iter_line_blocks
+from app.services.gazetteer import gazetteer
+from app.services.sanctions_snapshot import ADDED, REMOVED, SnapshotDiff, record_hash
+
+logger = logging.getLogger(__name__)
+
+TARGETS_URL = "https://data.opensanctions.org/datasets/latest/sanctions/targets.simple.csv"
+# Bookkeeping columns that change without the record changing
+VOLATILE_COLUMNS = {"first_seen", "last_seen", "last_change"}
+SEVERITY = {ADDED: "high", REMOVED: "low"}
+
+
+def _split(value: str) -> List[str]:
+    return [v for v in value.split(";") if v]
 
 
 class OpenSanctionsIngestor(BaseIngestor):
     name = "OpenSanctions"
     source = EventSource.OPENSANCTIONS
     requires_key = False
+    timeout_profile = "bulk"
+    fetch_deadline = 900  # Streams a multi-MB bulk file
+    poll_interval = 21600
+    min_interval = 3600
+    max_interval = 86400
+
+    def __init__(self):
+        super().__init__()
+        self.snapshot = SnapshotDiff("opensanctions")
 
     def is_configured(self) -> bool:
         return True
 
+    async def commit(self):
+        # The snapshot only advances once the changes it produced are stored
+        await self.snapshot.save()
+        await super().commit()
+
     async def fetch(self) -> List[GeoEvent]:
+        # Bulk export of all sanctioned targets, diffed against the last
+        # snapshot while it streams; only the changes become events.
         events = []
-        async with httpx.AsyncClient(timeout=30) as client:
-            # OpenSanctions API — recent additions
-            resp = await client.get(
-                "https://api.opensanctions.org/search/default",
-                params={"q": "*", "limit": 50},
-                headers={"Accept": "application/json"}
-            )
-            if resp.status_code != 200:
-                return events
-            data = resp.json()
-            for result in data.get("results", []):
-                name = result.get("caption", "Unknown Entity")
-                schema = result.get("schema", "")
-                datasets = result.get("datasets", [])
-                countries = result.get("properties", {}).get("country", [])
-                entity_type = "PERSON" if schema == "Person" else "ORG"
-
-                events.append(GeoEvent(
-                    source=EventSource.OPENSANCTIONS,
-                    event_type=EventType.SANCTIONS,
-                    title=f"Sanctioned: {name}",
-                    description=f"Schema: {schema} | Datasets: {', '.join(datasets)}",
-                    lat=None,
-                    lon=None,
-                    timestamp=datetime.utcnow(),
-                    entities=[Entity(name=name, type=entity_type)],
-                    severity="high",
-                    metadata={
-                        "opensanctions_id": result.get("id"),
-                        "schema": schema,
-                        "datasets": datasets,
-                        "countries": countries,
-                    }
-                ))
+        self.snapshot.begin()
+        emit = not self.snapshot.baseline or settings.sanctions_baseline_events
+        now = datetime.utcnow()
+        header: List[str] = []
+        hashed: List[int] = []
+        async with self.http.stream_cached(TARGETS_URL) as body:
+            if body.status_code == 304:
+                raise FeedUnchanged()
+            body.raise_for_status()
+            async for lines in iter_line_blocks(body.aiter_bytes()):
+                rows = csv.reader(lines)
+                if not header:
+                    header = next(rows, [])
+                    hashed = [i for i, column in enumerate(header) if column not in VOLATILE_COLUMNS]
+                for row in rows:
+                    if len(row) != len(header):
+                        continue
+                    record = dict(zip(header, row))
+                    key, name = record.get("id", ""), record.get("name", "")
+                    if not key or not name:
+                        continue
+                    content_hash = record_hash([row[i] for i in hashed])
+                    change = self.snapshot.observe(key, content_hash, name)
+                    if change and emit:
+                        events.append(self._event(record, change, content_hash, now))
+        if body.unchanged:
+            raise FeedUnchanged()
+
+        removed = await self.snapshot.finish()
+        if not emit:
+            logger.info(f"{self.name}: recorded baseline snapshot of {len(self.snapshot.current)} targets")
+            return []
+        for key, content_hash, name in removed:
+            events.append(GeoEvent(
+                id=self.event_id(key, REMOVED, content_hash),
+                source=EventSource.OPENSANCTIONS,
+                event_type=EventType.SANCTIONS,
+                title=f"Sanctions removed: {name}",
+                description=f"{key} is no longer on a tracked sanctions list",
+                lat=None,
+                lon=None,
+                timestamp=now,
+                entities=[Entity(name=name, type="ORG")],
+                severity=SEVERITY[REMOVED],
+                metadata={"opensanctions_id": key, "change": REMOVED},
+            ))
+        logger.info(f"{self.name}: {len(events)} changes across {len(self.snapshot.current)} targets")
         return events
+
+    def _event(self, record: Dict[str, str], change: str, content_hash: int, now: datetime) -> GeoEvent:
+        key, name, schema = record["id"], record["name"], record.get("schema", "")
+        datasets = _split(record.get("dataset", ""))
+        countries = _split(record.get("countries", ""))
+        try:
+            ts = datetime.fromisoformat(record.get("last_change", ""))
+        except ValueError:
+            ts = now
+        # Place the target at the centroid of its first known country
+        place = next((p for p in map(gazetteer.country, countries) if p), None)
+        return GeoEvent(
+            id=self.event_id(key, change, content_hash),
+            source=EventSource.OPENSANCTIONS,
+            event_type=EventType.SANCTIONS,
+            title=f"Sanctioned ({change}): {name}",
+            description=f"Schema: {schema} | Datasets: {', '.join(datasets)} | {record.get('sanctions', '')}"[:500],
+            lat=place.lat if place else None,
+            lon=place.lon if place else None,
+            timestamp=ts,
+            entities=[Entity(name=name, type="PERSON" if schema == "Person" else "ORG")],
+            severity=SEVERITY.get(change, "medium"),
+            metadata={
+                "opensanctions_id": key,
+                "schema": schema,
+                "datasets": datasets,
+                "countries": countries,
+                "program_ids": _split(record.get("program_ids", "")),
+                "first_seen": record.get("first_seen"),
+                "change": change,
+            }
+        )
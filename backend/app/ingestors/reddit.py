@@ -1,9 +1,13 @@
-import httpx
+import asyncio
+import logging
+import re
 from datetime import datetime
-from typing import List
+from typing import List, Tuple
+from app.config import settings
 from app.ingestors.base import BaseIngestor
 from app.models.schemas import GeoEvent, EventSource, EventType
-from app.services.entity_extractor import extract_entities
+
+logger = logging.getLogger(__name__)
 
 SUBREDDITS = [
     "worldnews",
@@ -18,47 +22,76 @@ class RedditIngestor(BaseIngestor):
     name = "Reddit"
     source = EventSource.REDDIT
     requires_key = False
+    poll_interval = 600
+    min_interval = 300
+    max_interval = 3600
+
+    def __init__(self) -> None:
+        super().__init__()
+        raw = settings.subreddits or ""
+        subs = [s.strip().removeprefix("r/") for s in re.split(r"[,\s]+", raw) if s.strip()]
+        self.subreddits = list(dict.fromkeys(subs)) or SUBREDDITS
 
     def is_configured(self) -> bool:
-        return True
+        return bool(self.subreddits)
 
-    async def fetch(self) -> List[GeoEvent]:
+    async def _fetch_sub(self, sub: str, slots: asyncio.Semaphore) -> Tuple[List[GeoEvent], List[str]]:
         events = []
-        async with httpx.AsyncClient(timeout=30, headers={"User-Agent": "OSIRIS/1.0"}) as client:
-            for sub in SUBREDDITS:
-                try:
-                    resp = await client.get(f"https://www.reddit.com/r/{sub}/hot.json?limit=10")
-                    if resp.status_code != 200:
-                        continue
-                    data = resp.json()
-                    for post in data.get("data", {}).get("children", []):
-                        d = post.get("data", {})
-                        title = d.get("title", "")
-                        selftext = d.get("selftext", "")[:300]
-                        url = d.get("url", "")
-                        score = d.get("score", 0)
+        ner_texts = []
+        async with slots:
+            resp = await self.http.get(
+                f"https://www.reddit.com/r/{sub}/hot.json?limit=10",
+                headers={"User-Agent": "OSIRIS/1.0"},
+            )
+        resp.raise_for_status()
+        data = resp.json()
+
+        for post in data.get("data", {}).get("children", []):
+            d = post.get("data", {})
+            title = d.get("title", "")
+            selftext = d.get("selftext", "")[:300]
+            url = d.get("url", "")
+            score = d.get("score", 0)
 
-                        ts = datetime.utcfromtimestamp(d.get("created_utc", 0))
-                        entities_found = extract_entities(title)
+            ts = datetime.utcfromtimestamp(d.get("created_utc", 0))
 
-                        events.append(GeoEvent(
-                            source=EventSource.REDDIT,
-                            event_type=EventType.NEWS,
-                            title=f"r/{sub}: {title}",
-                            description=selftext,
-                            lat=None,
-                            lon=None,
-                            timestamp=ts,
-                            entities=entities_found,
-                            url=f"https://reddit.com{d.get('permalink', '')}",
-                            metadata={
-                                "subreddit": sub,
-                                "score": score,
-                                "num_comments": d.get("num_comments", 0),
-                                "author": d.get("author"),
-                                "external_url": url if not url.startswith("https://www.reddit.com") else None,
-                            }
-                        ))
-                except Exception:
-                    continue
-        return events
+            events.append(GeoEvent(
+                id=self.event_id(d.get("id")),
+                source=EventSource.REDDIT,
+                event_type=EventType.NEWS,
+                title=f"r/{sub}: {title}",
+                description=selftext,
+                lat=None,
+                lon=None,
+                timestamp=ts,
+                url=f"https://reddit.com{d.get('permalink', '')}",
+                metadata={
+                    "subreddit": sub,
+                    "score": score,
+                    "num_comments": d.get("num_comments", 0),
+                    "author": d.get("author"),
+                    "external_url": url if not url.startswith("https://www.reddit.com") else None,
+                }
+            ))
+            ner_texts.append(title)
+        return events, ner_texts
+
+    async def fetch(self) -> List[GeoEvent]:
+        events = []
+        ner_texts = []
+        slots = asyncio.Semaphore(max(1, settings.reddit_concurrency))
+        results = await asyncio.gather(
+            *(self._fetch_sub(sub, slots) for sub in self.subreddits), return_exceptions=True
+        )
+        failures = [r for r in results if isinstance(r, Exception)]
+        if failures and len(failures) == len(results):
+            # Nothing got through (e.g. rate-limited); fail the whole fetch
+            raise failures[0]
+        for sub, result in zip(self.subreddits, results):
+            if isinstance(result, Exception):
+                logger.debug(f"Reddit: r/{sub} failed — {result}")
+                continue
+            sub_events, sub_texts = result
+            events.extend(sub_events)
+            ner_texts.extend(sub_texts)
+        return await self.attach_entities(events, ner_texts, locate=True)
@@ -1,10 +1,15 @@
+import asyncio
 import feedparser
+import logging
 from datetime import datetime
-from typing import List
+from typing import List, Optional, Tuple
 from email.utils import parsedate_to_datetime
-from app.ingestors.base import BaseIngestor
+from urllib.parse import urlparse
+from app.config import settings
+from app.ingestors.base import BaseIngestor, FeedUnchanged
 from app.models.schemas import GeoEvent, EventSource, EventType
-from app.services.entity_extractor import extract_entities
+
+logger = logging.getLogger(__name__)
 
 RSS_FEEDS = [
     ("Reuters World", "https://feeds.reuters.com/reuters/worldNews"),
@@ -14,48 +19,110 @@ RSS_FEEDS = [
 ]
 
 
+def parse_feed_list(lines: List[str]) -> List[Tuple[str, str]]:
+    """(name, url) pairs from "Name|URL" or bare "URL" entries; lines starting with # are skipped."""
+    feeds = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        name, _, url = line.rpartition("|")
+        url = url.strip()
+        feeds.append((name.strip() or urlparse(url).netloc or url, url))
+    return feeds
+
+
+def configured_feeds() -> List[Tuple[str, str]]:
+    feeds: List[Tuple[str, str]] = []
+    if settings.rss_feeds:
+        feeds += parse_feed_list(settings.rss_feeds.split(","))
+    if settings.rss_feeds_file:
+        try:
+            with open(settings.rss_feeds_file, encoding="utf-8") as f:
+                feeds += parse_feed_list(f.read().splitlines())
+        except OSError as e:
+            logger.warning(f"RSS News: cannot read RSS_FEEDS_FILE {settings.rss_feeds_file}: {e}")
+    # De-duplicate by URL, keeping the first name given
+    unique = {}
+    for name, url in feeds or RSS_FEEDS:
+        unique.setdefault(url, (name, url))
+    return list(unique.values())
+
+
 class RSSNewsIngestor(BaseIngestor):
     name = "RSS News"
     source = EventSource.RSS_NEWS
     requires_key = False
+    poll_interval = 600
+    min_interval = 300
+    max_interval = 3600
+    # Hundreds of feeds at RSS_CONCURRENCY can outlast the default deadline
+    fetch_deadline = 600
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.feeds = configured_feeds()
 
     def is_configured(self) -> bool:
-        return True
+        return bool(self.feeds)
+
+    async def _fetch_feed(self, feed_url: str, slots: asyncio.Semaphore) -> Optional[list]:
+        """Entries of one feed, or None if unchanged since the last cycle."""
+        async with slots:
+            resp = await self.http.get_cached(feed_url, follow_redirects=True)
+        if resp.status_code == 304:
+            return None
+        resp.raise_for_status()
+        # feedparser is pure-Python and slow on big feeds; keep it off the event loop
+        feed = await asyncio.to_thread(feedparser.parse, resp.content)
+        return feed.entries[:15]
 
     async def fetch(self) -> List[GeoEvent]:
         events = []
-        for feed_name, feed_url in RSS_FEEDS:
-            try:
-                feed = feedparser.parse(feed_url)
-                for entry in feed.entries[:15]:
-                    title = entry.get("title", "")
-                    desc = entry.get("summary", entry.get("description", ""))
-                    link = entry.get("link", "")
-
-                    try:
-                        if entry.get("published_parsed"):
-                            ts = datetime(*entry.published_parsed[:6])
-                        elif entry.get("published"):
-                            ts = parsedate_to_datetime(entry.published)
-                        else:
-                            ts = datetime.utcnow()
-                    except Exception:
-                        ts = datetime.utcnow()
+        ner_texts = []
+        slots = asyncio.Semaphore(max(1, settings.rss_concurrency))
+        results = await asyncio.gather(
+            *(self._fetch_feed(url, slots) for _, url in self.feeds), return_exceptions=True
+        )
+        failures = [r for r in results if isinstance(r, Exception)]
+        if failures and len(failures) == len(results):
+            raise failures[0]
+        if all(entries is None or isinstance(entries, Exception) for entries in results):
+            raise FeedUnchanged()
 
-                    entities_found = extract_entities(title + " " + desc[:300])
-
-                    events.append(GeoEvent(
-                        source=EventSource.RSS_NEWS,
-                        event_type=EventType.NEWS,
-                        title=f"[{feed_name}] {title}",
-                        description=desc[:500],
-                        lat=None,
-                        lon=None,
-                        timestamp=ts,
-                        entities=entities_found,
-                        url=link,
-                        metadata={"feed": feed_name, "feed_url": feed_url}
-                    ))
-            except Exception:
+        for (feed_name, feed_url), entries in zip(self.feeds, results):
+            if isinstance(entries, Exception):
+                logger.debug(f"RSS News: {feed_name} failed — {entries}")
                 continue
-        return events
+            for entry in entries or []:
+                title = entry.get("title", "")
+                desc = entry.get("summary", entry.get("description", ""))
+                link = entry.get("link", "")
+
+                try:
+                    if entry.get("published_parsed"):
+                        ts = datetime(*entry.published_parsed[:6])
+                    elif entry.get("published"):
+                        ts = parsedate_to_datetime(entry.published)
+                    else:
+                        ts = datetime.utcnow()
+                except Exception:
+                    ts = datetime.utcnow()
+
+                events.append(GeoEvent(
+                    id=self.event_id(link or f"{feed_name}:{title}"),
+                    source=EventSource.RSS_NEWS,
+                    event_type=EventType.NEWS,
+                    title=f"[{feed_name}] {title}",
+                    description=desc[:500],
+                    lat=None,
+                    lon=None,
+                    timestamp=ts,
+                    url=link,
+                    metadata={"feed": feed_name, "feed_url": feed_url}
+                ))
+                ner_texts.append(title + " " + desc[:300])
+
+        unchanged = sum(1 for entries in results if entries is None)
+        logger.info(f"RSS News: {len(self.feeds)} feeds ({unchanged} unchanged, {len(failures)} failed)")
+        return await self.attach_entities(events, ner_texts, locate=True)
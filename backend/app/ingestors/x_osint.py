@@ -1,15 +1,17 @@
+import asyncio
 import feedparser
-import httpx
 import logging
 import re
+import time
 from datetime import datetime
 from email.utils import parsedate_to_datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Tuple
 
 from app.config import settings
-from app.ingestors.base import BaseIngestor
-from app.models.schemas import EventSource, EventType, GeoEvent
-from app.services.entity_extractor import extract_entities
+from app.ingestors.base import PLACE_LABELS, BaseIngestor
+from app.models.schemas import Entity, EventSource, EventType, GeoEvent
+from app.services.geocoder import geocoder
+from app.services.instance_pool import InstancePool
 
 logger = logging.getLogger(__name__)
 
@@ -36,14 +38,33 @@ DEFAULT_OSINT_HANDLES = [
 ]
 
 
+_STATUS_PATH = re.compile(r"/([^/?#]+)/status/(\d+)")
+
+
 def _clean_handle(handle: str) -> str:
     return handle.strip().lstrip("@").lower()
 
 
+def _status_key(handle: str, link: str) -> Tuple[str, str]:
+    """(handle, status id) of a tweet link, whichever Nitter instance served it.
+
+    Falls back to the link without its scheme and host when it is not a
+    /<handle>/status/<id> URL.
+    """
+    match = _STATUS_PATH.search(link)
+    if match:
+        return _clean_handle(match.group(1)), match.group(2)
+    return handle, re.sub(r"^[a-z]+://[^/]*", "", link).split("#", 1)[0]
+
+
 class XOSINTIngestor(BaseIngestor):
     name = "X OSINT"
     source = EventSource.X_OSINT
     requires_key = False
+    timeout_profile = "fast"
+    poll_interval = 600
+    min_interval = 300
+    max_interval = 3600
 
     def __init__(self) -> None:
         super().__init__()
@@ -62,119 +83,162 @@ class XOSINTIngestor(BaseIngestor):
             if i.strip()
         ]
         self.nitter_instances = parsed_instances or DEFAULT_NITTER_INSTANCES
-        self._geocode_cache: Dict[str, Tuple[float, float]] = {}
+        self.instances = InstancePool(
+            self.nitter_instances,
+            cooldown=settings.nitter_cooldown_seconds,
+            max_cooldown=settings.nitter_max_cooldown_seconds,
+        )
 
     def is_configured(self) -> bool:
         return bool(self.handles)
 
-    async def _geocode_text_location(
-        self, client: httpx.AsyncClient, text: str
-    ) -> Tuple[Optional[float], Optional[float]]:
-        entities = extract_entities(text)
-        location_entities = [e.name for e in entities if e.type in ("GPE", "LOC", "FAC")]
-
-        for place in location_entities[:3]:  # keep requests bounded
-            key = place.lower()
-            if key in self._geocode_cache:
-                lat, lon = self._geocode_cache[key]
-                return lat, lon
-
-            try:
-                resp = await client.get(
-                    "https://nominatim.openstreetmap.org/search",
-                    params={"q": place, "format": "json", "limit": 1},
-                    headers={"User-Agent": "osiris/0.1 (osint geocoder)"},
-                )
-                if resp.status_code != 200:
-                    continue
-
-                data = resp.json()
-                if not data:
+    async def _request(self, instance: str, handle: str):
+        """Fetch and parse one handle's feed from one instance, recording its health.
+
+        Returns the parsed feed, or None if the instance failed or served
+        no entries.
+        """
+        started = time.monotonic()
+        ok = False
+        try:
+            resp = await self.http.get(
+                f"{instance}/{handle}/rss",
+                headers={
+                    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36",
+                    "Accept": "application/rss+xml,application/xml;q=0.9,*/*;q=0.8",
+                },
+                follow_redirects=True,
+            )
+            if resp.status_code != 200 or not resp.text:
+                logger.debug("X OSINT feed for @%s via %s: HTTP %s", handle, instance, resp.status_code)
+                return None
+            feed = await asyncio.to_thread(feedparser.parse, resp.text)
+            ok = bool(feed.entries)
+            return feed if ok else None
+        except asyncio.CancelledError:
+            # Lost a hedged race: not a failure, but at least this slow
+            self.instances.record_latency(instance, time.monotonic() - started)
+            started = None
+            raise
+        except Exception as e:
+            logger.debug("X OSINT feed failed for @%s via %s: %s", handle, instance, e)
+            return None
+        finally:
+            if started is not None:
+                self.instances.record(instance, ok, time.monotonic() - started)
+
+    async def _fetch_feed(self, handle: str):
+        """(instance, feed) for a handle from the healthiest instance that serves it.
+
+        Instances are tried in health order. With hedging enabled, a request
+        still unanswered after NITTER_HEDGE_AFTER seconds is raced against
+        the next instance and the first usable answer wins.
+        """
+        candidates = iter(self.instances.ranked())
+        hedge_after = settings.nitter_hedge_after or None
+        pending: Dict[asyncio.Task, str] = {}
+
+        def launch() -> bool:
+            instance = next(candidates, None)
+            if instance is None:
+                return False
+            pending[asyncio.create_task(self._request(instance, handle))] = instance
+            return True
+
+        launch()
+        try:
+            while pending:
+                timeout = hedge_after if len(pending) == 1 else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if not launch():
+                        hedge_after = None
                     continue
+                for task in done:
+                    instance = pending.pop(task)
+                    if task.result() is not None:
+                        return instance, task.result()
+                if not pending:
+                    launch()
+            return None, None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _fetch_handle(self, handle: str, slots: asyncio.Semaphore) -> Tuple[List[GeoEvent], List[str]]:
+        events: List[GeoEvent] = []
+        ner_texts: List[str] = []
+        async with slots:
+            instance, feed = await self._fetch_feed(handle)
+        if feed is None:
+            logger.warning("Unable to fetch X OSINT feed for @%s", handle)
+            return events, ner_texts
+
+        feed_url = f"{instance}/{handle}/rss"
+        for entry in feed.entries[:25]:
+            title = entry.get("title", "")
+            desc = entry.get("summary", entry.get("description", ""))
+            link = entry.get("link", f"https://x.com/{handle}")
 
-                lat = float(data[0]["lat"])
-                lon = float(data[0]["lon"])
-                self._geocode_cache[key] = (lat, lon)
-                return lat, lon
+            try:
+                if entry.get("published_parsed"):
+                    ts = datetime(*entry.published_parsed[:6])
+                elif entry.get("published"):
+                    ts = parsedate_to_datetime(entry.published)
+                else:
+                    ts = datetime.utcnow()
             except Exception:
-                continue
-
-        return None, None
+                ts = datetime.utcnow()
+
+            events.append(
+                GeoEvent(
+                    id=self.event_id(*_status_key(handle, link)),
+                    source=EventSource.X_OSINT,
+                    event_type=EventType.NEWS,
+                    title=f"[@{handle}] {title[:220]}",
+                    description=desc[:1200],
+                    lat=None,
+                    lon=None,
+                    timestamp=ts,
+                    url=link,
+                    metadata={
+                        "handle": handle,
+                        "feed_url": feed_url,
+                        "nitter_instance": instance,
+                    },
+                )
+            )
+            ner_texts.append(f"{title} {desc}".strip())
+        return events, ner_texts
 
     async def fetch(self) -> List[GeoEvent]:
         events: List[GeoEvent] = []
+        ner_texts: List[str] = []
 
         if not self.handles:
             return events
 
-        async with httpx.AsyncClient(timeout=20, follow_redirects=True) as client:
-            for handle in self.handles:
-                feed_loaded = False
-
-                for instance in self.nitter_instances:
-                    feed_url = f"{instance}/{handle}/rss"
-                    try:
-                        resp = await client.get(
-                            feed_url,
-                            headers={
-                                "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36",
-                                "Accept": "application/rss+xml,application/xml;q=0.9,*/*;q=0.8",
-                            },
-                        )
-                        if resp.status_code != 200 or not resp.text:
-                            continue
-
-                        feed = feedparser.parse(resp.text)
-                        if not feed.entries:
-                            continue
-
-                        for entry in feed.entries[:25]:
-                            title = entry.get("title", "")
-                            desc = entry.get("summary", entry.get("description", ""))
-                            link = entry.get("link", f"https://x.com/{handle}")
-
-                            try:
-                                if entry.get("published_parsed"):
-                                    ts = datetime(*entry.published_parsed[:6])
-                                elif entry.get("published"):
-                                    ts = parsedate_to_datetime(entry.published)
-                                else:
-                                    ts = datetime.utcnow()
-                            except Exception:
-                                ts = datetime.utcnow()
-
-                            full_text = f"{title} {desc}".strip()
-                            entities = extract_entities(full_text)
-                            lat, lon = await self._geocode_text_location(client, full_text)
-
-                            events.append(
-                                GeoEvent(
-                                    source=EventSource.X_OSINT,
-                                    event_type=EventType.NEWS,
-                                    title=f"[@{handle}] {title[:220]}",
-                                    description=desc[:1200],
-                                    lat=lat,
-                                    lon=lon,
-                                    timestamp=ts,
-                                    entities=entities,
-                                    url=link,
-                                    metadata={
-                                        "handle": handle,
-                                        "feed_url": feed_url,
-                                        "nitter_instance": instance,
-                                    },
-                                )
-                            )
-
-                        feed_loaded = True
-                        break
-                    except Exception as e:
-                        logger.debug(
-                            "X OSINT feed failed for @%s via %s: %s", handle, instance, e
-                        )
-                        continue
-
-                if not feed_loaded:
-                    logger.warning("Unable to fetch X OSINT feed for @%s", handle)
+        # Handles are independent; fetch them concurrently under a cap
+        slots = asyncio.Semaphore(max(1, settings.x_osint_concurrency))
+        results = await asyncio.gather(*(self._fetch_handle(h, slots) for h in self.handles))
+        if not any(handle_events for handle_events, _ in results):
+            raise RuntimeError(f"no Nitter instance served any of {len(self.handles)} handles")
+        for handle_events, handle_texts in results:
+            events.extend(handle_events)
+            ner_texts.extend(handle_texts)
+
+        # Tag every post in one NER batch and place it offline where the
+        # gazetteer knows a location; geocode the rest in one online batch
+        await self.attach_entities(events, ner_texts, locate=True)
+        unplaced = [e for e in events if e.lat is None]
+        candidates = [[x.name for x in e.entities if x.type in PLACE_LABELS][:3] for e in unplaced]
+        resolved = await geocoder.resolve_many(
+            (place for places in candidates for place in places),
+            timeout=settings.geocoder_batch_timeout,
+        )
+        for event, places in zip(unplaced, candidates):
+            coords = next((resolved[p] for p in places if resolved.get(p)), None)
+            if coords:
+                event.lat, event.lon = coords
 
         return events
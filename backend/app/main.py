@@ -1,11 +1,20 @@
 import asyncio
 import logging
 from contextlib import asynccontextmanager
+from typing import Optional
+from app.services.readiness import readiness  # first, so its clock covers the imports below
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import router
+from app.config import settings
 from app.services.vector_store import vector_store
 from app.services.embeddings import embedding_service
+from app.services.entity_extractor import ner_service
+from app.services.http_client import http_client
+from app.services.dedup import seen_index
+from app.services.aircraft_store import aircraft_store
+from app.services.geocoder import geocoder
 from app.scheduler import scheduler_loop, register_ws, unregister_ws
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(levelname)s: %(message)s")
@@ -16,15 +25,31 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("🌍 OSIRIS starting up...")
-    embedding_service.load()
-    await vector_store.connect()
+    readiness.mark("imports")
 
-    # Start background scheduler
+    # Load models and connect to Qdrant in the background so the API is up
+    # immediately; endpoints degrade until each subsystem is warm.
+    readiness.register("embeddings", "ner", "qdrant")
+    warmup = [
+        asyncio.create_task(readiness.warm("embeddings", embedding_service.load)),
+        asyncio.create_task(readiness.warm("ner", ner_service.load)),
+        asyncio.create_task(readiness.warm("qdrant", lambda: vector_store.connect_sync(settings.qdrant_connect_wait))),
+    ]
+
+    # Start background scheduler; feeds fetch while warm-up runs
     task = asyncio.create_task(scheduler_loop())
-    logger.info("✅ OSIRIS ready")
+    readiness.mark("accepting requests")
+    logger.info("✅ OSIRIS accepting requests (warming up in background)")
     yield
     # Shutdown
     task.cancel()
+    for warming in warmup:
+        warming.cancel()
+    await http_client.aclose()
+    seen_index.save()
+    embedding_service.shutdown()
+    ner_service.shutdown()
+    geocoder.shutdown()
     logger.info("OSIRIS shutting down")
 
 
@@ -51,6 +76,19 @@ async def health():
     return {"status": "ok", "service": "osiris"}
 
 
+@app.get("/health/live")
+async def health_live():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok", "service": "osiris"}
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness: 503 until every subsystem has finished warming up."""
+    report = readiness.report()
+    return JSONResponse(report, status_code=200 if readiness.settled else 503)
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
@@ -60,3 +98,24 @@ async def websocket_endpoint(websocket: WebSocket):
             await websocket.receive_text()
     except WebSocketDisconnect:
         unregister_ws(websocket)
+
+
+@app.websocket("/ws/aircraft")
+async def aircraft_websocket(
+    websocket: WebSocket,
+    min_lat: Optional[float] = None,
+    max_lat: Optional[float] = None,
+    min_lon: Optional[float] = None,
+    max_lon: Optional[float] = None,
+    limit: int = 50000,
+):
+    """Pushes dead-reckoned aircraft positions every AIRCRAFT_TICK_SECONDS."""
+    import orjson
+    await websocket.accept()
+    bbox = {"min_lat": min_lat, "max_lat": max_lat, "min_lon": min_lon, "max_lon": max_lon}
+    try:
+        while True:
+            await websocket.send_bytes(orjson.dumps(aircraft_store.positions(limit=limit, **bbox)))
+            await asyncio.sleep(settings.aircraft_tick_seconds)
+    except (WebSocketDisconnect, RuntimeError, OSError):
+        pass
@@ -4,6 +4,9 @@ from datetime import datetime
 from enum import Enum
 import uuid
 
+# Namespace for deterministic event IDs (uuid5 of "<source>:<natural key>")
+EVENT_ID_NAMESPACE = uuid.UUID("6f1c2a4e-9d1b-5c3e-8a7f-0b4d2e6c9a11")
+
 
 class EventSource(str, Enum):
     GDELT = "gdelt"
@@ -67,6 +70,16 @@ class Entity(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
+def stable_event_id(source: "EventSource", *key: Any) -> str:
+    """Deterministic event ID derived from the upstream natural key.
+
+    Re-fetching the same upstream record yields the same ID, so it maps to
+    the same Qdrant point instead of creating a duplicate.
+    """
+    natural_key = "|".join("" if k is None else str(k) for k in key)
+    return str(uuid.uuid5(EVENT_ID_NAMESPACE, f"{source.value}:{natural_key}"))
+
+
 class GeoEvent(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     source: EventSource
@@ -90,6 +103,8 @@ class GeoEventResponse(BaseModel):
     total: int
     sources_active: List[str]
     sources_unavailable: List[str]
+    next_cursor: Optional[str] = None  # Opaque; pass as `cursor` for the next (older) page
+    prev_cursor: Optional[str] = None  # Opaque; pass as `cursor` for newer events
 
 
 class RelationshipResult(BaseModel):
@@ -104,7 +119,13 @@ class FeedStatus(BaseModel):
     configured: bool  # Has required API keys
     last_fetch: Optional[datetime] = None
     event_count: int = 0
+    new_count: int = 0  # Events that were new or changed (not already indexed)
+    poll_interval: Optional[float] = None  # Current adaptive interval (seconds)
+    next_fetch: Optional[datetime] = None
     error: Optional[str] = None
+    circuit: str = "closed"  # closed | open | half_open
+    consecutive_failures: int = 0
+    circuit_retry_at: Optional[datetime] = None  # When an open circuit lets the next probe through
 
 
 class SearchQuery(BaseModel):
@@ -1,27 +1,38 @@
 import logging
 import asyncio
-from datetime import datetime
+import heapq
+import time
+from datetime import datetime, timedelta
 from typing import List, Dict, Any
+from app.config import settings
 from app.ingestors.registry import ALL_INGESTORS
 from app.services.vector_store import vector_store
 from app.services.embeddings import embedding_service
+from app.services.dedup import seen_index
+from app.services.event_store import EventStore, event_store
+from app.services.readiness import readiness
 from app.models.schemas import GeoEvent, FeedStatus
 
 logger = logging.getLogger(__name__)
 
-# In-memory event store (recent events for API access)
-# Use a mutable container so all importers share the same reference.
+# Shared mutable state; recent events live in the columnar event_store
 _state: Dict[str, Any] = {
-    "events": [],
     "feed_statuses": {},
     "ws_subscribers": [],
 }
 
-MAX_EVENTS = 10000
+# Shared between the adaptive loop and manual refreshes so the cap holds globally
+_ingest_slots = asyncio.Semaphore(max(1, settings.ingest_concurrency))
+# One per feed: an ingestor's fetch state (deadline, breaker, counts) allows one fetch at a time
+_fetch_locks: Dict[str, asyncio.Lock] = {}
 
 
-def get_event_store() -> List[GeoEvent]:
-    return _state["events"]
+def get_event_store() -> EventStore:
+    return event_store
+
+
+def _fetch_lock(ingestor) -> asyncio.Lock:
+    return _fetch_locks.setdefault(ingestor.name, asyncio.Lock())
 
 
 def get_feed_statuses() -> Dict[str, FeedStatus]:
@@ -53,67 +64,193 @@ async def broadcast_events(events: List[GeoEvent]):
         unregister_ws(ws)
 
 
-async def run_ingestors():
-    """Run all ingestors and store results."""
-    logger.info("Starting ingestion cycle...")
-    feed_statuses = _state["feed_statuses"]
-    all_new_events = []
+def _resilience_fields(ingestor) -> Dict[str, Any]:
+    """FeedStatus fields describing the feed's last error and circuit breaker."""
+    breaker = ingestor.breaker
+    return {
+        "error": ingestor.last_error,
+        "circuit": breaker.state,
+        "consecutive_failures": breaker.failures,
+        "circuit_retry_at": breaker.retry_at(),
+    }
 
-    for ingestor in ALL_INGESTORS:
-        try:
-            events = await ingestor.safe_fetch()
-            if events:
-                # Generate embeddings
-                texts = [f"{e.title} {e.description}" for e in events]
-                embeddings = embedding_service.embed_batch(texts)
-
-                # Store in vector DB
-                await vector_store.upsert_batch(events, embeddings)
-
-                all_new_events.extend(events)
-
-                feed_statuses[ingestor.name] = FeedStatus(
-                    name=ingestor.name,
-                    source=ingestor.source,
-                    enabled=True,
-                    configured=ingestor.is_configured(),
-                    last_fetch=datetime.utcnow(),
-                    event_count=len(events)
-                )
-            else:
-                feed_statuses[ingestor.name] = FeedStatus(
-                    name=ingestor.name,
-                    source=ingestor.source,
-                    enabled=True,
-                    configured=ingestor.is_configured(),
-                    last_fetch=datetime.utcnow(),
-                    event_count=0
-                )
-        except Exception as e:
-            logger.error(f"Ingestor {ingestor.name} failed: {e}")
+
+async def ingest_one(ingestor) -> List[GeoEvent]:
+    """Fetch a single ingestor and commit its events as soon as they arrive."""
+    feed_statuses = _state["feed_statuses"]
+    try:
+        events = await ingestor.safe_fetch()
+        if events is None:
+            await ingestor.commit()
+            # Upstream unchanged — skip enrichment, keep the previous counts
+            # (or its circuit is open and the fetch was skipped)
+            previous = feed_statuses.get(ingestor.name)
+            last_fetch = datetime.utcnow()
+            if ingestor.last_error is not None:
+                last_fetch = previous.last_fetch if previous else None
             feed_statuses[ingestor.name] = FeedStatus(
                 name=ingestor.name,
                 source=ingestor.source,
                 enabled=True,
                 configured=ingestor.is_configured(),
-                error=str(e)
+                last_fetch=last_fetch,
+                event_count=previous.event_count if previous else 0,
+                new_count=0,
+                **_resilience_fields(ingestor),
             )
+            return []
+        fetched = len(events)
+        # Re-fetched events we already indexed skip enrichment; changed ones pass as updates
+        fresh, novel = seen_index.unseen(events)
+        if fresh:
+            # Fetching overlaps startup warm-up; enrichment waits for the model and Qdrant
+            await readiness.wait("embeddings", "qdrant")
+            if readiness.is_ready("embeddings"):
+                texts = [f"{e.title} {e.description}" for e in fresh]
+                embeddings = await embedding_service.embed_batch(texts)
+
+                # Store in vector DB (stable IDs overwrite the existing point).
+                # Only what reached Qdrant counts as indexed; the rest is
+                # retried on the next fetch.
+                if await vector_store.upsert_batch(fresh, embeddings):
+                    seen_index.add(fresh)
+                    seen_index.save(min_interval=60)
+
+        # Update in-memory store, replacing older versions of updated events.
+        # Seen events go in too: the store starts empty after a restart while
+        # the seen-ID index does not.
+        event_store.upsert(events)
+        events = fresh
+        if ingestor.last_error is None:
+            await ingestor.commit()
+        else:
+            ingestor.rollback()
 
-    # Update in-memory store
-    _state["events"] = (all_new_events + _state["events"])[:MAX_EVENTS]
-    logger.info(f"Ingestion complete: {len(all_new_events)} new events, {len(_state['events'])} total in memory")
+        new_count = novel
+        if ingestor.direct_counts is not None:
+            fetched, new_count = ingestor.direct_counts
+        feed_statuses[ingestor.name] = FeedStatus(
+            name=ingestor.name,
+            source=ingestor.source,
+            enabled=True,
+            configured=ingestor.is_configured(),
+            last_fetch=datetime.utcnow(),
+            event_count=fetched,
+            new_count=new_count,
+            **_resilience_fields(ingestor),
+        )
+    except Exception as e:
+        logger.error(f"Ingestor {ingestor.name} failed: {e}")
+        ingestor.rollback()
+        feed_statuses[ingestor.name] = FeedStatus(
+            name=ingestor.name,
+            source=ingestor.source,
+            enabled=True,
+            configured=ingestor.is_configured(),
+            error=str(e)
+        )
+        return []
 
     # Broadcast to WebSocket subscribers
-    await broadcast_events(all_new_events)
+    await broadcast_events(events)
+    return events
+
+
+async def run_ingestors():
+    """Run all ingestors concurrently and store results as each one finishes.
 
+    Feeds the scheduler is fetching right now are skipped.
+    """
+    logger.info("Starting ingestion cycle...")
+    started = time.monotonic()
+
+    async def bounded(ingestor):
+        lock = _fetch_lock(ingestor)
+        if lock.locked():
+            logger.info(f"{ingestor.name}: already being fetched — skipped")
+            return []
+        async with lock, _ingest_slots:
+            return await ingest_one(ingestor)
+
+    results = await asyncio.gather(*(bounded(i) for i in ALL_INGESTORS))
+    all_new_events = [e for events in results for e in events]
+
+    logger.info(
+        f"Ingestion complete in {time.monotonic() - started:.1f}s: "
+        f"{len(all_new_events)} new events, {len(event_store)} total in memory"
+    )
     return all_new_events
 
 
+def next_interval(ingestor, interval: float, status: FeedStatus) -> float:
+    """Adapt a feed's polling interval to how much new data its last fetch produced.
+
+    Failing or unchanged feeds back off; feeds returning mostly new records
+    are polled up to twice as often. The result stays within the feed's
+    declared min/max bounds.
+    """
+    if status.error:
+        interval *= 2
+    elif status.new_count == 0:
+        interval *= 1.5
+    else:
+        novelty = status.new_count / max(status.event_count, 1)
+        interval *= 1 - 0.5 * min(novelty, 1.0)
+    return min(max(interval, ingestor.min_interval), ingestor.max_interval)
+
+
 async def scheduler_loop():
-    """Background loop that runs ingestors periodically."""
-    while True:
+    """Background loop polling each ingestor on its own adaptive interval.
+
+    Feeds are kept in a priority queue ordered by next-due time. A feed is
+    re-queued only after its fetch completes, and a due feed waits for a
+    manual refresh of it to finish, so it never overlaps itself.
+    """
+    intervals = {i.name: float(i.poll_interval) for i in ALL_INGESTORS}
+    queue = [(time.monotonic(), n, i) for n, i in enumerate(ALL_INGESTORS)]
+    heapq.heapify(queue)
+    counter = len(queue)
+    wakeup = asyncio.Event()
+    running = set()
+
+    async def poll(ingestor):
+        nonlocal counter
         try:
-            await run_ingestors()
+            async with _fetch_lock(ingestor), _ingest_slots:
+                await ingest_one(ingestor)
         except Exception as e:
-            logger.error(f"Scheduler error: {e}")
-        await asyncio.sleep(300)  # Every 5 minutes
+            logger.error(f"Scheduler error in {ingestor.name}: {e}")
+
+        interval = intervals[ingestor.name]
+        status = _state["feed_statuses"].get(ingestor.name)
+        if status:
+            interval = next_interval(ingestor, interval, status)
+            status.poll_interval = interval
+        intervals[ingestor.name] = interval
+        # An open circuit costs nothing until its probe is due
+        delay = ingestor.breaker.retry_in() or interval
+        if status:
+            status.next_fetch = datetime.utcnow() + timedelta(seconds=delay)
+
+        counter += 1
+        heapq.heappush(queue, (time.monotonic() + delay, counter, ingestor))
+        wakeup.set()
+
+    try:
+        while True:
+            now = time.monotonic()
+            while queue and queue[0][0] <= now:
+                _, _, ingestor = heapq.heappop(queue)
+                task = asyncio.create_task(poll(ingestor))
+                running.add(task)
+                task.add_done_callback(running.discard)
+
+            wakeup.clear()
+            timeout = queue[0][0] - now if queue else None
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        for task in running:
+            task.cancel()
@@ -0,0 +1,234 @@
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from app.config import settings
+from app.services.dead_reckoning import climb, project
+from app.services.track_store import TrackStore, track_store
+
+logger = logging.getLogger(__name__)
+
+# OpenSky state vector field indexes (/api/states/all)
+ICAO24, CALLSIGN, ORIGIN, TIME_POSITION, LAST_CONTACT = 0, 1, 2, 3, 4
+LON, LAT, BARO_ALTITUDE, ON_GROUND, VELOCITY, TRUE_TRACK, VERTICAL_RATE = 5, 6, 7, 8, 9, 10, 11
+GEO_ALTITUDE, SQUAWK = 13, 14
+STATE_FIELDS = 15
+
+FLOAT_COLUMNS = ["lat", "lon", "altitude", "velocity", "heading", "vertical_rate", "fix_time", "last_contact", "updated"]
+STRING_COLUMNS = {"icao24": "U6", "callsign": "U8", "origin": "U32", "squawk": "U4"}
+
+
+def _floats(values: Sequence[Any]) -> np.ndarray:
+    # None (field not reported) becomes NaN
+    return np.array(values, dtype=np.float64)
+
+
+def _json_floats(column: np.ndarray, decimals: int) -> List[Optional[float]]:
+    return np.where(np.isnan(column), None, np.round(column, decimals)).tolist()
+
+
+class AircraftStore:
+    """Columnar store of the latest state of every aircraft, keyed by icao24.
+
+    Each OpenSky poll is written in place: known aircraft overwrite their
+    row, new ones are appended, and aircraft not heard from for
+    AIRCRAFT_STALE_SECONDS are compacted away. Positions never become
+    GeoEvents, so they skip NER, embedding and Qdrant entirely. New position
+    fixes are also appended to the per-aircraft track history.
+    """
+
+    def __init__(self, capacity: int = 16384, tracks: Optional[TrackStore] = None):
+        self.tracks = tracks
+        self.index: Dict[str, int] = {}
+        self.size = 0
+        self.last_poll: Optional[float] = None
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        self.capacity = capacity
+        self.columns: Dict[str, np.ndarray] = {name: np.full(capacity, np.nan) for name in FLOAT_COLUMNS}
+        for name, dtype in STRING_COLUMNS.items():
+            self.columns[name] = np.zeros(capacity, dtype=dtype)
+        self.columns["on_ground"] = np.zeros(capacity, dtype=bool)
+
+    def _grow(self, needed: int):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        old, size = self.columns, self.size
+        self._allocate(capacity)
+        for name, column in old.items():
+            self.columns[name][:size] = column[:size]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def update(self, states: List[list], poll_time: Optional[float] = None) -> Tuple[int, int]:
+        """Apply one /states/all snapshot; returns (aircraft with a position, fresh fixes)."""
+        poll_time = poll_time or time.time()
+        states = [s for s in states if s and len(s) >= STATE_FIELDS and s[LAT] is not None and s[LON] is not None]
+        if not states:
+            self.last_poll = poll_time
+            self._evict(poll_time)
+            return 0, 0
+        fields = list(zip(*states))
+        keys = [str(k).strip().lower() for k in fields[ICAO24]]
+
+        # Resolve rows: existing aircraft keep theirs, new ones are appended
+        index = self.index
+        rows = np.empty(len(keys), dtype=np.int64)
+        next_row = self.size
+        for i, key in enumerate(keys):
+            row = index.get(key)
+            if row is None:
+                row = index[key] = next_row
+                next_row += 1
+            rows[i] = row
+        if next_row > self.capacity:
+            self._grow(next_row)
+        self.size = next_row
+
+        c = self.columns
+        fix_time = _floats(fields[TIME_POSITION])
+        fresh = int(np.count_nonzero(~(fix_time <= c["fix_time"][rows])))
+        lat, lon = _floats(fields[LAT]), _floats(fields[LON])
+        baro = _floats(fields[BARO_ALTITUDE])
+        altitude = np.where(np.isnan(baro), _floats(fields[GEO_ALTITUDE]), baro)
+        c["icao24"][rows] = keys
+        c["callsign"][rows] = [(v or "").strip() for v in fields[CALLSIGN]]
+        c["origin"][rows] = [v or "" for v in fields[ORIGIN]]
+        c["squawk"][rows] = [v or "" for v in fields[SQUAWK]]
+        c["lat"][rows] = lat
+        c["lon"][rows] = lon
+        c["altitude"][rows] = altitude
+        c["velocity"][rows] = _floats(fields[VELOCITY])
+        c["heading"][rows] = _floats(fields[TRUE_TRACK])
+        c["vertical_rate"][rows] = _floats(fields[VERTICAL_RATE])
+        c["on_ground"][rows] = np.array(fields[ON_GROUND], dtype=bool)
+        c["fix_time"][rows] = fix_time
+        c["last_contact"][rows] = _floats(fields[LAST_CONTACT])
+        c["updated"][rows] = poll_time
+        if self.tracks is not None:
+            self.tracks.append(keys, fix_time, lat, lon, altitude)
+
+        self.last_poll = poll_time
+        self._evict(poll_time)
+        return len(keys), fresh
+
+    def _evict(self, now: float):
+        """Compact out aircraft not seen in any poll for AIRCRAFT_STALE_SECONDS."""
+        if not self.size:
+            return
+        keep = self.columns["updated"][:self.size] >= now - settings.aircraft_stale_seconds
+        if keep.all():
+            return
+        kept = np.flatnonzero(keep)
+        for name, column in self.columns.items():
+            column[:len(kept)] = column[kept]
+        # Freed rows get reused by new aircraft, which must not inherit a fix time
+        self.columns["fix_time"][len(kept):self.size] = np.nan
+        self.size = len(kept)
+        self.index = {key: row for row, key in enumerate(self.columns["icao24"][:self.size].tolist())}
+
+    def select(
+        self,
+        min_lat: Optional[float] = None,
+        max_lat: Optional[float] = None,
+        min_lon: Optional[float] = None,
+        max_lon: Optional[float] = None,
+        include_ground: bool = False,
+    ) -> np.ndarray:
+        """Row numbers of aircraft inside the bbox (min_lon > max_lon crosses the antimeridian)."""
+        c, n = self.columns, self.size
+        mask = np.ones(n, dtype=bool)
+        if not include_ground:
+            mask &= ~c["on_ground"][:n]
+        lat, lon = c["lat"][:n], c["lon"][:n]
+        if min_lat is not None:
+            mask &= lat >= min_lat
+        if max_lat is not None:
+            mask &= lat <= max_lat
+        if min_lon is not None and max_lon is not None and min_lon > max_lon:
+            mask &= (lon >= min_lon) | (lon <= max_lon)
+        else:
+            if min_lon is not None:
+                mask &= lon >= min_lon
+            if max_lon is not None:
+                mask &= lon <= max_lon
+        return np.flatnonzero(mask)
+
+    def projected(self, rows: np.ndarray, at: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Dead-reckoned (lat, lon, altitude, seconds extrapolated) of rows at time `at`.
+
+        Airborne aircraft move on from their last fix along their heading at
+        their reported speed and vertical rate, for at most
+        AIRCRAFT_EXTRAPOLATE_SECONDS; aircraft on the ground stay put.
+        """
+        c = self.columns
+        fix_time = c["fix_time"][rows]
+        fix_time = np.where(np.isnan(fix_time), c["last_contact"][rows], fix_time)
+        elapsed = np.clip(at - fix_time, 0.0, settings.aircraft_extrapolate_seconds)
+        elapsed = np.where(c["on_ground"][rows], 0.0, elapsed)
+        lat, lon = project(c["lat"][rows], c["lon"][rows], c["heading"][rows], c["velocity"][rows], elapsed)
+        altitude = climb(c["altitude"][rows], c["vertical_rate"][rows], elapsed)
+        return lat, lon, altitude, elapsed
+
+    def query(self, limit: int = 5000, at: Optional[float] = None, **bbox) -> Dict[str, Any]:
+        """Aircraft in a bbox as parallel JSON-ready columns.
+
+        With `at` (epoch seconds), positions are dead-reckoned to that time.
+        """
+        rows = self.select(**bbox)
+        total = len(rows)
+        rows = rows[:limit]
+        c = self.columns
+        lat, lon, altitude = c["lat"][rows], c["lon"][rows], c["altitude"][rows]
+        if at is not None:
+            lat, lon, altitude, _ = self.projected(rows, at)
+        return {
+            "time": self.last_poll if at is None else at,
+            "total": total,
+            "count": len(rows),
+            "aircraft": {
+                "icao24": c["icao24"][rows].tolist(),
+                "callsign": c["callsign"][rows].tolist(),
+                "origin": c["origin"][rows].tolist(),
+                "lat": _json_floats(lat, 5),
+                "lon": _json_floats(lon, 5),
+                "altitude": _json_floats(altitude, 0),
+                "velocity": _json_floats(c["velocity"][rows], 1),
+                "heading": _json_floats(c["heading"][rows], 1),
+                "vertical_rate": _json_floats(c["vertical_rate"][rows], 1),
+                "on_ground": c["on_ground"][rows].tolist(),
+                "squawk": c["squawk"][rows].tolist(),
+                "fix_time": _json_floats(c["fix_time"][rows], 0),
+            },
+        }
+
+    def positions(self, at: Optional[float] = None, limit: int = 50000, **bbox) -> Dict[str, Any]:
+        """Compact dead-reckoned positions: icao24, lat, lon, altitude and heading only."""
+        at = time.time() if at is None else at
+        rows = self.select(**bbox)[:limit]
+        lat, lon, altitude, elapsed = self.projected(rows, at)
+        return {
+            "time": at,
+            "count": len(rows),
+            "icao24": self.columns["icao24"][rows].tolist(),
+            "lat": _json_floats(lat, 5),
+            "lon": _json_floats(lon, 5),
+            "altitude": _json_floats(altitude, 0),
+            "heading": _json_floats(self.columns["heading"][rows], 0),
+            "extrapolated": _json_floats(elapsed, 0),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "aircraft": self.size,
+            "airborne": int(np.count_nonzero(~self.columns["on_ground"][:self.size])),
+            "capacity": self.capacity,
+            "memory_bytes": sum(column.nbytes for column in self.columns.values()),
+            "last_poll": self.last_poll,
+        }
+
+
+aircraft_store = AircraftStore(tracks=track_store)
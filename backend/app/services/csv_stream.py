@@ -0,0 +1,85 @@
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+async def iter_line_blocks(
+    chunks: AsyncIterator[bytes], min_block_bytes: int = 1 << 20, encoding: str = "utf-8"
+) -> AsyncIterator[List[str]]:
+    """Regroup a CSV byte stream into blocks of complete lines.
+
+    Chunks are buffered until at least min_block_bytes have arrived, so
+    downstream parsers work on large blocks instead of per-packet slivers.
+    Blocks are only cut at a newline outside double quotes, so a quoted
+    field spanning lines stays within one block.
+    """
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        if len(buffer) < min_block_bytes:
+            continue
+        cut = buffer.rfind(b"\n")
+        quotes = buffer.count(b'"', 0, cut) if cut >= 0 else 0
+        while cut >= 0 and quotes % 2:
+            previous = buffer.rfind(b"\n", 0, cut)
+            quotes -= buffer.count(b'"', previous + 1, cut)
+            cut = previous
+        if cut < 0:
+            continue
+        block = bytes(buffer[:cut])
+        del buffer[:cut + 1]
+        yield block.decode(encoding, errors="replace").split("\n")
+    if buffer.strip():
+        yield bytes(buffer).decode(encoding, errors="replace").split("\n")
+
+
+class ColumnarCsv:
+    """Parses blocks of plain (unquoted) CSV lines into NumPy string columns.
+
+    The first line fed is taken as the header. Each block is parsed with
+    NumPy's C loader, so per-row work stays out of Python; callers filter
+    and convert whole columns at once.
+    """
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        self.header: Optional[List[str]] = None
+        self.rows = 0
+        self.skipped = 0
+        self._usecols: List[int] = []
+
+    def feed(self, lines: List[str]) -> Optional[Dict[str, np.ndarray]]:
+        """Parse a block of lines; returns {column: str array} or None if empty."""
+        if self.header is None:
+            if not lines:
+                return None
+            self.header = [name.strip() for name in lines[0].split(",")]
+            missing = [c for c in self.columns if c not in self.header]
+            if missing:
+                raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+            self._usecols = [self.header.index(c) for c in self.columns]
+            lines = lines[1:]
+        # CRLF files leave a carriage return on the last field of every line
+        lines = [line[:-1] if line.endswith("\r") else line for line in lines]
+        lines = [line for line in lines if line]
+        if not lines:
+            return None
+        try:
+            table = self._load(lines)
+        except ValueError:
+            # Ragged rows: keep only lines with the header's field count
+            width = len(self.header) - 1
+            good = [line for line in lines if line.count(",") == width]
+            self.skipped += len(lines) - len(good)
+            if not good:
+                return None
+            table = self._load(good)
+        self.rows += table.shape[0]
+        return {name: table[:, i] for i, name in enumerate(self.columns)}
+
+    def _load(self, lines: List[str]) -> np.ndarray:
+        return np.loadtxt(
+            lines, delimiter=",", dtype=str, usecols=self._usecols, comments=None, ndmin=2
+        )
@@ -0,0 +1,39 @@
+from typing import Tuple
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_000.0
+
+
+def project(
+    lat: np.ndarray,
+    lon: np.ndarray,
+    heading: np.ndarray,
+    velocity: np.ndarray,
+    elapsed: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Dead-reckon positions along their heading for `elapsed` seconds.
+
+    Moves each object along the great circle given by its true track
+    (degrees clockwise from north) at constant ground speed (m/s). Objects
+    with an unknown heading or speed stay at their last fix.
+    """
+    moving = np.isfinite(heading) & np.isfinite(velocity) & np.isfinite(elapsed)
+    distance = np.where(moving, velocity * elapsed, 0.0) / EARTH_RADIUS_M
+    bearing = np.radians(np.where(moving, heading, 0.0))
+    phi1, lambda1 = np.radians(lat), np.radians(lon)
+
+    sin_phi2 = np.sin(phi1) * np.cos(distance) + np.cos(phi1) * np.sin(distance) * np.cos(bearing)
+    phi2 = np.arcsin(np.clip(sin_phi2, -1.0, 1.0))
+    lambda2 = lambda1 + np.arctan2(
+        np.sin(bearing) * np.sin(distance) * np.cos(phi1),
+        np.cos(distance) - np.sin(phi1) * sin_phi2,
+    )
+    new_lat = np.degrees(phi2)
+    new_lon = (np.degrees(lambda2) + 540.0) % 360.0 - 180.0
+    return np.where(moving, new_lat, lat), np.where(moving, new_lon, lon)
+
+
+def climb(altitude: np.ndarray, vertical_rate: np.ndarray, elapsed: np.ndarray) -> np.ndarray:
+    """Altitude after `elapsed` seconds at a constant vertical rate, floored at zero."""
+    rate = np.where(np.isfinite(vertical_rate), vertical_rate, 0.0)
+    return np.maximum(altitude + rate * elapsed, 0.0)
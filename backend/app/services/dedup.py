@@ -0,0 +1,161 @@
+import hashlib
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.config import settings
+from app.models.schemas import GeoEvent
+
+logger = logging.getLogger(__name__)
+
+BLOOM_HASHES = 7
+
+
+def _key64(event_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(event_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def content_fingerprint(event: GeoEvent) -> int:
+    """64-bit hash of the fields whose change makes a re-fetched event worth re-indexing."""
+    content = "\x1f".join(str(v) for v in (
+        event.title, event.description, event.lat, event.lon, event.severity, event.url,
+    ))
+    return int.from_bytes(hashlib.blake2b(content.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 64-bit keys, backed by a NumPy bit array."""
+
+    def __init__(self, num_bits: int, bits: Optional[np.ndarray] = None, count: int = 0):
+        self.num_bits = num_bits
+        self.bits = bits if bits is not None else np.zeros((num_bits + 7) // 8, dtype=np.uint8)
+        self.count = count  # Keys added, including repeats
+        # Keys it can hold at about a 1% false-positive rate
+        self.capacity = int(num_bits * math.log(2) / BLOOM_HASHES)
+
+    def _positions(self, key: int):
+        h1 = key & 0xFFFFFFFF
+        h2 = (key >> 32) | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(BLOOM_HASHES)]
+
+    def add(self, key: int):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: int) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class SeenIndex:
+    """Index of event IDs that have already been ingested.
+
+    Recent IDs live in an exact map of ID hash -> content fingerprint, so a
+    re-fetched event is either dropped (same content) or passed through as
+    an update (same ID, changed content). IDs evicted from the exact map
+    have no fingerprint left to compare, so they pass through as updates
+    too; a Bloom filter only keeps them from counting as new for the
+    feed's novelty. The filter has two generations: once the current one
+    is full it becomes the previous one and the oldest is dropped, so
+    false positives cannot pile up. Everything is persisted under
+    DATA_DIR so restarts don't re-index everything.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(settings.data_dir, "seen_index.npz")
+        self.capacity = settings.dedup_exact_capacity
+        self.exact: "OrderedDict[int, int]" = OrderedDict()
+        self.bloom = BloomFilter(settings.dedup_bloom_bits)
+        self.previous_bloom = BloomFilter(settings.dedup_bloom_bits)
+        self._dirty = False
+        self._last_save = 0.0
+        self._load()
+
+    def _load(self):
+        try:
+            with np.load(self.path) as data:
+                keys, fps, bits = data["keys"], data["fingerprints"], data["bloom"]
+                previous = data["bloom_previous"] if "bloom_previous" in data.files else None
+                # Files from before generations were kept: assume half full
+                count = int(data["bloom_count"]) if "bloom_count" in data.files else self.bloom.capacity // 2
+            if len(bits) == len(self.bloom.bits):
+                self.bloom = BloomFilter(self.bloom.num_bits, bits.copy(), count)
+                if previous is not None and len(previous) == len(bits):
+                    self.previous_bloom = BloomFilter(self.bloom.num_bits, previous.copy())
+            else:
+                for key in keys.tolist():
+                    self.bloom.add(key)
+            self.exact = OrderedDict(zip(keys.tolist(), fps.tolist()))
+            logger.info(f"Loaded seen-ID index: {len(self.exact)} exact IDs")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not load seen-ID index from {self.path}: {e}")
+
+    def _in_bloom(self, key: int) -> bool:
+        return key in self.bloom or key in self.previous_bloom
+
+    def unseen(self, events: List[GeoEvent]) -> Tuple[List[GeoEvent], int]:
+        """Events that are new or may have changed, in fetch order, and how many surely are.
+
+        IDs missing from the exact map are passed through, but those the
+        Bloom filter has seen before are not counted as new or changed.
+        """
+        fresh = []
+        novel = 0
+        batch: Dict[int, int] = {}
+        for event in events:
+            key = _key64(event.id)
+            fp = content_fingerprint(event)
+            if key in batch:
+                continue
+            known = self.exact.get(key)
+            if known == fp:
+                continue
+            if known is not None or not self._in_bloom(key):
+                novel += 1
+            batch[key] = fp
+            fresh.append(event)
+        return fresh, novel
+
+    def add(self, events: List[GeoEvent]):
+        """Record events as ingested."""
+        for event in events:
+            key = _key64(event.id)
+            self.exact[key] = content_fingerprint(event)
+            self.exact.move_to_end(key)
+            if self.bloom.count >= self.bloom.capacity:
+                self.previous_bloom = self.bloom
+                self.bloom = BloomFilter(self.bloom.num_bits)
+            self.bloom.add(key)
+        while len(self.exact) > self.capacity:
+            self.exact.popitem(last=False)
+        if events:
+            self._dirty = True
+
+    def save(self, min_interval: float = 0.0):
+        """Persist the index if it changed and at least min_interval seconds have passed."""
+        if not self._dirty or time.monotonic() - self._last_save < min_interval:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.tmp.npz"
+            np.savez(
+                tmp,
+                keys=np.fromiter(self.exact.keys(), dtype=np.uint64, count=len(self.exact)),
+                fingerprints=np.fromiter(self.exact.values(), dtype=np.uint64, count=len(self.exact)),
+                bloom=self.bloom.bits,
+                bloom_previous=self.previous_bloom.bits,
+                bloom_count=np.int64(self.bloom.count),
+            )
+            os.replace(tmp, self.path)
+            self._dirty = False
+            self._last_save = time.monotonic()
+        except OSError as e:
+            logger.warning(f"Could not save seen-ID index to {self.path}: {e}")
+
+
+seen_index = SeenIndex()
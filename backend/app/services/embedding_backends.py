@@ -0,0 +1,235 @@
+"""Interchangeable inference backends for EmbeddingService.
+
+``torch`` runs the sentence-transformers model as-is. ``onnx`` exports the
+model's transformer to ONNX once (optionally with dynamic int8
+quantization), runs it with ONNX Runtime on CPU and re-implements the
+pooling/normalization steps in NumPy. An ONNX export is only used after it
+passes a cosine-similarity parity check against the PyTorch reference.
+
+Benchmark the available backends with::
+
+    python -m app.services.embedding_backends --texts 2000
+"""
+import json
+import logging
+import os
+import re
+import time
+from typing import List, Optional
+import numpy as np
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PARITY_SAMPLES = [
+    "Magnitude 6.1 earthquake strikes off the coast of northern Chile",
+    "CVE-2024-3400: Palo Alto Networks PAN-OS command injection vulnerability",
+    "OFAC SDN: designated entity linked to ballistic missile procurement network",
+    "Protesters clash with security forces in the capital after disputed election",
+    "Active fire detection (92% confidence) near Kalimantan",
+    "Submarine cable outage disrupts internet connectivity across West Africa",
+    "WHO reports cluster of avian influenza cases in poultry workers",
+    "Aircraft squawking 7700 diverted to Keflavik",
+]
+
+
+class TorchBackend:
+    """Reference backend: the sentence-transformers model on PyTorch."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+        self.name = "torch"
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        return self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True).astype(np.float32, copy=False)
+
+
+class OnnxBackend:
+    """ONNX Runtime backend over an exported copy of the transformer."""
+
+    def __init__(self, model_dir: str, quantize: bool):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(model_dir, "pipeline.json")) as f:
+            self.pipeline = json.load(f)
+        model_file = "model.int8.onnx" if quantize else "model.onnx"
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.name = "onnx-int8" if quantize else "onnx"
+        self.dim = self.pipeline["dim"]
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        # Sort by length so each batch pads to similar lengths
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        for start in range(0, len(texts), batch_size):
+            idx = order[start:start + batch_size]
+            tokens = self.tokenizer(
+                [texts[i] for i in idx],
+                padding=True,
+                truncation=True,
+                max_length=self.pipeline["max_seq_length"],
+                return_tensors="np",
+            )
+            feeds = {k: v.astype(np.int64) for k, v in tokens.items() if k in self.input_names}
+            hidden = self.session.run(None, feeds)[0]
+            out[idx] = self._pool(hidden, tokens["attention_mask"])
+        return out
+
+    def _pool(self, hidden: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        if self.pipeline["pooling"] == "cls":
+            pooled = hidden[:, 0]
+        else:
+            weights = mask[..., None].astype(np.float32)
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        if self.pipeline["normalize"]:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32, copy=False)
+
+
+def onnx_model_dir(model_name: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+    return os.path.join(settings.data_dir, "onnx", slug)
+
+
+def export_onnx(reference: TorchBackend, model_dir: str):
+    """Export the reference model's transformer (and an int8 copy) to model_dir."""
+    import torch
+    from sentence_transformers import models as st_models
+
+    modules = list(reference.model)
+    pooling = next((m for m in modules if isinstance(m, st_models.Pooling)), None)
+    if pooling is None or not (pooling.pooling_mode_mean_tokens or pooling.pooling_mode_cls_token):
+        raise ValueError("only mean or CLS pooling models can be exported")
+
+    os.makedirs(model_dir, exist_ok=True)
+    transformer = modules[0].auto_model.eval()
+    tokenizer = reference.model.tokenizer
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+
+    class _LastHiddenState(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs)))[0]
+
+    dynamic = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    fp32_path = os.path.join(model_dir, "model.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            _LastHiddenState(transformer),
+            tuple(sample[n] for n in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic,
+            opset_version=14,
+        )
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(fp32_path, os.path.join(model_dir, "model.int8.onnx"), weight_type=QuantType.QInt8)
+
+    tokenizer.save_pretrained(model_dir)
+    with open(os.path.join(model_dir, "pipeline.json"), "w") as f:
+        json.dump({
+            "dim": reference.dim,
+            "max_seq_length": reference.model.max_seq_length,
+            "pooling": "mean" if pooling.pooling_mode_mean_tokens else "cls",
+            "normalize": any(isinstance(m, st_models.Normalize) for m in modules),
+        }, f)
+    logger.info(f"Exported ONNX embedding model to {model_dir}")
+
+
+def parity(backend, reference: TorchBackend, texts: List[str] = PARITY_SAMPLES) -> float:
+    """Lowest cosine similarity between backend and reference vectors over texts."""
+    a = backend.encode(texts)
+    b = reference.encode(texts)
+    cos = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+    return float(cos.min())
+
+
+def load_backend(name: str, model_name: str):
+    """Load the configured backend, falling back to torch if ONNX is unusable."""
+    if name == "onnx":
+        try:
+            return _load_onnx(model_name, settings.embedding_onnx_quantize)
+        except Exception as e:
+            logger.error(f"ONNX embedding backend unavailable, using torch: {e}")
+    elif name != "torch":
+        logger.warning(f"Unknown embedding backend {name!r}, using torch")
+    return TorchBackend(model_name)
+
+
+def _load_onnx(model_name: str, quantize: bool):
+    model_dir = onnx_model_dir(model_name)
+    variant = "int8" if quantize else "fp32"
+    marker = os.path.join(model_dir, f"parity.{variant}.json")
+    threshold = settings.embedding_parity_threshold
+
+    if os.path.exists(marker):
+        with open(marker) as f:
+            checked = json.load(f)
+        if checked["min_cosine"] >= threshold:
+            return OnnxBackend(model_dir, quantize)
+
+    # First run for this variant: export if needed and verify against PyTorch
+    reference = TorchBackend(model_name)
+    if not os.path.exists(os.path.join(model_dir, "pipeline.json")):
+        export_onnx(reference, model_dir)
+    backend = OnnxBackend(model_dir, quantize)
+    min_cosine = parity(backend, reference)
+    with open(marker, "w") as f:
+        json.dump({"min_cosine": min_cosine, "threshold": threshold}, f)
+    if min_cosine < threshold:
+        logger.error(f"{backend.name} parity check failed (min cosine {min_cosine:.4f} < {threshold}) — using torch")
+        return reference
+    logger.info(f"{backend.name} parity check passed (min cosine {min_cosine:.4f})")
+    return backend
+
+
+def benchmark(model_name: str, num_texts: int, batch_size: int):
+    """Print throughput and parity for each backend on synthetic event text."""
+    texts = [f"{PARITY_SAMPLES[i % len(PARITY_SAMPLES)]} #{i}" for i in range(num_texts)]
+    reference = TorchBackend(model_name)
+    model_dir = onnx_model_dir(model_name)
+    if not os.path.exists(os.path.join(model_dir, "pipeline.json")):
+        export_onnx(reference, model_dir)
+
+    candidates = [reference]
+    for quantize in (False, True):
+        try:
+            candidates.append(OnnxBackend(model_dir, quantize))
+        except Exception as e:
+            print(f"onnx ({'int8' if quantize else 'fp32'}) unavailable: {e}")
+
+    print(f"{'backend':<10} {'texts/s':>10} {'min cosine':>11}")
+    for backend in candidates:
+        backend.encode(texts[:batch_size], batch_size)  # warm-up
+        started = time.perf_counter()
+        backend.encode(texts, batch_size)
+        rate = num_texts / (time.perf_counter() - started)
+        cosine = parity(backend, reference, texts[:256])
+        print(f"{backend.name:<10} {rate:>10.1f} {cosine:>11.4f}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends")
+    parser.add_argument("--model", default=settings.embedding_model)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=settings.embedding_batch_size)
+    args = parser.parse_args()
+    benchmark(args.model, args.texts, args.batch_size)
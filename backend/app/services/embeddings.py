@@ -1,31 +1,214 @@
+import asyncio
 import logging
-from typing import List
-from sentence_transformers import SentenceTransformer
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import numpy as np
 from app.config import settings
+from app.services.embedding_backends import load_backend
+from app.services.enrichment_cache import EmbeddingCache
+from app.services.vector_store import VECTOR_SIZE
 
 logger = logging.getLogger(__name__)
 
 
+class _PendingRequest:
+    """One caller's texts, filled in row by row as micro-batches complete."""
+
+    __slots__ = ("texts", "vectors", "remaining", "future")
+
+    def __init__(self, texts: List[str], dim: int, future: asyncio.Future):
+        self.texts = texts
+        self.vectors = np.empty((len(texts), dim), dtype=np.float32)
+        self.remaining = len(texts)
+        self.future = future
+
+
+class EmbeddingBatcher:
+    """Coalesces embedding requests from all ingestors and API calls into micro-batches.
+
+    A batch is flushed once max_batch texts are waiting or max_wait has
+    passed since the first one arrived. Interactive requests (single
+    queries) go ahead of bulk ingestion texts. Bulk texts are grouped by
+    length to cut padding, always including the oldest waiting text so
+    long texts can't starve.
+    """
+
+    def __init__(self, service: "EmbeddingService"):
+        self.service = service
+        self.max_batch = max(1, settings.embedding_batch_size)
+        self.max_wait = settings.embedding_batch_wait_ms / 1000
+        self._interactive: Deque[Tuple[_PendingRequest, int]] = deque()
+        self._bulk: Deque[Tuple[_PendingRequest, int]] = deque()
+        self._arrived: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight = set()
+        self.batches = 0
+        self.texts = 0
+
+    def _ensure_started(self):
+        if self._worker is None or self._worker.done():
+            self._arrived = asyncio.Event()
+            self._slots = asyncio.Semaphore(max(1, settings.embedding_workers))
+            self._worker = asyncio.create_task(self._run())
+
+    async def submit(self, texts: List[str], interactive: bool = False) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.service.dim), dtype=np.float32)
+        self._ensure_started()
+        request = _PendingRequest(texts, self.service.dim, asyncio.get_running_loop().create_future())
+        queue = self._interactive if interactive else self._bulk
+        queue.extend((request, i) for i in range(len(texts)))
+        self._arrived.set()
+        return await request.future
+
+    def _waiting(self) -> int:
+        return len(self._interactive) + len(self._bulk)
+
+    async def _run(self):
+        while True:
+            await self._arrived.wait()
+            if self._waiting() < self.max_batch:
+                # Let concurrent callers join this batch
+                await asyncio.sleep(self.max_wait)
+            await self._slots.acquire()
+            batch = self._take()
+            if not self._waiting():
+                self._arrived.clear()
+            if not batch:
+                self._slots.release()
+                continue
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    def _take(self) -> List[Tuple[_PendingRequest, int]]:
+        batch = []
+        while self._interactive and len(batch) < self.max_batch:
+            item = self._interactive.popleft()
+            if not item[0].future.done():
+                batch.append(item)
+
+        room = self.max_batch - len(batch)
+        if room <= 0 or not self._bulk:
+            return batch
+        window = []
+        while self._bulk and len(window) < 4 * room:
+            item = self._bulk.popleft()
+            if not item[0].future.done():
+                window.append(item)
+        if len(window) <= room:
+            return batch + window
+
+        lengths = np.fromiter((len(r.texts[i]) for r, i in window), dtype=np.int64, count=len(window))
+        order = np.argsort(lengths, kind="stable")
+        oldest = int(np.flatnonzero(order == 0)[0])
+        start = min(max(oldest - room // 2, 0), len(window) - room)
+        chosen = set(order[start:start + room].tolist())
+        batch.extend(window[i] for i in sorted(chosen, key=lambda i: lengths[i]))
+        # Unchosen texts go back to the front, in arrival order
+        self._bulk.extendleft(reversed([window[i] for i in range(len(window)) if i not in chosen]))
+        return batch
+
+    async def _dispatch(self, batch: List[Tuple[_PendingRequest, int]]):
+        try:
+            texts = [request.texts[i] for request, i in batch]
+            loop = asyncio.get_running_loop()
+            vectors = await loop.run_in_executor(self.service.executor, self.service.encode, texts)
+            self.batches += 1
+            self.texts += len(texts)
+            for (request, i), vector in zip(batch, vectors):
+                request.vectors[i] = vector
+                request.remaining -= 1
+                if request.remaining == 0 and not request.future.done():
+                    request.future.set_result(request.vectors)
+        except Exception as e:
+            for request, _ in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.batches, 1) if self.batches else None,
+            "waiting": self._waiting(),
+        }
+
+
 class EmbeddingService:
+    """Sentence embeddings computed on a worker pool, off the event loop.
+
+    Vectors are returned as float32 NumPy arrays (one row per text) and
+    stay that way until the Qdrant boundary. All requests go through a
+    shared micro-batching queue.
+    """
+
     def __init__(self):
-        self.model = None
+        self.backend = None
+        self.cache: Optional[EmbeddingCache] = None
+        self.dim = VECTOR_SIZE
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.embedding_workers),
+            thread_name_prefix="embedding",
+        )
+        self.batcher = EmbeddingBatcher(self)
 
-    def load(self):
+    def load(self) -> bool:
+        """Load the model; safe to call from a worker thread while requests are served."""
         try:
-            self.model = SentenceTransformer(settings.embedding_model)
-            logger.info(f"Loaded embedding model: {settings.embedding_model}")
+            backend = load_backend(settings.embedding_backend, settings.embedding_model)
+            logger.info(f"Loaded embedding model: {settings.embedding_model} ({backend.name})")
         except Exception as e:
             logger.error(f"Failed to load embedding model: {e}")
+            return False
+        self.dim = backend.dim or VECTOR_SIZE
+        # Backends produce slightly different vectors, so each gets its own cache
+        self.cache = EmbeddingCache(f"{settings.embedding_model}-{backend.name}", self.dim)
+        # Publish the backend last: encode() treats it as the "loaded" flag
+        self.backend = backend
+        return True
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Blocking, cache-aware encode. Runs on the worker pool via the batcher.
+
+        Raises RuntimeError until load() has succeeded; callers check
+        readiness first rather than getting vectors that mean nothing.
+        """
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        if not self.backend:
+            raise RuntimeError("embedding backend not loaded")
+        cached = self.cache.get_many(texts)
+        vectors = np.empty((len(texts), self.dim), dtype=np.float32)
+        missing = []
+        for i, vector in enumerate(cached):
+            if vector is None:
+                missing.append(i)
+            else:
+                vectors[i] = vector
+        if missing:
+            # Encode each distinct missing text once
+            unique = list(dict.fromkeys(texts[i] for i in missing))
+            encoded = self.backend.encode(unique, batch_size=settings.embedding_batch_size)
+            self.cache.put_many(unique, encoded)
+            row = {text: n for n, text in enumerate(unique)}
+            vectors[missing] = encoded[[row[texts[i]] for i in missing]]
+        return vectors
+
+    async def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed texts without blocking the event loop; returns an (n, dim) float32 array."""
+        return await self.batcher.submit(list(texts))
 
-    def embed(self, text: str) -> List[float]:
-        if not self.model:
-            return [0.0] * 384
-        return self.model.encode(text).tolist()
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed a single interactive query; it jumps ahead of queued ingestion texts."""
+        return (await self.batcher.submit([text], interactive=True))[0]
 
-    def embed_batch(self, texts: List[str]) -> List[List[float]]:
-        if not self.model:
-            return [[0.0] * 384 for _ in texts]
-        return [e.tolist() for e in self.model.encode(texts, batch_size=32)]
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
 
 
 embedding_service = EmbeddingService()
@@ -0,0 +1,245 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import orjson
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_BYTES = 20  # sha1 digest
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def cache_key(model_version: str, text: str) -> bytes:
+    """Content address of a text for a given model version."""
+    return hashlib.sha1(f"{model_version}\x00{normalize_text(text)}".encode("utf-8")).digest()
+
+
+class CacheStats:
+    def __init__(self):
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def to_dict(self) -> Dict[str, float]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "lookups": lookups,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else None,
+        }
+
+
+class EmbeddingCache:
+    """Two-tier cache of embedding vectors keyed by text hash and model.
+
+    The memory tier is an LRU of recent vectors. The disk tier is an
+    append-only float32 matrix (memory-mapped for reads) plus a parallel
+    file of 20-byte keys, so it survives restarts. When the disk tier
+    reaches its cap it starts over.
+    """
+
+    def __init__(self, model_version: str, dim: int, root: Optional[str] = None):
+        self.model_version = model_version
+        self.dim = dim
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_version)
+        self.root = root or os.path.join(settings.data_dir, "embedding_cache", slug)
+        self.memory_capacity = settings.embedding_cache_memory_items
+        self.disk_capacity = settings.embedding_cache_disk_items
+        self.stats = CacheStats()
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._rows: Dict[bytes, int] = {}
+        self._disk_rows = 0  # Rows in the files; a key written twice leaves more rows than keys
+        self._mmap: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        self._disk_enabled = self._open_disk()
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.root, "vectors.f32")
+
+    @property
+    def _keys_path(self) -> str:
+        return os.path.join(self.root, "keys.bin")
+
+    def _open_disk(self) -> bool:
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            keys = b""
+            if os.path.exists(self._keys_path):
+                with open(self._keys_path, "rb") as f:
+                    keys = f.read()
+            rows = len(keys) // KEY_BYTES
+            vector_rows = os.path.getsize(self._vectors_path) // (4 * self.dim) if os.path.exists(self._vectors_path) else 0
+            # A crash between the two appends can leave them out of step; trust the shorter one
+            rows = min(rows, vector_rows)
+            self._rows = {keys[i * KEY_BYTES:(i + 1) * KEY_BYTES]: i for i in range(rows)}
+            self._truncate(rows)
+            if rows:
+                logger.info(f"Embedding cache: {rows} vectors on disk for {self.model_version}")
+            return True
+        except OSError as e:
+            logger.warning(f"Embedding disk cache disabled — {e}")
+            return False
+
+    def _truncate(self, rows: int):
+        with open(self._keys_path, "ab") as f:
+            f.truncate(rows * KEY_BYTES)
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(rows * 4 * self.dim)
+        self._disk_rows = rows
+        self._mmap = None
+
+    def _read_row(self, row: int) -> np.ndarray:
+        if self._mmap is None or row >= self._mmap.shape[0]:
+            self._mmap = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(self._disk_rows, self.dim))
+        return np.array(self._mmap[row])
+
+    def _remember(self, key: bytes, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_capacity:
+            self._memory.popitem(last=False)
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Cached vectors for texts, with None for misses."""
+        results: List[Optional[np.ndarray]] = []
+        with self._lock:
+            for text in texts:
+                key = cache_key(self.model_version, text)
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.stats.memory_hits += 1
+                elif self._disk_enabled and key in self._rows:
+                    vector = self._read_row(self._rows[key])
+                    self._remember(key, vector)
+                    self.stats.disk_hits += 1
+                else:
+                    self.stats.misses += 1
+                results.append(vector)
+        return results
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray):
+        with self._lock:
+            new_keys, new_rows = {}, []
+            for text, vector in zip(texts, vectors):
+                key = cache_key(self.model_version, text)
+                vector = np.asarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                # A text repeated within the batch is written once
+                if self._disk_enabled and key not in self._rows and key not in new_keys:
+                    new_keys[key] = len(new_rows)
+                    new_rows.append(vector)
+            if new_keys:
+                self._append(list(new_keys), np.vstack(new_rows))
+
+    def _append(self, keys: List[bytes], vectors: np.ndarray):
+        try:
+            if self._disk_rows + len(keys) > self.disk_capacity:
+                logger.info(f"Embedding disk cache full ({len(self._rows)} vectors) — starting over")
+                self._rows = {}
+                self._truncate(0)
+            start = self._disk_rows
+            with open(self._vectors_path, "ab") as f:
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            with open(self._keys_path, "ab") as f:
+                f.write(b"".join(keys))
+            self._disk_rows += len(keys)
+            for i, key in enumerate(keys):
+                self._rows[key] = start + i
+        except OSError as e:
+            logger.warning(f"Embedding disk cache write failed: {e}")
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            **self.stats.to_dict(),
+            "memory_items": len(self._memory),
+            "disk_items": len(self._rows),
+        }
+
+
+class EntityCache:
+    """Two-tier cache of NER results keyed by text hash and spaCy model.
+
+    Entities are stored as (name, label) pairs in an LRU and in a SQLite
+    table under DATA_DIR, so re-fetched text is never re-tagged.
+    """
+
+    def __init__(self, model_version: str, path: Optional[str] = None):
+        self.model_version = model_version
+        self.path = path or os.path.join(settings.data_dir, "entity_cache.sqlite")
+        self.memory_capacity = settings.entity_cache_memory_items
+        self.stats = CacheStats()
+        self._memory: "OrderedDict[bytes, List[Tuple[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS entities (key BLOB PRIMARY KEY, value BLOB NOT NULL)")
+        except sqlite3.Error as e:
+            logger.warning(f"Entity disk cache disabled — {e}")
+            self._db = None
+
+    def _remember(self, key: bytes, value: List[Tuple[str, str]]):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_capacity:
+            self._memory.popitem(last=False)
+
+    def get(self, text: str) -> Optional[List[Tuple[str, str]]]:
+        key = cache_key(self.model_version, text)
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return value
+            if self._db is not None:
+                try:
+                    row = self._db.execute("SELECT value FROM entities WHERE key = ?", (key,)).fetchone()
+                except sqlite3.Error:
+                    row = None
+                if row is not None:
+                    value = [tuple(pair) for pair in orjson.loads(row[0])]
+                    self._remember(key, value)
+                    self.stats.disk_hits += 1
+                    return value
+            self.stats.misses += 1
+            return None
+
+    def put(self, text: str, value: List[Tuple[str, str]]):
+        self.put_many([text], [value])
+
+    def put_many(self, texts: Sequence[str], values: Sequence[List[Tuple[str, str]]]):
+        """Cache a batch of results in one SQLite transaction."""
+        rows = []
+        with self._lock:
+            for text, value in zip(texts, values):
+                key = cache_key(self.model_version, text)
+                self._remember(key, value)
+                rows.append((key, orjson.dumps(value)))
+            if self._db is not None and rows:
+                try:
+                    self._db.executemany("INSERT OR REPLACE INTO entities (key, value) VALUES (?, ?)", rows)
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Entity disk cache write failed: {e}")
+
+    def get_stats(self) -> Dict[str, float]:
+        return {**self.stats.to_dict(), "memory_items": len(self._memory)}
@@ -1,35 +1,107 @@
+import asyncio
 import logging
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+from app.config import settings
 from app.models.schemas import Entity
+from app.services.enrichment_cache import EntityCache
 
 logger = logging.getLogger(__name__)
 
-try:
-    import spacy
-    nlp = spacy.load("en_core_web_sm")
-except Exception:
-    nlp = None
-    logger.warning("spaCy model not loaded — entity extraction disabled")
+SPACY_MODEL = "en_core_web_sm"
+ENTITY_LABELS = ("PERSON", "ORG", "GPE", "LOC", "NORP", "FAC", "EVENT")
+# Only tok2vec + ner are needed for entities; skip loading the rest
+UNUSED_COMPONENTS = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+MAX_TEXT_CHARS = 10000
+
+
+class EntityExtractor:
+    """Batched spaCy NER with a result cache.
+
+    Texts are tagged with nlp.pipe on a dedicated worker thread (optionally
+    fanning out to NER_PROCESSES processes for large batches), so
+    ingestors hand over all their texts at once and the event loop keeps
+    serving requests meanwhile.
+    """
+
+    def __init__(self):
+        self.nlp = None
+        self.cache: Optional[EntityCache] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ner")
+
+    def load(self) -> bool:
+        """Import spaCy and load the model; called from a warm-up thread, not at import."""
+        try:
+            import spacy
+            nlp = spacy.load(SPACY_MODEL, exclude=UNUSED_COMPONENTS)
+            self.cache = EntityCache(f"{nlp.meta['name']}-{nlp.meta['version']}")
+            self.nlp = nlp
+            logger.info(f"Loaded spaCy model: {SPACY_MODEL} ({', '.join(nlp.pipe_names)})")
+            return True
+        except Exception:
+            logger.warning("spaCy model not loaded — entity extraction disabled")
+            return False
+
+    def _tag_many(self, texts: List[str]) -> List[List[Tuple[str, str]]]:
+        n_process = settings.ner_processes if len(texts) >= settings.ner_multiprocess_min_texts else 1
+        results = []
+        docs = self.nlp.pipe(
+            (t[:MAX_TEXT_CHARS] for t in texts),
+            batch_size=settings.ner_batch_size,
+            n_process=max(1, n_process),
+        )
+        for doc in docs:
+            pairs = []
+            seen = set()
+            for ent in doc.ents:
+                if ent.label_ in ENTITY_LABELS:
+                    key = (ent.text.strip(), ent.label_)
+                    if key not in seen and len(key[0]) > 1:
+                        seen.add(key)
+                        pairs.append(key)
+            results.append(pairs)
+        return results
+
+    def extract_batch(
+        self, texts: Sequence[str], source_event_ids: Optional[Sequence[Optional[str]]] = None
+    ) -> List[List[Entity]]:
+        """Blocking batch extraction; one entity list per input text."""
+        if not self.nlp:
+            return [[] for _ in texts]
+        ids = source_event_ids or [None] * len(texts)
+        try:
+            pairs: List[Optional[List[Tuple[str, str]]]] = [
+                self.cache.get(t) if t else [] for t in texts
+            ]
+            missing = list(dict.fromkeys(t for t, p in zip(texts, pairs) if p is None))
+            if missing:
+                tagged = dict(zip(missing, self._tag_many(missing)))
+                self.cache.put_many(list(tagged), list(tagged.values()))
+                pairs = [tagged[t] if p is None else p for t, p in zip(texts, pairs)]
+        except Exception as e:
+            logger.error(f"Entity extraction failed: {e}")
+            return [[] for _ in texts]
+        return [
+            [Entity(name=name, type=label, source_event_id=event_id) for name, label in text_pairs]
+            for text_pairs, event_id in zip(pairs, ids)
+        ]
+
+    async def extract(
+        self, texts: Sequence[str], source_event_ids: Optional[Sequence[Optional[str]]] = None
+    ) -> List[List[Entity]]:
+        """Extract entities for all texts on the NER worker without blocking the event loop."""
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.extract_batch, list(texts), source_event_ids)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+ner_service = EntityExtractor()
 
 
 def extract_entities(text: str, source_event_id: str = None) -> List[Entity]:
-    if not nlp or not text:
-        return []
-    try:
-        doc = nlp(text[:10000])  # Limit input size
-        entities = []
-        seen = set()
-        for ent in doc.ents:
-            if ent.label_ in ("PERSON", "ORG", "GPE", "LOC", "NORP", "FAC", "EVENT"):
-                key = (ent.text.strip(), ent.label_)
-                if key not in seen and len(ent.text.strip()) > 1:
-                    seen.add(key)
-                    entities.append(Entity(
-                        name=ent.text.strip(),
-                        type=ent.label_,
-                        source_event_id=source_event_id
-                    ))
-        return entities
-    except Exception as e:
-        logger.error(f"Entity extraction failed: {e}")
-        return []
+    """Single-text convenience wrapper; prefer ner_service.extract() for batches."""
+    return ner_service.extract_batch([text], [source_event_id])[0]
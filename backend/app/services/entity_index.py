@@ -0,0 +1,206 @@
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from app.models.schemas import GeoEvent
+
+# Substring queries are answered from character n-grams of this length
+GRAM = 3
+# Marks word-prefix grams, which answer queries shorter than GRAM
+PREFIX = "^"
+
+
+def normalize(name: str) -> str:
+    """Case- and whitespace-insensitive form entity names are interned under."""
+    return " ".join(name.casefold().split())
+
+
+def entity_id(norm: str) -> str:
+    """Public id of a normalized name: the same name always gets the same id."""
+    return hashlib.blake2b(norm.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def name_grams(norm: str) -> Set[str]:
+    grams = {norm[i:i + GRAM] for i in range(len(norm) - GRAM + 1)}
+    for word in norm.split():
+        for n in range(1, GRAM):
+            grams.add(PREFIX + word[:n])
+    return grams
+
+
+def query_grams(norm: str) -> Set[str]:
+    if len(norm) < GRAM:
+        return {PREFIX + norm}
+    return {norm[i:i + GRAM] for i in range(len(norm) - GRAM + 1)}
+
+
+class EntityIndex:
+    """Inverted index from extracted entities to the store rows mentioning them.
+
+    Entity names are interned: each distinct normalized name gets a dense
+    integer slot, with a posting list of the rows (events) mentioning it,
+    mention counts per source and per entity type. A trigram index over the
+    names answers substring searches by intersecting a few posting sets
+    instead of scanning every event; queries shorter than a trigram match
+    word prefixes. Everything is updated as the event store upserts and
+    evicts, and a slot is recycled once its last event is gone. Slots stay
+    internal: callers see entity_id(), a hash of the normalized name, so an
+    id never comes to mean a different entity.
+    """
+
+    def __init__(self, source_names: Sequence[str], capacity: int = 1024):
+        self.source_names = list(source_names)
+        self.slots: Dict[str, int] = {}  # normalized name -> slot
+        self.by_id: Dict[str, int] = {}  # public entity id -> slot
+        self.ids: List[Optional[str]] = []  # slot -> public entity id
+        self.names: List[Optional[str]] = []  # slot -> name as first seen
+        self.norms: List[Optional[str]] = []
+        self.types: List[Dict[str, int]] = []  # slot -> mentions per entity type
+        self.postings: List[Set[int]] = []  # slot -> store rows
+        self.grams: Dict[str, Set[int]] = {}  # n-gram -> slots
+        self.counts = np.zeros((capacity, len(self.source_names)), dtype=np.int32)
+        self.by_row: Dict[int, Tuple[Tuple[int, str], ...]] = {}  # store row -> (slot, type) it mentions
+        self.free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def _intern(self, name: str, norm: str) -> int:
+        slot = self.slots.get(norm)
+        if slot is not None:
+            return slot
+        if self.free:
+            slot = self.free.pop()
+            self.names[slot], self.norms[slot], self.ids[slot] = name, norm, entity_id(norm)
+            self.types[slot], self.postings[slot] = {}, set()
+        else:
+            slot = len(self.names)
+            self.names.append(name)
+            self.norms.append(norm)
+            self.ids.append(entity_id(norm))
+            self.types.append({})
+            self.postings.append(set())
+            if slot >= len(self.counts):
+                counts = np.zeros((len(self.counts) * 2, len(self.source_names)), dtype=np.int32)
+                counts[:len(self.counts)] = self.counts
+                self.counts = counts
+        self.slots[norm] = slot
+        self.by_id[self.ids[slot]] = slot
+        for gram in name_grams(norm):
+            self.grams.setdefault(gram, set()).add(slot)
+        return slot
+
+    def _release(self, slot: int):
+        norm = self.norms[slot]
+        for gram in name_grams(norm):
+            members = self.grams.get(gram)
+            if members is not None:
+                members.discard(slot)
+                if not members:
+                    del self.grams[gram]
+        del self.slots[norm]
+        del self.by_id[self.ids[slot]]
+        self.names[slot] = self.norms[slot] = self.ids[slot] = None
+        self.types[slot] = {}
+        self.free.append(slot)
+
+    # Writes
+
+    def add(self, rows: Iterable[int], events: Iterable[GeoEvent], sources: Iterable[int]):
+        for row, event, source in zip(rows, events, sources):
+            mentioned: Dict[int, str] = {}
+            for entity in event.entities:
+                norm = normalize(entity.name)
+                if norm:
+                    mentioned.setdefault(self._intern(entity.name.strip(), norm), entity.type)
+            if not mentioned:
+                continue
+            for slot, entity_type in mentioned.items():
+                self.postings[slot].add(row)
+                self.counts[slot, source] += 1
+                types = self.types[slot]
+                types[entity_type] = types.get(entity_type, 0) + 1
+            self.by_row[row] = tuple(mentioned.items())
+
+    def remove(self, rows: Iterable[int], sources: Iterable[int]):
+        for row, source in zip(rows, sources):
+            for slot, entity_type in self.by_row.pop(row, ()):
+                postings = self.postings[slot]
+                postings.discard(row)
+                self.counts[slot, source] -= 1
+                if not postings:
+                    self._release(slot)
+                    continue
+                types = self.types[slot]
+                types[entity_type] -= 1
+                if not types[entity_type]:
+                    del types[entity_type]
+
+    # Reads
+
+    def lookup(self, name: str) -> Optional[int]:
+        return self.slots.get(normalize(name))
+
+    def slot_of(self, public_id: str) -> Optional[int]:
+        """Slot of an entity id, or None if no event in the store mentions it."""
+        return self.by_id.get(public_id)
+
+    def rows(self, slot: int) -> Set[int]:
+        if not 0 <= slot < len(self.names) or self.names[slot] is None:
+            return set()
+        return self.postings[slot]
+
+    def entities_of(self, row: int) -> List[int]:
+        return [slot for slot, _ in self.by_row.get(row, ())]
+
+    def search(self, q: str, limit: int = 50) -> List[int]:
+        """Slots of entities whose name contains `q`, most mentioned first.
+
+        Queries shorter than a trigram match the start of any word in the
+        name instead. An exact name match always comes first.
+        """
+        norm = normalize(q)
+        if not norm or limit <= 0:
+            return []
+        sets = [self.grams.get(gram) for gram in query_grams(norm)]
+        if any(s is None for s in sets):
+            return []
+        sets.sort(key=len)
+        found = sets[0].intersection(*sets[1:])
+        if len(norm) > GRAM:
+            # Trigrams can all occur without being contiguous
+            norms = self.norms
+            found = [slot for slot in found if norm in norms[slot]]
+        if not found:
+            return []
+        slots = np.fromiter(found, dtype=np.int64, count=len(found))
+        totals = self.counts[slots].sum(axis=1)
+        if len(slots) > limit:
+            top = np.argpartition(-totals, limit - 1)[:limit]
+            slots, totals = slots[top], totals[top]
+        ranked = slots[np.argsort(-totals, kind="stable")].tolist()
+        exact = self.slots.get(norm)
+        if exact is not None:
+            if exact in ranked:
+                ranked.remove(exact)
+            ranked = [exact] + ranked[:limit - 1]
+        return ranked
+
+    def describe(self, slot: int) -> Optional[Dict[str, Any]]:
+        if not 0 <= slot < len(self.names) or self.names[slot] is None:
+            return None
+        counts = self.counts[slot]
+        types = self.types[slot]
+        return {
+            "id": self.ids[slot],
+            "name": self.names[slot],
+            "type": max(types, key=types.get) if types else None,
+            "event_count": len(self.postings[slot]),
+            "by_source": {self.source_names[i]: int(n) for i, n in enumerate(counts) if n},
+        }
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "entities": len(self.slots),
+            "grams": len(self.grams),
+            "postings": sum(len(rows) for rows in self.by_row.values()),
+        }
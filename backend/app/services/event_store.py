@@ -0,0 +1,491 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import numpy as np
+from app.config import settings
+from app.models.schemas import EventSource, EventType, GeoEvent
+from app.services.entity_index import EntityIndex
+from app.services.spatial_index import (
+    BBox, GridIndex, HALF_CIRCUMFERENCE_KM, KM_PER_DEGREE, bbox_mask, circle_bbox, haversine_km,
+)
+from app.services.time_index import NEXT, PREV, TimeIndex, decode_cursor, encode_cursor, id_key
+
+SOURCES = list(EventSource)
+EVENT_TYPES = list(EventType)
+SEVERITIES = ["", "low", "medium", "high", "critical"]
+SOURCE_CODES = {s: i for i, s in enumerate(SOURCES)}
+TYPE_CODES = {t: i for i, t in enumerate(EVENT_TYPES)}
+SEVERITY_CODES = {s: i for i, s in enumerate(SEVERITIES)}
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Rows sampled to estimate how selective a range predicate is
+SAMPLE_SIZE = 1024
+# Use an index for the leading predicate when it keeps at most this fraction
+INDEX_MAX_SELECTIVITY = 0.05
+
+
+def epoch_us(dt: datetime) -> int:
+    """Microseconds since the epoch; naive datetimes are taken as UTC."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - EPOCH) // timedelta(microseconds=1)
+
+
+class Predicate(NamedTuple):
+    # Mask over the given rows, or over every row when passed None
+    test: Callable[[Optional[np.ndarray]], np.ndarray]
+    selectivity: float  # Estimated fraction of live rows that pass
+    # Index lookup returning a superset of the matching rows, if one exists
+    candidates: Optional[Callable[[], np.ndarray]] = None
+
+
+class Page(NamedTuple):
+    total: int  # All matches of the filters, regardless of cursor
+    events: List[GeoEvent]
+    next_cursor: Optional[str]  # Older events
+    prev_cursor: Optional[str]  # Newer events
+
+
+class EventStore:
+    """In-memory store of recent events, indexed by column arrays.
+
+    Filterable fields live in NumPy columns (float64 lat/lon with NaN for
+    "no position", int64 microsecond timestamps, int8 codes for source,
+    type and severity), next to an object column holding the GeoEvents and
+    an id→row map. A query runs its predicates as vectorized masks, most
+    selective first. The first one scans the column, and each later one
+    only tests the rows still left.
+
+    Rows are ordered by ingestion sequence, so re-ingesting an event moves
+    it to the front like a fresh one. A source holding more than
+    MAX_EVENTS_PER_SOURCE events loses its least recently ingested ones
+    first, then beyond MAX_EVENTS the least recently ingested events
+    overall are evicted. Evicted rows are reused.
+    """
+
+    def __init__(
+        self, max_events: Optional[int] = None, capacity: int = 4096, max_per_source: Optional[int] = None,
+    ):
+        self.max_events = max_events or settings.max_events
+        self.max_per_source = settings.max_events_per_source if max_per_source is None else max_per_source
+        self.index: Dict[str, int] = {}
+        self.size = 0  # Rows in use, including freed ones below the high-water mark
+        self.free: List[int] = []
+        self.source_counts = np.zeros(len(SOURCES), dtype=np.int64)
+        self.type_counts = np.zeros(len(EVENT_TYPES), dtype=np.int64)
+        self._seq = 0
+        self._sample: Optional[np.ndarray] = None
+        self._rng = np.random.default_rng()
+        self.grid = GridIndex(settings.event_grid_degrees)
+        self.timeline = TimeIndex()
+        self.entities = EntityIndex([s.value for s in SOURCES])
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        self.capacity = capacity
+        self.columns: Dict[str, np.ndarray] = {
+            "lat": np.full(capacity, np.nan),
+            "lon": np.full(capacity, np.nan),
+            "ts": np.zeros(capacity, dtype=np.int64),
+            "key": np.zeros(capacity, dtype=np.int64),  # id hash, the timeline's tiebreaker
+            "seq": np.full(capacity, -1, dtype=np.int64),  # -1 marks a free row
+            "source": np.zeros(capacity, dtype=np.int8),
+            "event_type": np.zeros(capacity, dtype=np.int8),
+            "severity": np.zeros(capacity, dtype=np.int8),
+            "cell": np.full(capacity, -1, dtype=np.int32),  # Spatial grid cell, -1 when unplaced
+        }
+        self.events = np.empty(capacity, dtype=object)
+
+    def _grow(self, needed: int):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        old_columns, old_events, size = self.columns, self.events, self.size
+        self._allocate(capacity)
+        for name, column in old_columns.items():
+            self.columns[name][:size] = column[:size]
+        self.events[:size] = old_events[:size]
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[GeoEvent]:
+        """Events, most recently ingested first."""
+        return iter(self.events[self._ordered(self._live())].tolist())
+
+    def __contains__(self, event_id: str) -> bool:
+        return event_id in self.index
+
+    def get(self, event_id: str) -> Optional[GeoEvent]:
+        row = self.index.get(event_id)
+        return self.events[row] if row is not None else None
+
+    def _live(self) -> np.ndarray:
+        return np.flatnonzero(self.columns["seq"][:self.size] >= 0)
+
+    def _ordered(self, rows: np.ndarray) -> np.ndarray:
+        return rows[np.argsort(-self.columns["seq"][rows], kind="stable")]
+
+    # Writes
+
+    def upsert(self, events: List[GeoEvent]):
+        """Add a batch of new or updated events; events[0] becomes the newest."""
+        batch: Dict[str, GeoEvent] = {}
+        for event in events:
+            batch.setdefault(event.id, event)
+        if not batch:
+            return
+        events = list(batch.values())
+
+        index = self.index
+        rows = np.empty(len(events), dtype=np.int64)
+        next_row = self.size
+        for i, event in enumerate(events):
+            row = index.get(event.id)
+            if row is None:
+                row = self.free.pop() if self.free else None
+                if row is None:
+                    row = next_row
+                    next_row += 1
+                index[event.id] = row
+            rows[i] = row
+        if next_row > self.capacity:
+            self._grow(next_row)
+        self.size = next_row
+
+        c = self.columns
+        # Updated events stop counting under their old source/type
+        replaced = rows[c["seq"][rows] >= 0]
+        np.subtract.at(self.source_counts, c["source"][replaced], 1)
+        np.subtract.at(self.type_counts, c["event_type"][replaced], 1)
+        self.timeline.remove(replaced)
+        self.entities.remove(replaced.tolist(), c["source"][replaced].tolist())
+
+        sources = np.array([SOURCE_CODES[e.source] for e in events], dtype=np.int8)
+        types = np.array([TYPE_CODES[e.event_type] for e in events], dtype=np.int8)
+        lat = np.array([np.nan if e.lat is None else e.lat for e in events], dtype=np.float64)
+        lon = np.array([np.nan if e.lon is None else e.lon for e in events], dtype=np.float64)
+        c["lat"][rows] = lat
+        c["lon"][rows] = lon
+        cells = self.grid.cell_of(lat, lon)
+        self.grid.move(rows.tolist(), c["cell"][rows].tolist(), cells.tolist())
+        c["cell"][rows] = cells
+        c["ts"][rows] = [epoch_us(e.timestamp) for e in events]
+        c["key"][rows] = [id_key(e.id) for e in events]
+        c["source"][rows] = sources
+        c["event_type"][rows] = types
+        c["severity"][rows] = [SEVERITY_CODES.get((e.severity or "").lower(), 0) for e in events]
+        c["seq"][rows] = self._seq + np.arange(len(events), 0, -1)
+        self._seq += len(events)
+        for row, event in zip(rows.tolist(), events):
+            # Assigned one by one: NumPy would unpack pydantic models as sequences
+            self.events[row] = event
+        np.add.at(self.source_counts, sources, 1)
+        np.add.at(self.type_counts, types, 1)
+        self.timeline.add(rows, c["ts"][rows], c["key"][rows])
+        self.entities.add(rows.tolist(), events, sources.tolist())
+
+        if self.max_per_source > 0:
+            for code in np.flatnonzero(self.source_counts > self.max_per_source).tolist():
+                self._evict(int(self.source_counts[code]) - self.max_per_source, source=code)
+        if len(index) > self.max_events:
+            self._evict(len(index) - self.max_events)
+        self._sample = None
+
+    def _evict(self, count: int, source: Optional[int] = None):
+        """Drop the `count` least recently ingested events, optionally of one source code."""
+        live = self._live()
+        if source is not None:
+            live = live[self.columns["source"][live] == source]
+        seq = self.columns["seq"][live]
+        rows = live[np.argpartition(seq, count - 1)[:count]] if count < len(live) else live
+        c = self.columns
+        np.subtract.at(self.source_counts, c["source"][rows], 1)
+        np.subtract.at(self.type_counts, c["event_type"][rows], 1)
+        for event in self.events[rows]:
+            del self.index[event.id]
+        self.grid.remove(rows.tolist(), c["cell"][rows].tolist())
+        self.timeline.remove(rows)
+        self.entities.remove(rows.tolist(), c["source"][rows].tolist())
+        c["cell"][rows] = -1
+        c["seq"][rows] = -1
+        c["lat"][rows] = np.nan
+        c["lon"][rows] = np.nan
+        self.events[rows] = None
+        self.free.extend(rows.tolist())
+
+    # Queries
+
+    def _column(self, name: str, rows: Optional[np.ndarray]) -> np.ndarray:
+        """A column over all rows (rows=None) or over the given rows."""
+        column = self.columns[name]
+        return column[:self.size] if rows is None else column[rows]
+
+    def _estimate(self, test: Callable[[Optional[np.ndarray]], np.ndarray]) -> float:
+        if self._sample is None:
+            live = self._live()
+            self._sample = live[self._rng.integers(0, len(live), SAMPLE_SIZE)] if len(live) else live
+        if not len(self._sample):
+            return 0.0
+        return float(np.count_nonzero(test(self._sample))) / len(self._sample)
+
+    def _predicates(
+        self,
+        sources: Optional[Iterable[EventSource]] = None,
+        event_types: Optional[Iterable[EventType]] = None,
+        severities: Optional[Iterable[str]] = None,
+        min_lat: Optional[float] = None,
+        max_lat: Optional[float] = None,
+        min_lon: Optional[float] = None,
+        max_lon: Optional[float] = None,
+        near: Optional[Tuple[float, float, float]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[Predicate]:
+        predicates: List[Predicate] = []
+        live = max(len(self.index), 1)
+
+        def codes_predicate(column: str, codes: List[int], counts: Optional[np.ndarray]):
+            wanted = np.array(codes, dtype=np.int8)
+            if len(wanted) == 1:
+                test = lambda rows: self._column(column, rows) == wanted[0]
+            else:
+                test = lambda rows: np.isin(self._column(column, rows), wanted)
+            if counts is not None:
+                selectivity = float(counts[wanted].sum()) / live
+            else:
+                selectivity = self._estimate(test)
+            predicates.append(Predicate(test, selectivity))
+
+        def spatial_predicate(bbox: BBox, test: Callable[[Optional[np.ndarray]], np.ndarray]):
+            predicates.append(Predicate(test, self._estimate(test), lambda: self.grid.candidates(bbox)))
+
+        if sources is not None:
+            codes_predicate("source", [SOURCE_CODES[EventSource(s)] for s in sources], self.source_counts)
+        if event_types is not None:
+            codes_predicate("event_type", [TYPE_CODES[EventType(t)] for t in event_types], self.type_counts)
+        if severities is not None:
+            # An unknown severity matches nothing; only None or "" selects events without one
+            codes_predicate("severity", [SEVERITY_CODES.get((s or "").lower(), -1) for s in severities], None)
+        if any(bound is not None for bound in (min_lat, max_lat, min_lon, max_lon)):
+            bbox = (
+                -90.0 if min_lat is None else min_lat,
+                90.0 if max_lat is None else max_lat,
+                -180.0 if min_lon is None else min_lon,
+                180.0 if max_lon is None else max_lon,
+            )
+            spatial_predicate(bbox, lambda rows: bbox_mask(self._column("lat", rows), self._column("lon", rows), bbox))
+        if near is not None:
+            lat, lon, radius_km = near
+            spatial_predicate(
+                circle_bbox(lat, lon, radius_km),
+                lambda rows: haversine_km(self._column("lat", rows), self._column("lon", rows), lat, lon) <= radius_km,
+            )
+        if since is not None or until is not None:
+            low = epoch_us(since) if since is not None else None
+            high = epoch_us(until) if until is not None else None
+            lo, hi = self.timeline.span(low, high)
+
+            def test(rows: Optional[np.ndarray]) -> np.ndarray:
+                col = self._column("ts", rows)
+                mask = np.ones(len(col), dtype=bool)
+                if low is not None:
+                    mask &= col >= low
+                if high is not None:
+                    mask &= col <= high
+                return mask
+
+            # The timeline gives the exact count and the rows themselves
+            predicates.append(Predicate(test, (hi - lo) / live, lambda: self.timeline.rows[lo:hi]))
+        return predicates
+
+    def select(self, **filters) -> np.ndarray:
+        """Rows of live events matching all filters, in no particular order.
+
+        Filters: sources, event_types, severities (collections), min_lat,
+        max_lat, min_lon, max_lon (min_lon > max_lon crosses the
+        antimeridian), near=(lat, lon, radius_km), since and until. Events
+        without a position never match a spatial filter.
+        """
+        return self._run(self._predicates(**filters))
+
+    def _run(self, predicates: List[Predicate]) -> np.ndarray:
+        predicates = sorted(predicates, key=lambda p: p.selectivity)
+        if not predicates:
+            return self._live()
+        first, rest = predicates[0], predicates[1:]
+        if first.candidates is not None and first.selectivity <= INDEX_MAX_SELECTIVITY:
+            # Selective enough that gathering from the index beats a column scan
+            rows = first.candidates()
+            rows = rows[first.test(rows)]
+        else:
+            rows = np.flatnonzero(first.test(None) & (self.columns["seq"][:self.size] >= 0))
+        for predicate in rest:
+            if not len(rows):
+                break
+            rows = rows[predicate.test(rows)]
+        return rows
+
+    def nearest(self, lat: float, lon: float, k: int = 10, **filters) -> List[Tuple[GeoEvent, float]]:
+        """The k events nearest to a point as (event, distance_km), closest first.
+
+        Searches a growing radius until it holds k matches, so only events
+        near the point are ever distance-tested.
+        """
+        radius = max(self.grid.cell_degrees * KM_PER_DEGREE, 50.0)
+        while True:
+            rows = self.select(near=(lat, lon, radius), **filters)
+            if len(rows) >= k or radius >= HALF_CIRCUMFERENCE_KM:
+                break
+            radius = min(radius * 4, HALF_CIRCUMFERENCE_KM)
+        distances = haversine_km(self._column("lat", rows), self._column("lon", rows), lat, lon)
+        if len(rows) > k:
+            top = np.argpartition(distances, k - 1)[:k]
+            rows, distances = rows[top], distances[top]
+        order = np.argsort(distances, kind="stable")
+        return [(self.events[row], float(d)) for row, d in zip(rows[order].tolist(), distances[order].tolist())]
+
+    def query(self, limit: Optional[int] = None, offset: int = 0, **filters) -> Tuple[int, List[GeoEvent]]:
+        """(total matches, one page of matching events), most recently ingested first."""
+        rows = self.select(**filters)
+        total = len(rows)
+        end = total if limit is None else min(total, offset + limit)
+        if end <= offset:
+            return total, []
+        if end < total:
+            # Only the first `end` rows need ordering
+            keep = np.argpartition(-self.columns["seq"][rows], end - 1)[:end]
+            rows = rows[keep]
+        rows = self._ordered(rows)[offset:end]
+        return total, self.events[rows].tolist()
+
+    def page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        **filters,
+    ) -> Page:
+        """One page of matching events, newest timestamp first, with keyset cursors.
+
+        A cursor encodes the (timestamp, id) of the page edge it came from,
+        so the next page starts right after it no matter what was ingested
+        meanwhile. Finding the edge is a binary search on the timeline.
+        `offset` applies only without a cursor. Raises ValueError for a
+        malformed cursor.
+        """
+        direction, at = NEXT, None
+        if cursor:
+            direction, ts, key = decode_cursor(cursor)
+            at = (ts, key)
+            offset = 0
+        lo, hi = self.timeline.span(
+            epoch_us(since) if since is not None else None,
+            epoch_us(until) if until is not None else None,
+        )
+        predicates = self._predicates(**filters)
+        total = hi - lo if not predicates else len(self._run(predicates + self._predicates(since=since, until=until)))
+        if at is not None:
+            if direction == NEXT:
+                hi = min(hi, self.timeline.position(*at, side="left"))
+            else:
+                lo = max(lo, self.timeline.position(*at, side="right"))
+
+        take = offset + limit + 1  # One extra tells whether another page exists
+        rows = self._scan(lo, hi, take, direction == NEXT, predicates)
+        has_more = len(rows) >= take
+        if direction == NEXT:
+            rows = rows[offset:offset + limit]
+        else:
+            rows = rows[:limit][::-1]
+
+        c = self.columns
+
+        def edge(d: str, row: int) -> str:
+            return encode_cursor(d, int(c["ts"][row]), int(c["key"][row]))
+
+        # Newer matches exist past an offset, above a NEXT cursor, or beyond a full PREV page
+        newer = offset > 0 if at is None else direction == NEXT or has_more
+        if len(rows):
+            next_cursor = edge(NEXT, rows[-1]) if has_more or direction == PREV else None
+            prev_cursor = edge(PREV, rows[0]) if newer else None
+        else:
+            next_cursor = encode_cursor(NEXT, *at) if at is not None and direction == PREV else None
+            prev_cursor = encode_cursor(PREV, *at) if at is not None and direction == NEXT else None
+        return Page(total, self.events[rows].tolist(), next_cursor, prev_cursor)
+
+    def _scan(self, lo: int, hi: int, take: int, newest_first: bool, predicates: List[Predicate]) -> np.ndarray:
+        """Up to `take` matching rows of timeline[lo:hi], moving away from the cursor.
+
+        Newest first walks down from hi, otherwise up from lo. Broad filters
+        walk the timeline in growing chunks and stop once `take` rows match.
+        Selective ones match first and order the few hits by timeline position.
+        """
+        timeline = self.timeline.rows
+        if not predicates:
+            return timeline[max(lo, hi - take):hi][::-1] if newest_first else timeline[lo:min(hi, lo + take)]
+
+        selectivity = float(np.prod([p.selectivity for p in predicates]))
+        expected = take / max(selectivity, 1e-9)  # Timeline entries to walk
+        if expected < (hi - lo) / 4 or hi - lo <= len(self.index) / 4:
+            predicates = sorted(predicates, key=lambda p: p.selectivity)
+            found: List[np.ndarray] = []
+            count, chunk = 0, max(256, int(expected))
+            pos = hi if newest_first else lo
+            while count < take and (pos > lo if newest_first else pos < hi):
+                if newest_first:
+                    start = max(lo, pos - chunk)
+                    part, pos = timeline[start:pos][::-1], start
+                else:
+                    end = min(hi, pos + chunk)
+                    part, pos = timeline[pos:end], end
+                for predicate in predicates:
+                    if not len(part):
+                        break
+                    part = part[predicate.test(part)]
+                found.append(part)
+                count += len(part)
+                chunk *= 2
+            return np.concatenate(found)[:take] if found else np.empty(0, dtype=np.int64)
+
+        rows = self._run(predicates)
+        ts, key = self.columns["ts"][rows], self.columns["key"][rows]
+        inside = np.ones(len(rows), dtype=bool)
+        edges = self.timeline.keys
+        if lo < len(edges):
+            first_ts, first_key = edges[lo]
+            inside &= (ts > first_ts) | ((ts == first_ts) & (key >= first_key))
+        if hi < len(edges):
+            end_ts, end_key = edges[hi]
+            inside &= (ts < end_ts) | ((ts == end_ts) & (key < end_key))
+        rows, ts, key = rows[inside], ts[inside], key[inside]
+        order = np.lexsort((key, ts))
+        return rows[order[::-1][:take] if newest_first else order[:take]]
+
+    def entity_events(
+        self, entity_id: str, limit: int, offset: int = 0, sources: Optional[Iterable[EventSource]] = None,
+    ) -> Tuple[int, List[GeoEvent]]:
+        """(total, one page of events) mentioning an entity, newest timestamp first."""
+        slot = self.entities.slot_of(entity_id)
+        postings = self.entities.rows(slot) if slot is not None else set()
+        rows = np.fromiter(postings, dtype=np.int64, count=len(postings))
+        c = self.columns
+        if sources is not None:
+            wanted = np.array([SOURCE_CODES[EventSource(s)] for s in sources], dtype=np.int8)
+            rows = rows[np.isin(c["source"][rows], wanted)]
+        order = np.lexsort((c["key"][rows], c["ts"][rows]))[::-1][offset:offset + limit]
+        return len(rows), self.events[rows[order]].tolist()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "events": len(self.index),
+            "capacity": self.capacity,
+            "spatial_index": self.grid.get_stats(),
+            "entity_index": self.entities.get_stats(),
+            "by_source": {SOURCES[i].value: int(n) for i, n in enumerate(self.source_counts) if n},
+            "by_type": {EVENT_TYPES[i].value: int(n) for i, n in enumerate(self.type_counts) if n},
+        }
+
+
+event_store = EventStore()
@@ -0,0 +1,259 @@
+"""Offline gazetteer: country centroids and a memory-mapped place-name index.
+
+Countries come from the bundled ``app/data/countries.csv``. Places come from
+a GeoNames cities dump, indexed at image build time with::
+
+    python -m app.services.gazetteer build cities15000.zip /app/gazetteer
+"""
+import csv
+import io
+import json
+import logging
+import os
+import re
+import time
+import unicodedata
+import zipfile
+from typing import Dict, Iterator, List, NamedTuple, Optional
+import numpy as np
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+COUNTRIES_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "countries.csv")
+KEY_BYTES = 48  # normalized names are truncated to this many UTF-8 bytes
+NAME_BYTES = 64
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize(name: str) -> str:
+    """Case-, accent- and punctuation-insensitive form of a place name."""
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_WORD.sub(" ", stripped.casefold()).replace("_", " ").strip()
+
+
+def _key(name: str) -> bytes:
+    return normalize(name).encode("utf-8")[:KEY_BYTES]
+
+
+class Place(NamedTuple):
+    name: str
+    lat: float
+    lon: float
+    country: str  # ISO 3166-1 alpha-2
+    population: int
+    kind: str  # "country" or "place"
+
+
+class Gazetteer:
+    """Resolves place names and country codes to coordinates without network calls.
+
+    The place index is a set of .npy columns sorted by normalized name (ties
+    by descending population), opened memory-mapped. A lookup is a binary
+    search over the key column, so it takes microseconds and the index costs
+    no resident memory until pages are touched. Without a built index only
+    countries resolve.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.gazetteer_dir
+        self._country_codes: Optional[Dict[str, Place]] = None
+        self._country_names: Optional[Dict[str, Place]] = None
+        self._columns: Optional[Dict[str, np.ndarray]] = None
+        self._loaded = False
+
+    # Countries
+
+    def _load_countries(self):
+        codes: Dict[str, Place] = {}
+        names: Dict[str, Place] = {}
+        with open(COUNTRIES_CSV, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                place = Place(row["name"], float(row["lat"]), float(row["lon"]), row["iso2"], 0, "country")
+                codes[row["iso2"].lower()] = place
+                codes[row["iso3"].lower()] = place
+                for name in [row["name"], *filter(None, row["aliases"].split(";"))]:
+                    names.setdefault(normalize(name), place)
+        self._country_codes, self._country_names = codes, names
+
+    def country(self, code_or_name: str) -> Optional[Place]:
+        """Centroid of a country given its ISO2/ISO3 code or (common) name."""
+        if not code_or_name:
+            return None
+        if self._country_codes is None:
+            self._load_countries()
+        text = code_or_name.strip()
+        return self._country_codes.get(text.lower()) or self.country_named(text)
+
+    def country_named(self, name: str) -> Optional[Place]:
+        """Centroid of a country by name or common alias only (never by code)."""
+        if self._country_names is None:
+            self._load_countries()
+        return self._country_names.get(normalize(name))
+
+    # Places
+
+    def _load(self) -> Optional[Dict[str, np.ndarray]]:
+        if not self._loaded:
+            self._loaded = True
+            try:
+                self._columns = {
+                    name: np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+                    for name in ("keys", "names", "lat", "lon", "country", "population")
+                }
+                logger.info(f"Gazetteer: {len(self._columns['keys'])} place names from {self.path}")
+            except FileNotFoundError:
+                logger.info(f"Gazetteer: no place index at {self.path} — resolving countries only")
+                self._columns = None
+            except Exception as e:
+                logger.warning(f"Gazetteer: could not open place index at {self.path}: {e}")
+                self._columns = None
+        return self._columns
+
+    def _place(self, i: int, c: Dict[str, np.ndarray]) -> Place:
+        return Place(
+            c["names"][i].decode("utf-8", errors="replace"),
+            round(float(c["lat"][i]), 5),
+            round(float(c["lon"][i]), 5),
+            c["country"][i].decode("ascii"),
+            int(c["population"][i]),
+            "place",
+        )
+
+    def _range(self, key: bytes, prefix: bool = False):
+        c = self._load()
+        if c is None or not key:
+            return c, 0, 0
+        keys = c["keys"]
+        start = int(np.searchsorted(keys, key, side="left"))
+        if prefix:
+            end = int(np.searchsorted(keys, key + b"\xff", side="left"))
+        else:
+            end = int(np.searchsorted(keys, key, side="right"))
+        return c, start, end
+
+    def place(self, name: str, country: Optional[str] = None) -> Optional[Place]:
+        """Best place for a name: an exact spelling first, then any normalized match.
+
+        Among equal candidates the most populous wins; `country` (ISO2)
+        restricts the match.
+        """
+        c, start, end = self._range(_key(name))
+        if start == end:
+            return None
+        rows = range(start, end)
+        if country:
+            wanted = country.upper().encode("ascii", errors="ignore")
+            rows = [i for i in rows if c["country"][i] == wanted]
+            if not rows:
+                return None
+        exact = name.strip().encode("utf-8")[:NAME_BYTES]
+        best = next((i for i in rows if c["names"][i] == exact), rows[0])
+        return self._place(best, c)
+
+    def prefix(self, text: str, limit: int = 10) -> List[Place]:
+        """Most populous places whose normalized name starts with text."""
+        c, start, end = self._range(_key(text), prefix=True)
+        if start == end:
+            return []
+        population = np.asarray(c["population"][start:end], dtype=np.int64)
+        if len(population) > limit:
+            top = np.argpartition(-population, limit - 1)[:limit]
+        else:
+            top = np.arange(len(population))
+        top = top[np.argsort(-population[top], kind="stable")]
+        return [self._place(start + int(i), c) for i in top]
+
+    def resolve(self, name: str) -> Optional[Place]:
+        """A country or place for a free-text location name (e.g. a GPE entity)."""
+        return self.country_named(name) or self.place(name)
+
+    def get_stats(self) -> Dict[str, int]:
+        if self._country_codes is None:
+            self._load_countries()
+        c = self._load()
+        return {
+            "countries": len({p.country for p in self._country_codes.values()}),
+            "places": len(c["keys"]) if c is not None else 0,
+        }
+
+
+def _geonames_rows(source: str) -> Iterator[List[str]]:
+    """Rows of a GeoNames dump (.txt, or a .zip holding one)."""
+    if source.endswith(".zip"):
+        with zipfile.ZipFile(source) as archive:
+            member = next(n for n in archive.namelist() if n.endswith(".txt"))
+            with archive.open(member) as raw:
+                for line in io.TextIOWrapper(raw, encoding="utf-8"):
+                    yield line.rstrip("\n").split("\t")
+    else:
+        with open(source, encoding="utf-8") as f:
+            for line in f:
+                yield line.rstrip("\n").split("\t")
+
+
+def build_index(source: str, out_dir: str, alternates: bool = False, min_population: int = 0) -> int:
+    """Build the memory-mapped place index from a GeoNames cities dump."""
+    keys, names, lats, lons, countries, populations = [], [], [], [], [], []
+    for row in _geonames_rows(source):
+        if len(row) < 15:
+            continue
+        population = int(row[14] or 0)
+        if population < min_population:
+            continue
+        spellings = {row[1], row[2]}
+        if alternates:
+            spellings.update(n for n in row[3].split(",") if n)
+        seen = set()
+        for spelling in spellings:
+            key = _key(spelling)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            keys.append(key)
+            names.append(row[1].encode("utf-8")[:NAME_BYTES])
+            lats.append(float(row[4]))
+            lons.append(float(row[5]))
+            countries.append(row[8].encode("ascii", errors="ignore")[:2])
+            populations.append(population)
+
+    keys_arr = np.array(keys, dtype=f"S{KEY_BYTES}")
+    population_arr = np.array(populations, dtype=np.uint32)
+    # Sort by key, most populous first among equal keys
+    order = np.lexsort((-population_arr.astype(np.int64), keys_arr))
+    columns = {
+        "keys": keys_arr[order],
+        "names": np.array(names, dtype=f"S{NAME_BYTES}")[order],
+        "lat": np.array(lats, dtype=np.float32)[order],
+        "lon": np.array(lons, dtype=np.float32)[order],
+        "country": np.array(countries, dtype="S2")[order],
+        "population": population_arr[order],
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    for name, column in columns.items():
+        np.save(os.path.join(out_dir, f"{name}.npy"), column)
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump({"source": os.path.basename(source), "places": len(keys), "built_at": time.time()}, f)
+    return len(keys)
+
+
+gazetteer = Gazetteer()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the offline gazetteer index from a GeoNames dump")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("source", help="GeoNames dump, e.g. cities15000.zip")
+    build.add_argument("out_dir", nargs="?", default=settings.gazetteer_dir)
+    build.add_argument("--alternates", action="store_true", help="Also index alternate names (much larger)")
+    build.add_argument("--min-population", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    count = build_index(args.source, args.out_dir, args.alternates, args.min_population)
+    print(f"Indexed {count} place names into {args.out_dir} in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,304 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.config import settings
+from app.services.enrichment_cache import CacheStats, normalize_text
+from app.services.http_client import FeedHttpClient, http_client
+
+logger = logging.getLogger(__name__)
+
+Coordinates = Tuple[float, float]
+# Memory-tier marker for a cached "no such place" answer
+NOT_FOUND = (None, None)
+
+
+class TokenBucket:
+    """Async token bucket: acquire() waits until a request is allowed."""
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class GeocodeProvider(ABC):
+    """A place-name search API with its own request budget."""
+
+    name = "base"
+
+    def __init__(self, rate: float):
+        self.bucket = TokenBucket(rate)
+
+    @abstractmethod
+    async def lookup(self, http: FeedHttpClient, place: str) -> Optional[Coordinates]:
+        """Coordinates of place, or None if the provider does not know it.
+
+        Raises on transport errors and error statuses, which are not cached.
+        """
+
+
+class NominatimProvider(GeocodeProvider):
+    name = "nominatim"
+
+    async def lookup(self, http: FeedHttpClient, place: str) -> Optional[Coordinates]:
+        resp = await http.get(
+            "https://nominatim.openstreetmap.org/search",
+            params={"q": place, "format": "json", "limit": 1},
+            follow_redirects=True,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        if not data:
+            return None
+        return float(data[0]["lat"]), float(data[0]["lon"])
+
+
+class PhotonProvider(GeocodeProvider):
+    name = "photon"
+
+    async def lookup(self, http: FeedHttpClient, place: str) -> Optional[Coordinates]:
+        resp = await http.get("https://photon.komoot.io/api/", params={"q": place, "limit": 1})
+        resp.raise_for_status()
+        features = resp.json().get("features") or []
+        if not features:
+            return None
+        lon, lat = features[0]["geometry"]["coordinates"][:2]
+        return float(lat), float(lon)
+
+
+PROVIDERS = {"nominatim": NominatimProvider, "photon": PhotonProvider}
+
+
+class Geocoder:
+    """Shared place-name geocoder for all ingestors.
+
+    Lookups go through an in-memory LRU, then a SQLite table under DATA_DIR
+    that keeps both hits and misses (misses expire after
+    GEOCODER_NEGATIVE_TTL_HOURS), and only then to the configured providers,
+    each paced by its own token bucket. Concurrent lookups of the same place
+    share one request. Lookups that outlive a batch's timeout keep running
+    in the background and land in the cache for the next cycle. SQLite
+    reads and writes run on worker threads, off the event loop.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(settings.data_dir, "geocode_cache.sqlite")
+        self.memory_capacity = settings.geocoder_cache_memory_items
+        self.stats = CacheStats()
+        self.requests = 0
+        self.failures = 0
+        self._memory: "OrderedDict[str, Tuple[Optional[float], Optional[float]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._providers: Optional[List[GeocodeProvider]] = None
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._opened = False
+
+    @property
+    def providers(self) -> List[GeocodeProvider]:
+        if self._providers is None:
+            names = [n.strip().lower() for n in settings.geocoder_providers.split(",") if n.strip()]
+            rates = {"nominatim": settings.geocoder_nominatim_rate, "photon": settings.geocoder_photon_rate}
+            self._providers = [PROVIDERS[n](rates[n]) for n in names if n in PROVIDERS]
+        return self._providers
+
+    @property
+    def http(self) -> FeedHttpClient:
+        return http_client.for_feed("Geocoder", "fast")
+
+    def _open(self) -> Optional[sqlite3.Connection]:
+        if not self._opened:
+            self._opened = True
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._db = sqlite3.connect(self.path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS places "
+                    "(key TEXT PRIMARY KEY, lat REAL, lon REAL, provider TEXT, resolved_at REAL NOT NULL)"
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Geocode disk cache disabled — {e}")
+                self._db = None
+        return self._db
+
+    @staticmethod
+    def key(place: str) -> str:
+        return normalize_text(place).lower()
+
+    def _remember(self, key: str, value: Tuple[Optional[float], Optional[float]]):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_capacity:
+            self._memory.popitem(last=False)
+
+    def _from_memory(self, key: str) -> Optional[Tuple[Optional[float], Optional[float]]]:
+        value = self._memory.get(key)
+        if value is not None:
+            self._memory.move_to_end(key)
+            self.stats.memory_hits += 1
+        return value
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+        """Unexpired disk entries for keys (blocking; run on a worker thread)."""
+        found = {}
+        with self._db_lock:
+            db = self._open()
+            if db is None:
+                return found
+            for key in keys:
+                try:
+                    row = db.execute("SELECT lat, lon, resolved_at FROM places WHERE key = ?", (key,)).fetchone()
+                except sqlite3.Error:
+                    row = None
+                if row is None:
+                    continue
+                lat, lon, resolved_at = row
+                if lat is None and time.time() - resolved_at > settings.geocoder_negative_ttl_hours * 3600:
+                    continue
+                found[key] = NOT_FOUND if lat is None else (lat, lon)
+        return found
+
+    def _write_disk(self, key: str, lat: Optional[float], lon: Optional[float], provider: Optional[str]):
+        with self._db_lock:
+            db = self._open()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO places (key, lat, lon, provider, resolved_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, lat, lon, provider, time.time()),
+                )
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Geocode disk cache write failed: {e}")
+
+    async def cached_many(self, places: Iterable[str]) -> Dict[str, Optional[Coordinates]]:
+        """Coordinates (None: known to be unresolvable) of the places the cache tiers know.
+
+        No network calls; all disk lookups share one worker-thread hop.
+        """
+        known: Dict[str, Optional[Coordinates]] = {}
+        on_disk: Dict[str, List[str]] = {}
+        for place in places:
+            key = self.key(place)
+            value = self._from_memory(key)
+            if value is not None:
+                known[place] = None if value == NOT_FOUND else value
+            else:
+                on_disk.setdefault(key, []).append(place)
+        if on_disk:
+            found = await asyncio.to_thread(self._read_disk, list(on_disk))
+            for key, names in on_disk.items():
+                value = found.get(key)
+                if value is None:
+                    self.stats.misses += len(names)
+                    continue
+                self._remember(key, value)
+                self.stats.disk_hits += len(names)
+                for place in names:
+                    known[place] = None if value == NOT_FOUND else value
+        return known
+
+    async def _store(self, key: str, coords: Optional[Coordinates], provider: Optional[str]):
+        self._remember(key, coords or NOT_FOUND)
+        lat, lon = coords or NOT_FOUND
+        await asyncio.to_thread(self._write_disk, key, lat, lon, provider)
+
+    async def _lookup(self, key: str, place: str) -> Optional[Coordinates]:
+        errored = False
+        for provider in self.providers:
+            await provider.bucket.acquire()
+            self.requests += 1
+            try:
+                coords = await provider.lookup(self.http, place)
+            except Exception as e:
+                self.failures += 1
+                errored = True
+                logger.debug(f"Geocoder: {provider.name} failed for {place!r}: {e}")
+                continue
+            if coords is not None:
+                await self._store(key, coords, provider.name)
+                return coords
+        if not errored:
+            # Every provider answered and none knows the place
+            await self._store(key, None, None)
+        return None
+
+    def _task(self, place: str) -> asyncio.Task:
+        """The in-flight lookup of a place, started if there is none yet."""
+        key = self.key(place)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._lookup(key, place))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def resolve(self, place: str) -> Optional[Coordinates]:
+        """Coordinates of a place name, or None if it cannot be resolved."""
+        if not self.key(place):
+            return None
+        known = await self.cached_many([place])
+        if place in known:
+            return known[place]
+        return await asyncio.shield(self._task(place))
+
+    async def resolve_many(
+        self, places: Iterable[str], timeout: Optional[float] = None
+    ) -> Dict[str, Optional[Coordinates]]:
+        """Resolve many place names at once, keyed by the names given.
+
+        Names are de-duplicated and looked up concurrently within each
+        provider's rate limit. Lookups still pending after `timeout` seconds
+        come back as None but finish in the background.
+        """
+        names = [place for place in dict.fromkeys(places) if self.key(place)]
+        results = await self.cached_many(names)
+        pending: Dict[str, asyncio.Task] = {
+            place: self._task(place) for place in names if place not in results
+        }
+        if pending:
+            done, _ = await asyncio.wait(set(pending.values()), timeout=timeout)
+            for place, task in pending.items():
+                results[place] = task.result() if task in done and not task.cancelled() else None
+        return results
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            **self.stats.to_dict(),
+            "memory_items": len(self._memory),
+            "in_flight": len(self._inflight),
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+    def shutdown(self):
+        for task in list(self._inflight.values()):
+            task.cancel()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+geocoder = Geocoder()
@@ -0,0 +1,219 @@
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Dict, Iterator, Optional, Set
+import orjson
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HttpCache:
+    """Persistent store of response validators and bodies for conditional GETs.
+
+    Each cached URL has a small JSON metadata file (ETag, Last-Modified,
+    body hash) and a body file under ``<data_dir>/http_cache``. The cache
+    also remembers which bodies this process has already handed to an
+    ingestor, so that after a restart the first 304 still yields the stored
+    body instead of an empty cycle. A body only counts as delivered once
+    the feed acknowledges that its events were stored; until then a 304
+    keeps yielding it, so a failed ingest re-reads the document.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.path.join(settings.data_dir, "http_cache")
+        self.enabled = settings.http_cache_enabled
+        self._delivered: Set[str] = set()
+        self._pending: Dict[str, Set[str]] = {}  # feed -> keys handed out, not yet acknowledged
+        self._ready = False
+
+    def _ensure_dir(self) -> bool:
+        if not self.enabled:
+            return False
+        if not self._ready:
+            try:
+                os.makedirs(self.root, exist_ok=True)
+                self._ready = True
+            except OSError as e:
+                logger.warning(f"HTTP cache disabled — cannot create {self.root}: {e}")
+                self.enabled = False
+        return self._ready
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.json")
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.body")
+
+    def load_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self._ensure_dir():
+            return None
+        try:
+            with open(self._meta_path(key), "rb") as f:
+                return orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+
+    def load_body(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._body_path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def iter_body(self, key: str, chunk_size: int = 1 << 20) -> Iterator[bytes]:
+        """Read a stored body in chunks (raises OSError if it is missing)."""
+        with open(self._body_path(key), "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def has_body(self, key: str) -> bool:
+        return os.path.exists(self._body_path(key))
+
+    def open_writer(self, key: str, url: str) -> "BodyWriter":
+        return BodyWriter(self, key, url)
+
+    def validators(self, meta: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Conditional request headers for a cached entry."""
+        headers = {}
+        if meta and os.path.exists(self._body_path(meta["key"])):
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def _meta(self, key: str, url: str, headers: Dict[str, str], body_hash: str, size: int) -> Dict[str, Any]:
+        return {
+            "key": key,
+            "url": url,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "content_type": headers.get("content-type"),
+            "body_hash": body_hash,
+            "size": size,
+            "stored_at": time.time(),
+        }
+
+    def store(self, key: str, url: str, headers: Dict[str, str], body: bytes, body_hash: str):
+        if not self._ensure_dir():
+            return
+        meta = self._meta(key, url, headers, body_hash, len(body))
+        try:
+            self._atomic_write(self._body_path(key), body)
+            self._atomic_write(self._meta_path(key), orjson.dumps(meta))
+        except OSError as e:
+            logger.warning(f"HTTP cache write failed for {url}: {e}")
+
+    def store_meta(self, key: str, url: str, headers: Dict[str, str], body_hash: str, size: int):
+        """Refresh validators for an entry whose body on disk is already current."""
+        if not self._ensure_dir():
+            return
+        try:
+            self._atomic_write(self._meta_path(key), orjson.dumps(self._meta(key, url, headers, body_hash, size)))
+        except OSError as e:
+            logger.warning(f"HTTP cache write failed for {url}: {e}")
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes):
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def was_delivered(self, key: str) -> bool:
+        return key in self._delivered
+
+    def mark_pending(self, feed: str, key: str):
+        self._pending.setdefault(feed, set()).add(key)
+
+    def acknowledge(self, feed: str):
+        """The feed stored the events of every body handed to it since its last acknowledge."""
+        self._delivered.update(self._pending.pop(feed, ()))
+
+    def discard_pending(self, feed: str):
+        self._pending.pop(feed, None)
+
+    def replaced(self, key: str):
+        """A new body came in for key; it counts as delivered only once acknowledged again."""
+        self._delivered.discard(key)
+
+    @staticmethod
+    def hash_body(body: bytes) -> str:
+        return hashlib.sha256(body).hexdigest()
+
+
+class BodyWriter:
+    """Tees a streamed response body to the cache while it is being parsed.
+
+    The body goes to a temp file and is hashed incrementally; commit()
+    moves it into place (or drops it when the content is unchanged), so a
+    large download is never held in memory.
+    """
+
+    def __init__(self, cache: HttpCache, key: str, url: str):
+        self.cache = cache
+        self.key = key
+        self.url = url
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._tmp = f"{cache._body_path(key)}.part"
+        self._file = None
+        if cache._ensure_dir():
+            try:
+                self._file = open(self._tmp, "wb")
+            except OSError as e:
+                logger.warning(f"HTTP cache write failed for {url}: {e}")
+
+    def write(self, chunk: bytes):
+        self._hash.update(chunk)
+        self.size += len(chunk)
+        if self._file is not None:
+            try:
+                self._file.write(chunk)
+            except OSError as e:
+                logger.warning(f"HTTP cache write failed for {self.url}: {e}")
+                self.abort()
+
+    @property
+    def body_hash(self) -> str:
+        return self._hash.hexdigest()
+
+    def commit(self, headers: Dict[str, str], previous: Optional[Dict[str, Any]]) -> bool:
+        """Store the body and validators; returns True if the body was unchanged."""
+        unchanged = bool(previous) and previous.get("body_hash") == self.body_hash
+        if not unchanged:
+            self.cache.replaced(self.key)
+        if self._file is None:
+            return unchanged
+        self._file.close()
+        self._file = None
+        try:
+            if unchanged and self.cache.has_body(self.key):
+                os.remove(self._tmp)
+            else:
+                os.replace(self._tmp, self.cache._body_path(self.key))
+            self.cache.store_meta(self.key, self.url, headers, self.body_hash, self.size)
+        except OSError as e:
+            logger.warning(f"HTTP cache write failed for {self.url}: {e}")
+        return unchanged
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            try:
+                os.remove(self._tmp)
+            except OSError:
+                pass
+
+
+http_cache = HttpCache()
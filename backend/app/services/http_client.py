@@ -0,0 +1,332 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+import httpx
+from app.config import settings
+from app.services.http_cache import http_cache
+
+logger = logging.getLogger(__name__)
+
+# Named timeout profiles ingestors can pick from via BaseIngestor.timeout_profile
+TIMEOUT_PROFILES: Dict[str, httpx.Timeout] = {
+    "fast": httpx.Timeout(20, connect=5),
+    "default": httpx.Timeout(30, connect=10),
+    "bulk": httpx.Timeout(60, connect=10),
+}
+
+USER_AGENT = "OSIRIS/1.0 (+https://github.com/trevorcapps/osiris)"
+
+
+class FeedHttpStats:
+    """Request, connection and latency counters for one feed."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.bytes_received = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.latency_ewma: Optional[float] = None
+        self.status_codes: Dict[int, int] = {}
+        self.not_modified = 0
+        self.last_error: Optional[str] = None
+
+    def record(self, latency: float, status_code: Optional[int] = None, size: int = 0):
+        self.requests += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+        self.bytes_received += size
+        if status_code is not None:
+            self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+
+    def record_error(self, latency: float, error: Exception):
+        self.record(latency)
+        self.errors += 1
+        self.last_error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "new_connections": self.new_connections,
+            "reused_connections": max(self.requests - self.errors - self.new_connections, 0),
+            "tls_handshakes": self.tls_handshakes,
+            "bytes_received": self.bytes_received,
+            "avg_latency_ms": round(1000 * self.total_latency / self.requests, 1) if self.requests else None,
+            "ewma_latency_ms": round(1000 * self.latency_ewma, 1) if self.latency_ewma is not None else None,
+            "max_latency_ms": round(1000 * self.max_latency, 1),
+            "status_codes": self.status_codes,
+            "not_modified": self.not_modified,
+            "last_error": self.last_error,
+        }
+
+
+class CachedStream:
+    """Body of a streamed conditional GET (see FeedHttpClient.stream_cached)."""
+
+    def __init__(
+        self,
+        status_code: int,
+        source: Optional[AsyncIterator[bytes]] = None,
+        response: Optional[httpx.Response] = None,
+    ):
+        self.status_code = status_code
+        self.unchanged = False
+        self.complete = False
+        self._source = source
+        self._response = response
+
+    def raise_for_status(self):
+        """Raise httpx.HTTPStatusError for an error response, as httpx.Response does."""
+        if self._response is not None:
+            self._response.raise_for_status()
+
+    async def aiter_bytes(self) -> AsyncIterator[bytes]:
+        if self._source is None:
+            return
+        async for chunk in self._source:
+            yield chunk
+        self.complete = True
+
+
+class FeedHttpClient:
+    """Per-feed view of the shared client.
+
+    Applies the feed's timeout profile and records stats for every request,
+    while all feeds share one connection pool.
+    """
+
+    def __init__(self, service: "HttpClientService", feed: str, timeout: httpx.Timeout):
+        self._service = service
+        self.feed = feed
+        self.timeout = timeout
+        self.stats = service.stats_for(feed)
+
+    @property
+    def cookies(self) -> httpx.Cookies:
+        return self._service.client.cookies
+
+    def _prepare(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        kwargs.setdefault("timeout", self.timeout)
+        extensions = dict(kwargs.pop("extensions", None) or {})
+        extensions["trace"] = self._trace
+        kwargs["extensions"] = extensions
+        return kwargs
+
+    async def _trace(self, event: str, info: Dict[str, Any]):
+        if event == "connection.connect_tcp.complete":
+            self.stats.new_connections += 1
+        elif event == "connection.start_tls.complete":
+            self.stats.tls_handshakes += 1
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        kwargs = self._prepare(kwargs)
+        started = time.perf_counter()
+        try:
+            resp = await self._service.client.request(method, url, **kwargs)
+        except Exception as e:
+            self.stats.record_error(time.perf_counter() - started, e)
+            raise
+        self.stats.record(time.perf_counter() - started, resp.status_code, len(resp.content))
+        return resp
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def acknowledge(self):
+        """Count the cached bodies handed out since the last fetch as consumed."""
+        http_cache.acknowledge(self.feed)
+
+    def discard_pending(self):
+        """Forget unacknowledged bodies, so the next conditional GET yields them again."""
+        http_cache.discard_pending(self.feed)
+
+    async def get_cached(self, url: str, **kwargs) -> httpx.Response:
+        """Conditional GET backed by the persistent HTTP cache.
+
+        Sends If-None-Match/If-Modified-Since from the last stored response.
+        Returns a 304 when the document is unchanged since this process last
+        returned it (by validators or by body hash) and the feed acknowledged
+        it, so the caller can skip parsing and enrichment. Otherwise returns a 200 with the body, served
+        from disk when upstream answered 304 to a fresh process.
+        """
+        full_url = str(httpx.URL(url, params=kwargs.get("params")))
+        key = http_cache.key_for(full_url)
+        extra_headers = kwargs.pop("headers", None) or {}
+        meta = await asyncio.to_thread(http_cache.load_meta, key)
+
+        resp = await self.get(url, headers={**http_cache.validators(meta), **extra_headers}, **kwargs)
+        if resp.status_code == 304:
+            if http_cache.was_delivered(key):
+                self.stats.not_modified += 1
+                return resp
+            body = await asyncio.to_thread(http_cache.load_body, key)
+            if body is not None:
+                http_cache.mark_pending(self.feed, key)
+                headers = {"content-type": meta.get("content_type") or ""} if meta else {}
+                return httpx.Response(200, headers=headers, content=body, request=resp.request)
+            # Cached body is gone — fall back to a full download
+            resp = await self.get(url, headers=extra_headers, **kwargs)
+
+        if resp.status_code != 200:
+            return resp
+
+        body_hash = http_cache.hash_body(resp.content)
+        unchanged = bool(meta) and meta.get("body_hash") == body_hash
+        validators_changed = not meta or (
+            meta.get("etag") != resp.headers.get("etag")
+            or meta.get("last_modified") != resp.headers.get("last-modified")
+        )
+        if not unchanged:
+            http_cache.replaced(key)
+        if not unchanged or validators_changed:
+            await asyncio.to_thread(http_cache.store, key, full_url, resp.headers, resp.content, body_hash)
+        if unchanged and http_cache.was_delivered(key):
+            self.stats.not_modified += 1
+            return httpx.Response(304, request=resp.request)
+        http_cache.mark_pending(self.feed, key)
+        return resp
+
+    @asynccontextmanager
+    async def stream_cached(self, url: str, **kwargs) -> AsyncIterator[CachedStream]:
+        """Streaming counterpart of get_cached() for documents too large to buffer.
+
+        Yields a CachedStream with status 304 when the document is unchanged
+        since this process last read it. Otherwise its aiter_bytes() reads
+        from upstream while teeing the body into the cache, or replays the
+        cached copy when upstream answered 304 to a fresh process. A 200 can
+        still carry the same bytes as last time, so check ``unchanged`` once
+        the body has been consumed.
+        """
+        full_url = str(httpx.URL(url, params=kwargs.get("params")))
+        key = http_cache.key_for(full_url)
+        extra_headers = kwargs.pop("headers", None) or {}
+        meta = await asyncio.to_thread(http_cache.load_meta, key)
+
+        headers = {**http_cache.validators(meta), **extra_headers}
+        async with self.stream("GET", url, headers=headers, **kwargs) as resp:
+            if resp.status_code == 304:
+                if http_cache.was_delivered(key):
+                    self.stats.not_modified += 1
+                    yield CachedStream(304)
+                else:
+                    http_cache.mark_pending(self.feed, key)
+                    yield CachedStream(200, self._replay(key))
+                return
+            if resp.status_code != 200:
+                yield CachedStream(resp.status_code, response=resp)
+                return
+
+            writer = http_cache.open_writer(key, full_url)
+            body = CachedStream(200, self._tee(resp, writer))
+            try:
+                yield body
+            finally:
+                if not body.complete:
+                    writer.abort()
+            if body.complete:
+                unchanged = await asyncio.to_thread(writer.commit, resp.headers, meta)
+                if unchanged and http_cache.was_delivered(key):
+                    self.stats.not_modified += 1
+                    body.unchanged = True
+                http_cache.mark_pending(self.feed, key)
+
+    @staticmethod
+    async def _tee(resp: httpx.Response, writer) -> AsyncIterator[bytes]:
+        async for chunk in resp.aiter_bytes():
+            writer.write(chunk)
+            yield chunk
+
+    @staticmethod
+    async def _replay(key: str) -> AsyncIterator[bytes]:
+        chunks = http_cache.iter_body(key)
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Stream a response body; stats are recorded when the stream closes."""
+        kwargs = self._prepare(kwargs)
+        started = time.perf_counter()
+        resp: Optional[httpx.Response] = None
+        try:
+            async with self._service.client.stream(method, url, **kwargs) as resp:
+                yield resp
+        except Exception as e:
+            if resp is None or isinstance(e, httpx.HTTPError):
+                self.stats.record_error(time.perf_counter() - started, e)
+            else:
+                # Raised by the caller while handling the body (e.g. FeedUnchanged), not an HTTP failure
+                self.stats.record(time.perf_counter() - started, resp.status_code, resp.num_bytes_downloaded)
+            raise
+        self.stats.record(time.perf_counter() - started, resp.status_code, resp.num_bytes_downloaded)
+
+
+class HttpClientService:
+    """Process-wide pooled HTTP client shared by all ingestors.
+
+    Keeps connections to each upstream host alive across fetch cycles
+    instead of paying a TCP+TLS handshake per feed per cycle.
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._stats: Dict[str, FeedHttpStats] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    def _build_client(self) -> httpx.AsyncClient:
+        http2 = settings.http2_enabled
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested but the h2 package is not installed — using HTTP/1.1")
+                http2 = False
+        limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        )
+        logger.info(f"Shared HTTP client ready (http2={http2}, max_connections={limits.max_connections})")
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=limits,
+            timeout=TIMEOUT_PROFILES["default"],
+            headers={"User-Agent": USER_AGENT},
+        )
+
+    def stats_for(self, feed: str) -> FeedHttpStats:
+        if feed not in self._stats:
+            self._stats[feed] = FeedHttpStats()
+        return self._stats[feed]
+
+    def for_feed(self, feed: str, profile: str = "default") -> FeedHttpClient:
+        timeout = TIMEOUT_PROFILES.get(profile, TIMEOUT_PROFILES["default"])
+        return FeedHttpClient(self, feed, timeout)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {feed: stats.to_dict() for feed, stats in self._stats.items()}
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+http_client = HttpClientService()
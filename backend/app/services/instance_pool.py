@@ -0,0 +1,92 @@
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+# Weight of the newest sample in the success-rate and latency EWMAs
+EWMA_ALPHA = 0.2
+# Latency at which an instance's score halves (seconds)
+LATENCY_SCALE = 2.0
+
+
+class InstanceHealth:
+    """Rolling health of one mirror instance."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.success_rate = 1.0  # optimistic until proven otherwise
+        self.latency: Optional[float] = None
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def score(self) -> float:
+        latency = self.latency if self.latency is not None else 0.0
+        return self.success_rate / (1.0 + latency / LATENCY_SCALE)
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "score": round(self.score, 3),
+            "success_rate": round(self.success_rate, 3),
+            "latency_ewma": round(self.latency, 3) if self.latency is not None else None,
+            "consecutive_failures": self.consecutive_failures,
+            "cooling_down_for": round(max(0.0, self.cooldown_until - now), 1),
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class InstancePool:
+    """Orders interchangeable mirrors (e.g. Nitter instances) by health.
+
+    Every request outcome updates the instance's success-rate and latency
+    EWMAs. After a failure an instance cools down for `cooldown` seconds,
+    doubling with each consecutive failure up to `max_cooldown`; instances
+    cooling down are only tried once every healthy one has been.
+    """
+
+    def __init__(self, urls: Sequence[str], cooldown: float = 60.0, max_cooldown: float = 1800.0):
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.instances: Dict[str, InstanceHealth] = {url: InstanceHealth(url) for url in urls}
+
+    def ranked(self) -> List[str]:
+        """All instances, best first: available ones by score, then cooling ones by readiness."""
+        now = time.monotonic()
+        available = [i for i in self.instances.values() if i.cooldown_until <= now]
+        cooling = [i for i in self.instances.values() if i.cooldown_until > now]
+        available.sort(key=lambda i: i.score, reverse=True)
+        cooling.sort(key=lambda i: i.cooldown_until)
+        return [i.url for i in available + cooling]
+
+    def record(self, url: str, ok: bool, latency: float):
+        instance = self.instances.get(url)
+        if instance is None:
+            return
+        instance.requests += 1
+        instance.success_rate += EWMA_ALPHA * ((1.0 if ok else 0.0) - instance.success_rate)
+        if ok:
+            self.record_latency(url, latency)
+            instance.consecutive_failures = 0
+            instance.cooldown_until = 0.0
+        else:
+            instance.failures += 1
+            instance.consecutive_failures += 1
+            backoff = min(self.cooldown * 2 ** (instance.consecutive_failures - 1), self.max_cooldown)
+            instance.cooldown_until = time.monotonic() + backoff
+
+    def record_latency(self, url: str, latency: float):
+        """Latency sample without an outcome, e.g. a request abandoned for being slow."""
+        instance = self.instances.get(url)
+        if instance is None:
+            return
+        if instance.latency is None:
+            instance.latency = latency
+        else:
+            instance.latency += EWMA_ALPHA * (latency - instance.latency)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        ranked = self.ranked()
+        return [self.instances[url].to_dict(now) for url in ranked]
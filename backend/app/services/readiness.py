@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Set when this module is first imported, which main.py does before anything heavy
+PROCESS_STARTED = time.perf_counter()
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+
+
+class Subsystem:
+    def __init__(self, name: str):
+        self.name = name
+        self.state = PENDING
+        self.detail: Optional[str] = None
+        self.seconds: Optional[float] = None
+        self.settled = asyncio.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "seconds": round(self.seconds, 2) if self.seconds is not None else None,
+            "detail": self.detail,
+        }
+
+
+class Readiness:
+    """Tracks background warm-up of the app's heavy subsystems.
+
+    Each subsystem starts pending and settles as ready or failed. Callers
+    that need a subsystem can wait() for it to settle; API handlers check
+    is_ready() and degrade instead of blocking.
+    """
+
+    def __init__(self):
+        self.subsystems: Dict[str, Subsystem] = {}
+        self.timings: Dict[str, float] = {}
+        self._ready_at: Optional[float] = None
+
+    def register(self, *names: str):
+        for name in names:
+            self.subsystems.setdefault(name, Subsystem(name))
+
+    def mark(self, name: str, seconds: Optional[float] = None):
+        """Record a startup phase that isn't a subsystem (e.g. imports)."""
+        self.timings[name] = seconds if seconds is not None else time.perf_counter() - PROCESS_STARTED
+
+    async def warm(self, name: str, fn: Callable[[], Any]) -> bool:
+        """Run a blocking warm-up step in a worker thread and settle the subsystem."""
+        self.register(name)
+        subsystem = self.subsystems[name]
+        started = time.perf_counter()
+        try:
+            result = await asyncio.to_thread(fn)
+            ok = result is not False
+            subsystem.state = READY if ok else FAILED
+            if not ok:
+                subsystem.detail = "unavailable"
+        except Exception as e:
+            logger.error(f"Warm-up of {name} failed: {e}")
+            subsystem.state = FAILED
+            subsystem.detail = f"{type(e).__name__}: {e}"
+        subsystem.seconds = time.perf_counter() - started
+        subsystem.settled.set()
+        if all(s.settled.is_set() for s in self.subsystems.values()):
+            self._ready_at = time.perf_counter() - PROCESS_STARTED
+            self.log_breakdown()
+        return subsystem.state == READY
+
+    def is_ready(self, name: str) -> bool:
+        subsystem = self.subsystems.get(name)
+        return subsystem is not None and subsystem.state == READY
+
+    @property
+    def settled(self) -> bool:
+        return all(s.settled.is_set() for s in self.subsystems.values())
+
+    async def wait(self, *names: str):
+        """Wait until the named subsystems have settled (ready or failed).
+
+        Subsystems that were never registered (no warm-up running) don't block.
+        """
+        for name in names:
+            subsystem = self.subsystems.get(name)
+            if subsystem is not None:
+                await subsystem.settled.wait()
+
+    def report(self) -> Dict[str, Any]:
+        failed = [s.name for s in self.subsystems.values() if s.state == FAILED]
+        if not self.settled:
+            status = "starting"
+        else:
+            status = "degraded" if failed else "ready"
+        return {
+            "status": status,
+            "uptime_seconds": round(time.perf_counter() - PROCESS_STARTED, 1),
+            "ready_after_seconds": round(self._ready_at, 2) if self._ready_at is not None else None,
+            "subsystems": {name: s.to_dict() for name, s in self.subsystems.items()},
+            "startup": {name: round(seconds, 2) for name, seconds in self.timings.items()},
+        }
+
+    def log_breakdown(self):
+        phases = [f"{name} {seconds:.2f}s" for name, seconds in self.timings.items()]
+        phases += [
+            f"{s.name} {s.seconds:.2f}s{'' if s.state == READY else ' (failed)'}"
+            for s in self.subsystems.values()
+        ]
+        logger.info(f"Startup breakdown: {', '.join(phases)} — warm after {self._ready_at:.2f}s")
+
+
+readiness = Readiness()
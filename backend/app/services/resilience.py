@@ -0,0 +1,102 @@
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+import httpx
+
+# Upstream answers worth retrying; anything else (auth, not found, bad
+# request) will fail the same way again
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether a fetch error is transient: timeouts, network errors, 429 and 5xx."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS
+    return isinstance(exc, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError))
+
+
+def backoff_delay(attempt: int, base: float, cap: float, exc: Optional[BaseException] = None) -> float:
+    """Seconds to wait before retry number `attempt` (0-based).
+
+    Full jitter: uniform in [0, min(cap, base * 2**attempt)], so feeds that
+    failed together do not retry in lockstep. A Retry-After header on the
+    error response takes precedence, still bounded by cap.
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        retry_after = exc.response.headers.get("retry-after", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), cap)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker around one feed's fetches.
+
+    Closed: fetches run normally. After `threshold` consecutive failed
+    fetches it opens and callers skip the feed entirely until `reset`
+    seconds have passed. Then one probe fetch is let through (half-open):
+    success closes the breaker, failure re-opens it for twice as long, up to
+    `max_reset`.
+    """
+
+    def __init__(self, threshold: int = 3, reset: float = 300.0, max_reset: float = 3600.0):
+        self.threshold = max(1, threshold)
+        self.base_reset = reset
+        self.max_reset = max_reset
+        self.reset = reset
+        self.state = CLOSED
+        self.failures = 0  # consecutive
+        self.opened_at = 0.0
+        self._probing = False
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker lets a probe through (0 when not open)."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset - time.monotonic())
+
+    def retry_at(self) -> Optional[datetime]:
+        if self.state != OPEN:
+            return None
+        return datetime.utcnow() + timedelta(seconds=self.retry_in())
+
+    def allow(self) -> bool:
+        """Whether a fetch may run now; moves open to half-open once the reset elapses."""
+        if self.state == OPEN and self.retry_in() <= 0:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            # A single probe at a time
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+        return self.state == CLOSED
+
+    def success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.reset = self.base_reset
+        self._probing = False
+
+    def failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self.reset = min(self.reset * 2, self.max_reset)
+            self._open()
+        elif self.failures >= self.threshold:
+            self._open()
+
+    def abandon(self):
+        """A fetch was cancelled from outside; let the next caller probe instead."""
+        self._probing = False
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self._probing = False
@@ -0,0 +1,132 @@
+import asyncio
+import hashlib
+import logging
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+ADDED = "added"
+AMENDED = "amended"
+REMOVED = "removed"
+
+
+class TruncatedList(Exception):
+    """Raised by finish() when a pass read far fewer records than the last snapshot."""
+
+
+def record_hash(fields: Sequence[str]) -> int:
+    """64-bit content hash of a list record's significant fields."""
+    content = "\x1f".join(f.strip() for f in fields)
+    return int.from_bytes(hashlib.blake2b(content.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class SnapshotDiff:
+    """Streaming diff of a full sanctions list against its last snapshot.
+
+    The snapshot is a compact map of record key (SDN number, OpenSanctions
+    id) -> content hash, plus the record's name so removals can be
+    reported. Records are observed one by one as the list streams in; each
+    is classified as added, amended or unchanged on the spot, and whatever
+    was not seen by the end of the pass has been removed. The new snapshot is only
+    persisted by save(), once the whole list was read and the caller has
+    stored the resulting events; a pass whose events were lost is simply
+    diffed again next time.
+
+    With no snapshot on disk yet (``baseline``), every record counts as
+    added; callers normally record that first pass silently.
+    """
+
+    def __init__(self, list_name: str, path: Optional[str] = None):
+        self.list_name = list_name
+        self.path = path or os.path.join(settings.data_dir, "sanctions", f"{list_name}.npz")
+        self.previous: Dict[str, Tuple[int, str]] = {}
+        self.current: Dict[str, Tuple[int, str]] = {}
+        self.baseline = True
+        self.staged = False  # A finished pass is waiting for save()
+        self._loaded = False
+
+    def _load(self) -> bool:
+        try:
+            with np.load(self.path) as data:
+                keys, hashes, labels = data["keys"], data["hashes"], data["labels"]
+            self.previous = dict(zip(keys.tolist(), zip(hashes.tolist(), labels.tolist())))
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Could not load {self.list_name} snapshot from {self.path}: {e}")
+            return False
+
+    def begin(self):
+        """Start a new pass over the list, discarding any unfinished one."""
+        if not self._loaded:
+            self.baseline = not self._load()
+            self._loaded = True
+        self.current = {}
+        self.staged = False
+
+    def observe(self, key: str, content_hash: int, label: str) -> Optional[str]:
+        """Record one list entry; returns ADDED, AMENDED or None if unchanged."""
+        if not key or key in self.current:
+            return None
+        self.current[key] = (content_hash, label)
+        known = self.previous.get(key)
+        if known is None:
+            return ADDED
+        if known[0] != content_hash:
+            return AMENDED
+        return None
+
+    def removed(self) -> List[Tuple[str, int, str]]:
+        """(key, content hash, label) of previous entries that were not observed."""
+        return [
+            (key, content_hash, label)
+            for key, (content_hash, label) in self.previous.items()
+            if key not in self.current
+        ]
+
+    def looks_truncated(self) -> bool:
+        """True if far fewer records were seen than last time (partial download)."""
+        return bool(self.previous) and len(self.current) < settings.sanctions_min_list_ratio * len(self.previous)
+
+    async def finish(self) -> List[Tuple[str, int, str]]:
+        """End the pass and return the removed entries; save() then persists it.
+
+        Raises TruncatedList, keeping the old snapshot, if the pass looks
+        truncated, so the fetch fails and the list is read again next cycle.
+        """
+        if self.looks_truncated():
+            raise TruncatedList(
+                f"only {len(self.current)} of {len(self.previous)} {self.list_name} records read "
+                f"— keeping the previous snapshot"
+            )
+        self.staged = True
+        return self.removed()
+
+    async def save(self):
+        """Persist the finished pass, if any, as the new snapshot."""
+        if self.staged:
+            await asyncio.to_thread(self.commit)
+
+    def commit(self):
+        """Persist the observed list as the new snapshot."""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            keys = list(self.current.keys())
+            tmp = f"{self.path}.tmp.npz"
+            np.savez(
+                tmp,
+                keys=np.array(keys, dtype=str),
+                hashes=np.fromiter((self.current[k][0] for k in keys), dtype=np.uint64, count=len(keys)),
+                labels=np.array([self.current[k][1] for k in keys], dtype=str),
+            )
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save {self.list_name} snapshot to {self.path}: {e}")
+            return
+        self.previous, self.current = self.current, {}
+        self.baseline = False
+        self.staged = False
@@ -0,0 +1,139 @@
+import itertools
+import math
+from typing import Dict, Iterable, List, Set, Tuple
+import numpy as np
+from app.services.dead_reckoning import EARTH_RADIUS_M
+
+EARTH_RADIUS_KM = EARTH_RADIUS_M / 1000.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+HALF_CIRCUMFERENCE_KM = math.pi * EARTH_RADIUS_KM
+
+# (min_lat, max_lat, min_lon, max_lon); min_lon > max_lon crosses the antimeridian
+BBox = Tuple[float, float, float, float]
+
+
+def haversine_km(lat: np.ndarray, lon: np.ndarray, lat0: float, lon0: float) -> np.ndarray:
+    """Great-circle distance in km from (lat0, lon0) to each point (NaN stays NaN)."""
+    phi, phi0 = np.radians(lat), math.radians(lat0)
+    dphi = phi - phi0
+    dlam = np.radians(lon - lon0)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi) * math.cos(phi0) * np.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def circle_bbox(lat: float, lon: float, radius_km: float) -> BBox:
+    """Smallest lat/lon box around a circle on the sphere.
+
+    Circles reaching a pole span all longitudes; ones crossing the
+    antimeridian come back with min_lon > max_lon.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    min_lat = lat - math.degrees(angular)
+    max_lat = lat + math.degrees(angular)
+    if min_lat <= -90 or max_lat >= 90 or angular >= math.pi / 2:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+    dlon = math.degrees(math.asin(min(1.0, math.sin(angular) / math.cos(math.radians(lat)))))
+    min_lon, max_lon = lon - dlon, lon + dlon
+    if min_lon < -180:
+        min_lon += 360
+    if max_lon > 180:
+        max_lon -= 360
+    return min_lat, max_lat, min_lon, max_lon
+
+
+def bbox_mask(lat: np.ndarray, lon: np.ndarray, bbox: BBox) -> np.ndarray:
+    min_lat, max_lat, min_lon, max_lon = bbox
+    mask = (lat >= min_lat) & (lat <= max_lat)
+    if min_lon > max_lon:
+        return mask & ((lon >= min_lon) | (lon <= max_lon))
+    return mask & (lon >= min_lon) & (lon <= max_lon)
+
+
+class GridIndex:
+    """Fixed lat/lon grid mapping each cell to the store rows inside it.
+
+    Maintained incrementally: rows are moved between cells as events are
+    upserted and dropped when they are evicted. A bbox query visits only
+    the cells it overlaps, so panning the globe costs the events in view
+    rather than the whole store. Cell membership is approximate at the
+    edges; callers re-test candidates exactly.
+    """
+
+    def __init__(self, cell_degrees: float = 1.0):
+        self.cell_degrees = cell_degrees
+        self.rows_count = int(math.ceil(180 / cell_degrees))
+        self.cols_count = int(math.ceil(360 / cell_degrees))
+        self.cells: Dict[int, Set[int]] = {}
+
+    def cell_of(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Cell id per point; -1 where the point has no position."""
+        r = np.clip(np.floor((lat + 90) / self.cell_degrees), 0, self.rows_count - 1)
+        c = np.clip(np.floor((lon + 180) / self.cell_degrees), 0, self.cols_count - 1)
+        cells = r * self.cols_count + c
+        return np.where(np.isnan(cells), -1, cells).astype(np.int32)
+
+    def move(self, rows: Iterable[int], old_cells: Iterable[int], new_cells: Iterable[int]):
+        cells = self.cells
+        for row, old, new in zip(rows, old_cells, new_cells):
+            if old == new:
+                continue
+            if old >= 0:
+                members = cells.get(old)
+                if members is not None:
+                    members.discard(row)
+                    if not members:
+                        del cells[old]
+            if new >= 0:
+                cells.setdefault(new, set()).add(row)
+
+    def remove(self, rows: Iterable[int], old_cells: Iterable[int]):
+        self.move(rows, old_cells, itertools.repeat(-1))
+
+    def _col_ranges(self, min_lon: float, max_lon: float) -> List[Tuple[int, int]]:
+        def col(lon: float) -> int:
+            return min(max(int(math.floor((lon + 180) / self.cell_degrees)), 0), self.cols_count - 1)
+
+        if min_lon > max_lon:
+            return [(col(min_lon), self.cols_count - 1), (0, col(max_lon))]
+        return [(col(min_lon), col(max_lon))]
+
+    def cell_count(self, bbox: BBox) -> int:
+        """Cells a bbox overlaps."""
+        min_lat, max_lat, min_lon, max_lon = bbox
+        r0 = min(max(int(math.floor((min_lat + 90) / self.cell_degrees)), 0), self.rows_count - 1)
+        r1 = min(max(int(math.floor((max_lat + 90) / self.cell_degrees)), 0), self.rows_count - 1)
+        return (r1 - r0 + 1) * sum(c1 - c0 + 1 for c0, c1 in self._col_ranges(min_lon, max_lon))
+
+    def candidates(self, bbox: BBox) -> np.ndarray:
+        """Rows in every cell the bbox overlaps (a superset of the rows inside it)."""
+        min_lat, max_lat, min_lon, max_lon = bbox
+        if min_lat > max_lat:
+            return np.empty(0, dtype=np.int64)
+        r0 = min(max(int(math.floor((min_lat + 90) / self.cell_degrees)), 0), self.rows_count - 1)
+        r1 = min(max(int(math.floor((max_lat + 90) / self.cell_degrees)), 0), self.rows_count - 1)
+        cells = self.cells
+        wanted: List[Set[int]] = []
+        if self.cell_count(bbox) > len(cells):
+            # Sparse grid: walking the occupied cells is cheaper than the bbox's
+            col_ranges = self._col_ranges(min_lon, max_lon)
+            for cell, members in cells.items():
+                r, c = divmod(cell, self.cols_count)
+                if r0 <= r <= r1 and any(c0 <= c <= c1 for c0, c1 in col_ranges):
+                    wanted.append(members)
+        else:
+            for r in range(r0, r1 + 1):
+                base = r * self.cols_count
+                for c0, c1 in self._col_ranges(min_lon, max_lon):
+                    for c in range(c0, c1 + 1):
+                        members = cells.get(base + c)
+                        if members:
+                            wanted.append(members)
+        total = sum(len(m) for m in wanted)
+        return np.fromiter(itertools.chain.from_iterable(wanted), dtype=np.int64, count=total)
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            "cell_degrees": self.cell_degrees,
+            "occupied_cells": len(self.cells),
+            "indexed_events": sum(len(m) for m in self.cells.values()),
+        }
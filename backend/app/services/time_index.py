@@ -0,0 +1,83 @@
+import base64
+import hashlib
+import struct
+from typing import Optional, Tuple
+import numpy as np
+
+# Sort key of an event: timestamp, then a hash of its id to break ties
+KEY_DTYPE = np.dtype([("ts", "<i8"), ("key", "<i8")])
+INT64_MIN = np.iinfo(np.int64).min
+INT64_MAX = np.iinfo(np.int64).max
+
+NEXT = "n"  # Older events, after the cursor in newest-first order
+PREV = "p"  # Newer events, before the cursor
+_CURSOR = struct.Struct(">cqq")
+
+
+def id_key(event_id: str) -> int:
+    """Stable signed 64-bit tiebreaker for events sharing a timestamp."""
+    return int.from_bytes(hashlib.blake2b(event_id.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+def encode_cursor(direction: str, ts: int, key: int) -> str:
+    return base64.urlsafe_b64encode(_CURSOR.pack(direction.encode("ascii"), ts, key)).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int, int]:
+    """(direction, ts, key) of a cursor; raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        direction, ts, key = _CURSOR.unpack(raw)
+        direction = direction.decode("ascii")
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+    if direction not in (NEXT, PREV):
+        raise ValueError("invalid cursor")
+    return direction, ts, key
+
+
+class TimeIndex:
+    """Store rows sorted by (timestamp, id key), for range scans and keyset paging.
+
+    A time range or cursor position is a binary search, and a page is a
+    slice next to it, so reading page N costs the same as page 1. Batches
+    are merged in place: removed rows are masked out and new ones inserted
+    at their searchsorted positions, both linear memory moves with no
+    re-sort.
+    """
+
+    def __init__(self):
+        self.keys = np.empty(0, dtype=KEY_DTYPE)
+        self.rows = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def remove(self, rows: np.ndarray):
+        if not len(rows) or not len(self.rows):
+            return
+        removed = np.zeros(max(int(self.rows.max()), int(rows.max())) + 1, dtype=bool)
+        removed[rows] = True
+        keep = ~removed[self.rows]
+        self.keys, self.rows = self.keys[keep], self.rows[keep]
+
+    def add(self, rows: np.ndarray, ts: np.ndarray, keys: np.ndarray):
+        if not len(rows):
+            return
+        new = np.empty(len(rows), dtype=KEY_DTYPE)
+        new["ts"], new["key"] = ts, keys
+        order = np.argsort(new, order=["ts", "key"])
+        new, rows = new[order], rows[order]
+        positions = np.searchsorted(self.keys, new)
+        self.keys = np.insert(self.keys, positions, new)
+        self.rows = np.insert(self.rows, positions, rows)
+
+    def position(self, ts: int, key: int, side: str = "left") -> int:
+        probe = np.array([(ts, key)], dtype=KEY_DTYPE)
+        return int(np.searchsorted(self.keys, probe, side=side)[0])
+
+    def span(self, since: Optional[int] = None, until: Optional[int] = None) -> Tuple[int, int]:
+        """[lo, hi) positions of entries with since <= ts <= until."""
+        lo = 0 if since is None else self.position(since, INT64_MIN)
+        hi = len(self.rows) if until is None else self.position(until, INT64_MAX, side="right")
+        return lo, hi
@@ -0,0 +1,230 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# time (float64) + lat, lon, alt (float32)
+BYTES_PER_POINT = 8 + 3 * 4
+
+
+class TrackStore:
+    """Per-object position history in fixed-size ring buffers.
+
+    All tracks share one preallocated block of (slots x depth) arrays, so the
+    memory used is fixed by TRACK_MEMORY_MB no matter how many objects come
+    and go. Each object (aircraft icao24) owns one slot; a new fix overwrites
+    the oldest point once the slot holds TRACK_DEPTH points. Slots of objects
+    with no new fix for TRACK_IDLE_SECONDS are freed, and when every slot is
+    taken the least recently updated track is evicted.
+    """
+
+    def __init__(self, depth: Optional[int] = None, memory_mb: Optional[float] = None):
+        self.depth = max(2, depth or settings.track_depth)
+        budget = (memory_mb or settings.track_memory_mb) * 1024 * 1024
+        self.slots = max(1, int(budget // (self.depth * BYTES_PER_POINT)))
+        # np.zeros is lazily backed, so unused slots cost no resident memory
+        self.time = np.zeros((self.slots, self.depth), dtype=np.float64)
+        self.lat = np.zeros((self.slots, self.depth), dtype=np.float32)
+        self.lon = np.zeros((self.slots, self.depth), dtype=np.float32)
+        self.alt = np.zeros((self.slots, self.depth), dtype=np.float32)
+        self.head = np.zeros(self.slots, dtype=np.int64)  # next write position
+        self.count = np.zeros(self.slots, dtype=np.int64)
+        self.last_time = np.full(self.slots, -np.inf)
+        self.keys = np.zeros(self.slots, dtype="U8")
+        self.index: Dict[str, int] = {}
+        self.free: List[int] = list(range(self.slots - 1, -1, -1))
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def _release(self, slots: np.ndarray):
+        for slot, key in zip(slots.tolist(), self.keys[slots].tolist()):
+            self.index.pop(key, None)
+            self.free.append(slot)
+        self.count[slots] = 0
+        self.head[slots] = 0
+        self.last_time[slots] = -np.inf
+        self.keys[slots] = ""
+        self.evicted += len(slots)
+
+    def evict_idle(self, now: float, keep: Optional[np.ndarray] = None):
+        """Free the tracks of objects with no new fix for TRACK_IDLE_SECONDS, except slots in `keep`."""
+        idle = (self.count > 0) & (self.last_time < now - settings.track_idle_seconds)
+        if keep is not None:
+            idle[keep] = False
+        idle = np.flatnonzero(idle)
+        if len(idle):
+            self._release(idle)
+
+    def _take_slots(self, needed: int, now: float, keep: np.ndarray):
+        """Free slots for `needed` new tracks, never evicting the slots in `keep`."""
+        if needed <= len(self.free):
+            return
+        self.evict_idle(now, keep)
+        shortfall = needed - len(self.free)
+        if shortfall <= 0:
+            return
+        # Still full: drop the least recently updated tracks not being appended to
+        used = self.count > 0
+        used[keep] = False
+        used = np.flatnonzero(used)
+        shortfall = min(shortfall, len(used))
+        if not shortfall:
+            return
+        oldest = used[np.argpartition(self.last_time[used], shortfall - 1)[:shortfall]]
+        logger.debug(f"Track store full — evicting {len(oldest)} least recently updated tracks")
+        self._release(oldest)
+
+    def append(
+        self,
+        keys: Sequence[str],
+        times: np.ndarray,
+        lats: np.ndarray,
+        lons: np.ndarray,
+        alts: np.ndarray,
+    ) -> int:
+        """Record one fix per object; returns the number of points stored.
+
+        Fixes without a time or position, and fixes not newer than the
+        object's last point, are ignored.
+        """
+        valid = ~(np.isnan(times) | np.isnan(lats) | np.isnan(lons))
+        # One fix per object per call; the last occurrence wins
+        latest = {key: i for i, key in enumerate(keys) if valid[i]}
+        if not latest:
+            return 0
+        now = float(np.nanmax(times))
+        picks = np.fromiter(latest.values(), dtype=np.int64, count=len(latest))
+        new_keys = [key for key in latest if key not in self.index]
+        # Tracks getting a fix in this batch must survive the eviction below
+        appended = np.fromiter((self.index[key] for key in latest if key in self.index), dtype=np.int64)
+        self._take_slots(len(new_keys), now, appended)
+        for key in new_keys[:len(self.free)]:
+            slot = self.index[key] = self.free.pop()
+            self.keys[slot] = key
+        slots = np.array([self.index.get(key, -1) for key in latest], dtype=np.int64)
+        times = times[picks]
+        keep = (slots >= 0) & (times > self.last_time[np.maximum(slots, 0)])
+        slots, picks, times = slots[keep], picks[keep], times[keep]
+        if not len(slots):
+            return 0
+
+        pos = self.head[slots]
+        self.time[slots, pos] = times
+        self.lat[slots, pos] = lats[picks]
+        self.lon[slots, pos] = lons[picks]
+        self.alt[slots, pos] = alts[picks]
+        self.head[slots] = (pos + 1) % self.depth
+        self.count[slots] = np.minimum(self.count[slots] + 1, self.depth)
+        self.last_time[slots] = times
+        self.evict_idle(now)
+        return len(slots)
+
+    def _points(self, slots: np.ndarray, since: Optional[float] = None):
+        """Flat (slot, position) indexes of the tracks' points, oldest first per track.
+
+        Track i owns entries offsets[i]:offsets[i + 1]. With `since`, points
+        older than it are left out.
+        """
+        count = self.count[slots]
+        skip = np.zeros(len(slots), dtype=np.int64)
+        if since is not None:
+            # Points are time-ordered, so those before `since` form a prefix
+            steps = np.arange(self.depth)
+            order = (self.head[slots, None] - count[:, None] + steps[None, :]) % self.depth
+            skip = ((steps[None, :] < count[:, None]) & (self.time[slots[:, None], order] < since)).sum(axis=1)
+        lengths = count - skip
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        track = np.repeat(np.arange(len(slots)), lengths)
+        step = skip[track] + np.arange(offsets[-1]) - offsets[:-1][track]
+        pos = (self.head[slots][track] - count[track] + step) % self.depth
+        return slots[track], pos, offsets.tolist()
+
+    def track(self, key: str, since: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """One object's track, oldest point first; None if it has no track."""
+        slot = self.index.get(key.strip().lower())
+        if slot is None:
+            return None
+        rows, pos, _ = self._points(np.array([slot]), since)
+        return {
+            "icao24": self.keys[slot],
+            "count": len(pos),
+            "points": {
+                "time": self.time[rows, pos].tolist(),
+                "lat": _json_coords(self.lat[rows, pos], 5),
+                "lon": _json_coords(self.lon[rows, pos], 5),
+                "alt": _json_coords(self.alt[rows, pos], 0),
+            },
+        }
+
+    def query(
+        self,
+        min_lat: Optional[float] = None,
+        max_lat: Optional[float] = None,
+        min_lon: Optional[float] = None,
+        max_lon: Optional[float] = None,
+        since: Optional[float] = None,
+        limit: int = 1000,
+    ) -> Dict[str, Any]:
+        """Tracks whose latest point is inside the bbox, as GeoJSON LineStrings."""
+        slots = np.flatnonzero(self.count > 0)
+        last = (self.head[slots] - 1) % self.depth
+        lat, lon = self.lat[slots, last], self.lon[slots, last]
+        mask = np.ones(len(slots), dtype=bool)
+        if min_lat is not None:
+            mask &= lat >= min_lat
+        if max_lat is not None:
+            mask &= lat <= max_lat
+        if min_lon is not None and max_lon is not None and min_lon > max_lon:
+            mask &= (lon >= min_lon) | (lon <= max_lon)
+        else:
+            if min_lon is not None:
+                mask &= lon >= min_lon
+            if max_lon is not None:
+                mask &= lon <= max_lon
+        if since is not None:
+            mask &= self.last_time[slots] >= since
+        slots = slots[mask]
+        total = len(slots)
+        slots = slots[:limit]
+
+        rows, pos, offsets = self._points(slots, since)
+        lats = np.round(self.lat[rows, pos].astype(np.float64), 5).tolist()
+        lons = np.round(self.lon[rows, pos].astype(np.float64), 5).tolist()
+        alts = np.round(self.alt[rows, pos].astype(np.float64)).tolist()
+        times = self.time[rows, pos].tolist()
+        features = []
+        for i, key in enumerate(self.keys[slots].tolist()):
+            a, b = offsets[i], offsets[i + 1]
+            coordinates = [
+                [x, y, z] if z == z else [x, y]  # no altitude reported (NaN)
+                for x, y, z in zip(lons[a:b], lats[a:b], alts[a:b])
+            ]
+            features.append({
+                "type": "Feature",
+                "id": key,
+                "geometry": {"type": "LineString", "coordinates": coordinates},
+                "properties": {"icao24": key, "times": times[a:b]},
+            })
+        return {"type": "FeatureCollection", "total": total, "features": features}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "tracks": len(self.index),
+            "points": int(self.count.sum()),
+            "slots": self.slots,
+            "depth": self.depth,
+            "memory_bytes": self.time.nbytes + self.lat.nbytes + self.lon.nbytes + self.alt.nbytes,
+            "evicted": self.evicted,
+        }
+
+
+def _json_coords(values: np.ndarray, decimals: int) -> List[Optional[float]]:
+    values = values.astype(np.float64)
+    return np.where(np.isnan(values), None, np.round(values, decimals)).tolist()
+
+
+track_store = TrackStore()
@@ -1,10 +1,8 @@
+import asyncio
 import logging
+import time
 from typing import List, Optional, Dict, Any
-from qdrant_client import QdrantClient
-from qdrant_client.models import (
-    Distance, VectorParams, PointStruct, Filter,
-    FieldCondition, MatchValue, Range, models
-)
+import numpy as np
 from app.config import settings
 from app.models.schemas import GeoEvent
 
@@ -12,6 +10,11 @@ logger = logging.getLogger(__name__)
 
 COLLECTION_NAME = "osiris_events"
 VECTOR_SIZE = 384  # all-MiniLM-L6-v2 output dimension
+UPSERT_CHUNK = 1000  # Points per upsert request
+
+
+# qdrant_client is imported inside methods: it costs over a second at import
+# time and isn't needed until the background connect at startup.
 
 
 class VectorStore:
@@ -19,17 +22,33 @@ class VectorStore:
         self.client = None
 
     async def connect(self):
+        await asyncio.to_thread(self.connect_sync)
+
+    def connect_sync(self, wait: float = 0.0) -> bool:
+        """Blocking connect, retrying with backoff for up to `wait` seconds."""
+        deadline = time.monotonic() + wait
+        delay = 1.0
+        while not self._try_connect():
+            if time.monotonic() + delay > deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, 10.0)
+        return True
+
+    def _try_connect(self) -> bool:
+        from qdrant_client import QdrantClient
+        from qdrant_client.models import Distance, VectorParams, models
         try:
-            self.client = QdrantClient(
+            client = QdrantClient(
                 host=settings.qdrant_host,
                 port=settings.qdrant_port,
                 timeout=10
             )
             # Create collection if not exists
-            collections = self.client.get_collections().collections
+            collections = client.get_collections().collections
             names = [c.name for c in collections]
             if COLLECTION_NAME not in names:
-                self.client.create_collection(
+                client.create_collection(
                     collection_name=COLLECTION_NAME,
                     vectors_config=VectorParams(
                         size=VECTOR_SIZE,
@@ -37,90 +56,89 @@ class VectorStore:
                     )
                 )
                 # Create payload indexes for filtering
-                self.client.create_payload_index(
+                client.create_payload_index(
                     collection_name=COLLECTION_NAME,
                     field_name="source",
                     field_schema=models.PayloadSchemaType.KEYWORD
                 )
-                self.client.create_payload_index(
+                client.create_payload_index(
                     collection_name=COLLECTION_NAME,
                     field_name="event_type",
                     field_schema=models.PayloadSchemaType.KEYWORD
                 )
-                self.client.create_payload_index(
+                client.create_payload_index(
                     collection_name=COLLECTION_NAME,
                     field_name="timestamp",
                     field_schema=models.PayloadSchemaType.FLOAT
                 )
                 logger.info(f"Created Qdrant collection: {COLLECTION_NAME}")
+            self.client = client
             logger.info("Connected to Qdrant")
+            return True
         except Exception as e:
             logger.error(f"Failed to connect to Qdrant: {e}")
             self.client = None
+            return False
 
-    async def upsert_event(self, event: GeoEvent, embedding: List[float]):
+    @staticmethod
+    def _payload(event: GeoEvent) -> Dict[str, Any]:
+        return {
+            "source": event.source.value,
+            "event_type": event.event_type.value,
+            "title": event.title,
+            "description": event.description,
+            "lat": event.lat,
+            "lon": event.lon,
+            "timestamp": event.timestamp.timestamp(),
+            "entities": [e.model_dump() for e in event.entities],
+            "metadata": event.metadata,
+            "url": event.url,
+            "severity": event.severity,
+        }
+
+    def _upsert_sync(self, events: List[GeoEvent], embeddings: np.ndarray):
+        """Build the points and upsert them; blocking, so always run on a worker thread."""
+        from qdrant_client.models import PointStruct
+        # One C-level conversion for the whole matrix instead of one per vector
+        vectors = np.asarray(embeddings, dtype=np.float32).tolist()
+        points = [
+            PointStruct(id=event.id, vector=vector, payload=self._payload(event))
+            for event, vector in zip(events, vectors)
+        ]
+        self.client.upsert(collection_name=COLLECTION_NAME, points=points)
+
+    async def upsert_event(self, event: GeoEvent, embedding: np.ndarray):
         if not self.client:
             return
         try:
-            payload = {
-                "source": event.source.value,
-                "event_type": event.event_type.value,
-                "title": event.title,
-                "description": event.description,
-                "lat": event.lat,
-                "lon": event.lon,
-                "timestamp": event.timestamp.timestamp(),
-                "entities": [e.model_dump() for e in event.entities],
-                "metadata": event.metadata,
-                "url": event.url,
-                "severity": event.severity,
-            }
-            self.client.upsert(
-                collection_name=COLLECTION_NAME,
-                points=[PointStruct(
-                    id=event.id,
-                    vector=embedding,
-                    payload=payload
-                )]
-            )
+            await asyncio.to_thread(self._upsert_sync, [event], np.asarray(embedding)[None, :])
         except Exception as e:
             logger.error(f"Failed to upsert event {event.id}: {e}")
 
-    async def upsert_batch(self, events: List[GeoEvent], embeddings: List[List[float]]):
-        if not self.client or not events:
-            return
+    async def upsert_batch(self, events: List[GeoEvent], embeddings: np.ndarray) -> bool:
+        """Upsert events with their embeddings; returns whether they were all stored.
+
+        Bulk feeds (e.g. FIRMS) can hand over tens of thousands of points, so
+        they go in UPSERT_CHUNK-point requests, each built and sent on a
+        worker thread while the event loop keeps serving.
+        """
+        if not events:
+            return True
+        if not self.client:
+            return False
         try:
-            points = []
-            for event, embedding in zip(events, embeddings):
-                payload = {
-                    "source": event.source.value,
-                    "event_type": event.event_type.value,
-                    "title": event.title,
-                    "description": event.description,
-                    "lat": event.lat,
-                    "lon": event.lon,
-                    "timestamp": event.timestamp.timestamp(),
-                    "entities": [e.model_dump() for e in event.entities],
-                    "metadata": event.metadata,
-                    "url": event.url,
-                    "severity": event.severity,
-                }
-                points.append(PointStruct(
-                    id=event.id,
-                    vector=embedding,
-                    payload=payload
-                ))
-            self.client.upsert(
-                collection_name=COLLECTION_NAME,
-                points=points
-            )
-            logger.info(f"Upserted {len(points)} events to Qdrant")
+            for start in range(0, len(events), UPSERT_CHUNK):
+                end = start + UPSERT_CHUNK
+                await asyncio.to_thread(self._upsert_sync, events[start:end], embeddings[start:end])
+            logger.info(f"Upserted {len(events)} events to Qdrant")
+            return True
         except Exception as e:
             logger.error(f"Failed to batch upsert: {e}")
+            return False
 
     async def search_similar(
         self,
-        embedding: List[float],
+        embedding: np.ndarray,
         limit: int = 20,
         source_filter: Optional[str] = None,
         type_filter: Optional[str] = None,
@@ -129,6 +147,7 @@ class VectorStore:
     ) -> List[Dict[str, Any]]:
         if not self.client:
             return []
+        from qdrant_client.models import FieldCondition, Filter, MatchValue, Range
         try:
             conditions = []
             if source_filter:
@@ -147,9 +166,10 @@ class VectorStore:
 
             query_filter = Filter(must=conditions) if conditions else None
 
-            results = self.client.search(
+            results = await asyncio.to_thread(
+                self.client.search,
                 collection_name=COLLECTION_NAME,
-                query_vector=embedding,
+                query_vector=np.asarray(embedding, dtype=np.float32).tolist(),
                 query_filter=query_filter,
                 limit=limit,
                 score_threshold=score_threshold
@@ -166,7 +186,7 @@ class VectorStore:
         if not self.client:
             return 0
         try:
-            info = self.client.get_collection(COLLECTION_NAME)
+            info = await asyncio.to_thread(self.client.get_collection, COLLECTION_NAME)
             return info.points_count
         except Exception:
             return 0
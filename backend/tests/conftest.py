@@ -0,0 +1,72 @@
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from typing import List
+
+# Run from anywhere, and never touch the real data directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="osiris-tests-"))
+
+import pytest  # noqa: E402
+from app.models.schemas import Entity, EventSource, EventType, GeoEvent  # noqa: E402
+
+BASE_TIME = datetime(2026, 1, 1)
+ENTITY_NAMES = [
+    "Vladimir Putin", "Kremlin", "NATO", "Kyiv", "Black Sea", "Port of Odesa",
+    "Red Sea", "Houthi", "Suez Canal", "Taiwan Strait", "PLA Navy", "Kim Jong Un",
+]
+
+
+def make_events(count: int, seed: int = 0, prefix: str = "e") -> List[GeoEvent]:
+    """Random events spread over the globe, a few sources and ~12 days."""
+    rng = random.Random(seed)
+    sources = [EventSource.USGS, EventSource.GDELT, EventSource.NASA_FIRMS, EventSource.RSS_NEWS]
+    types = [EventType.EARTHQUAKE, EventType.NEWS, EventType.WILDFIRE]
+    events = []
+    for i in range(count):
+        placed = rng.random() < 0.9
+        events.append(GeoEvent(
+            id=f"{prefix}{i}",
+            source=rng.choice(sources),
+            event_type=rng.choice(types),
+            title=f"event {i}",
+            lat=rng.uniform(-90, 90) if placed else None,
+            lon=rng.uniform(-180, 180) if placed else None,
+            # Coarse timestamps, so ties are common and the id tiebreak matters
+            timestamp=BASE_TIME + timedelta(minutes=rng.randrange(0, 1000) * 17),
+            entities=[
+                Entity(name=rng.choice(ENTITY_NAMES), type=rng.choice(["PERSON", "ORG", "GPE"]))
+                for _ in range(rng.randrange(0, 4))
+            ],
+            severity=rng.choice([None, "low", "high"]),
+        ))
+    return events
+
+
+@pytest.fixture
+def events() -> List[GeoEvent]:
+    return make_events(2000)
+
+
+@pytest.fixture
+def mock_http(monkeypatch, tmp_path):
+    """Route the shared HTTP client through a handler, with an empty HTTP cache under tmp_path.
+
+    Call the returned function with an ``httpx.Request -> httpx.Response`` handler.
+    """
+    import httpx
+    from app.services.http_cache import http_cache
+    from app.services.http_client import http_client
+
+    monkeypatch.setattr(http_cache, "root", str(tmp_path / "http_cache"))
+    monkeypatch.setattr(http_cache, "enabled", True)
+    monkeypatch.setattr(http_cache, "_ready", False)
+    monkeypatch.setattr(http_cache, "_delivered", set())
+    monkeypatch.setattr(http_cache, "_pending", {})
+
+    def install(handler):
+        monkeypatch.setattr(http_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    return install
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from app.config import settings
+from app.services.aircraft_store import LAT, LON, STATE_FIELDS, AircraftStore
+
+
+def random_state(rng, icao24, poll_time):
+    state = [None] * STATE_FIELDS
+    state[0] = icao24.upper() if rng.random() < 0.1 else icao24
+    state[1] = rng.choice(["BAW%03d  " % rng.randrange(1000), None])
+    state[2] = rng.choice(["United Kingdom", "France", None])
+    state[3] = rng.choice([poll_time - rng.uniform(0, 20), None])
+    state[4] = poll_time
+    state[LON] = rng.uniform(-180, 180)
+    state[LAT] = rng.uniform(-85, 85)
+    state[7] = rng.choice([rng.uniform(0, 12000), None])
+    state[8] = rng.random() < 0.1
+    state[9] = rng.choice([rng.uniform(50, 300), None])
+    state[10] = rng.uniform(0, 360)
+    state[11] = rng.uniform(-10, 10)
+    state[13] = rng.uniform(0, 12000)
+    state[14] = rng.choice(["7700", None])
+    if rng.random() < 0.05:
+        state[LAT] = None  # No position: ignored
+    return state
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_store_matches_latest_state_per_aircraft(monkeypatch, seed):
+    monkeypatch.setattr(settings, "aircraft_stale_seconds", 300)
+    rng = random.Random(seed)
+    fleet = ["%06x" % rng.randrange(1 << 24) for _ in range(400)]
+    store = AircraftStore(capacity=64)
+    latest = {}  # Reference: icao24 -> (last state with a position, poll time)
+
+    for step in range(40):
+        poll_time = 10_000.0 + step * 60
+        states = [random_state(rng, key, poll_time) for key in rng.sample(fleet, rng.randrange(0, 200))]
+        store.update(states, poll_time)
+        for state in states:
+            if state[LAT] is not None:
+                latest[state[0].lower()] = (state, poll_time)
+        latest = {k: v for k, v in latest.items() if v[1] >= poll_time - settings.aircraft_stale_seconds}
+
+        assert len(store) == len(latest)
+        result = store.query(limit=100_000, include_ground=True)
+        a = result["aircraft"]
+        assert sorted(a["icao24"]) == sorted(latest)
+        for i, key in enumerate(a["icao24"]):
+            state = latest[key][0]
+            assert a["lat"][i] == pytest.approx(state[LAT], abs=1e-5)
+            assert a["lon"][i] == pytest.approx(state[LON], abs=1e-5)
+            assert a["callsign"][i] == (state[1] or "").strip()
+            assert a["on_ground"][i] == state[8]
+            assert a["fix_time"][i] == (None if state[3] is None else round(state[3]))
+
+
+def test_positions_list_the_same_aircraft_as_query():
+    rng = random.Random(7)
+    store = AircraftStore()
+    store.update([random_state(rng, "%06x" % i, 1000.0) for i in range(6000)], 1000.0)
+    bbox = {"min_lat": -40.0, "max_lat": 60.0, "min_lon": 150.0, "max_lon": -120.0}
+    query = store.query(limit=200, **bbox)
+    positions = store.positions(at=1010.0, limit=200, **bbox)
+    assert positions["icao24"] == query["aircraft"]["icao24"]
+    assert query["total"] > 200
+    for lat, lon in zip(query["aircraft"]["lat"], query["aircraft"]["lon"]):
+        assert -40.0 <= lat <= 60.0 and (lon >= 150.0 or lon <= -120.0)
@@ -0,0 +1,82 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.services.aircraft_store import STATE_FIELDS, AircraftStore
+from app.services.dead_reckoning import EARTH_RADIUS_M, climb, project
+
+
+def distance_and_bearing(lat1, lon1, lat2, lon2):
+    """Great-circle distance (m) and initial bearing (degrees), one pair at a time."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dl = math.radians(lon2 - lon1)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    distance = 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+    y = math.sin(dl) * math.cos(p2)
+    x = math.cos(p1) * math.sin(p2) - math.sin(p1) * math.cos(p2) * math.cos(dl)
+    return distance, math.degrees(math.atan2(y, x)) % 360
+
+
+def test_projection_travels_speed_times_time_along_heading():
+    rng = np.random.default_rng(0)
+    n = 2000
+    lat, lon = rng.uniform(-80, 80, n), rng.uniform(-180, 180, n)
+    heading, velocity = rng.uniform(0, 360, n), rng.uniform(50, 300, n)
+    elapsed = rng.uniform(1, 600, n)
+    new_lat, new_lon = project(lat, lon, heading, velocity, elapsed)
+    assert np.all((-90 <= new_lat) & (new_lat <= 90) & (-180 <= new_lon) & (new_lon < 180))
+    for i in range(n):
+        distance, bearing = distance_and_bearing(lat[i], lon[i], new_lat[i], new_lon[i])
+        assert distance == pytest.approx(velocity[i] * elapsed[i], rel=1e-6)
+        assert min(abs(bearing - heading[i]), 360 - abs(bearing - heading[i])) < 1e-4
+
+
+def test_projection_crosses_the_antimeridian():
+    lat, lon = project(np.array([0.0]), np.array([179.9]), np.array([90.0]), np.array([250.0]), np.array([300.0]))
+    assert lat[0] == pytest.approx(0.0, abs=1e-9)
+    assert -180 < lon[0] < -179
+
+
+def test_unknown_heading_speed_or_time_stays_put():
+    nan = np.nan
+    lat, lon = np.array([10.0, 20.0, 30.0, 40.0]), np.array([1.0, 2.0, 3.0, 4.0])
+    new_lat, new_lon = project(
+        lat, lon, np.array([nan, 90.0, 90.0, 90.0]), np.array([200.0, nan, 200.0, 200.0]),
+        np.array([60.0, 60.0, nan, 0.0]),
+    )
+    assert np.allclose(new_lat, lat) and np.allclose(new_lon, lon)
+
+
+def test_climb_is_linear_and_floored():
+    altitude = climb(np.array([1000.0, 1000.0, 1000.0, np.nan]), np.array([5.0, -20.0, np.nan, 5.0]), np.array([60.0] * 4))
+    assert altitude[:3].tolist() == [1300.0, 0.0, 1000.0]
+    assert np.isnan(altitude[3])
+
+
+def state(icao24, lat, lon, fix_time, heading=90.0, velocity=200.0, on_ground=False, vertical_rate=0.0):
+    s = [None] * STATE_FIELDS
+    s[0], s[3], s[4], s[5], s[6] = icao24, fix_time, fix_time, lon, lat
+    s[7], s[8], s[9], s[10], s[11] = 5000.0, on_ground, velocity, heading, vertical_rate
+    return s
+
+
+def test_store_caps_extrapolation_and_keeps_grounded_aircraft(monkeypatch):
+    monkeypatch.setattr(settings, "aircraft_extrapolate_seconds", 120)
+    store = AircraftStore()
+    store.update([
+        state("a00001", 0.0, 0.0, 1000.0),
+        state("a00002", 0.0, 10.0, 1000.0, on_ground=True, velocity=10.0),
+        state("a00003", 0.0, 20.0, 1100.0, vertical_rate=10.0),
+    ], 1100.0)
+    lat, lon, altitude, elapsed = store.projected(np.arange(3), at=1200.0)
+    assert elapsed.tolist() == [120.0, 0.0, 100.0]
+    assert distance_and_bearing(0.0, 0.0, lat[0], lon[0])[0] == pytest.approx(200.0 * 120)
+    assert (lat[1], lon[1]) == (0.0, 10.0)
+    assert altitude.tolist() == [5000.0, 5000.0, 6000.0]
+    # A position asked for before the fix is not projected backwards
+    assert store.projected(np.arange(1), at=900.0)[3].tolist() == [0.0]
+    positions = store.positions(at=1200.0)
+    assert positions["icao24"] == ["a00001", "a00003"]
+    assert positions["extrapolated"] == [120.0, 100.0]
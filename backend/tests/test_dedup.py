@@ -0,0 +1,141 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.models.schemas import EventSource, EventType, GeoEvent
+from app.services.dedup import BloomFilter, SeenIndex, _key64
+
+EXACT = 300
+BLOOM_BITS = 1 << 13  # Holds ~810 keys per generation
+
+
+def event(i: int, version: int = 0) -> GeoEvent:
+    return GeoEvent(
+        id=f"usgs-{i}", source=EventSource.USGS, event_type=EventType.EARTHQUAKE,
+        title=f"quake {i}", description=f"revision {version}",
+    )
+
+
+@pytest.fixture
+def small_index(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "dedup_exact_capacity", EXACT)
+    monkeypatch.setattr(settings, "dedup_bloom_bits", BLOOM_BITS)
+    return lambda: SeenIndex(str(tmp_path / "seen_index.npz"))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_unseen_matches_full_history(small_index, seed):
+    rng = random.Random(seed)
+    index = small_index()
+    version = {}  # Reference: id -> content version last added
+    added_at = {}  # id -> step it was last added
+    step = 0
+    missed_new = total_new = 0
+
+    for _ in range(120):
+        ids = [rng.randrange(3000) for _ in range(rng.randrange(1, 60))]
+        batch = [event(i, version.get(i, 0) + (rng.random() < 0.2)) for i in ids]
+        fresh, novel = index.unseen(batch)
+        fresh_ids = [e.id for e in fresh]
+
+        # The EXACT most recently added ids are compared by content
+        recent = set(sorted(added_at, key=added_at.get)[-EXACT:])
+        expected, surely_novel, new, evicted = [], 0, 0, 0
+        for e, i in zip(batch, ids):
+            if e.id in expected:
+                continue
+            same = version.get(i) == int(e.description.split()[-1])
+            if i in recent and same:
+                continue
+            expected.append(e.id)
+            surely_novel += i in recent
+            new += i not in version
+            evicted += i in version and i not in recent
+        assert fresh_ids == expected
+        # Seen ids evicted from the exact map count only if the Bloom filter forgot them
+        assert surely_novel <= novel <= surely_novel + new + evicted
+        # Never-seen ids are only missed through Bloom false positives
+        missed_new += max(0, surely_novel + new - novel)
+        total_new += new
+
+        if rng.random() < 0.8:  # The batch reached Qdrant
+            index.add(fresh)
+            for e in fresh:
+                i = int(e.id.split("-")[1])
+                version[i] = int(e.description.split()[-1])
+                added_at[i] = step
+                step += 1
+        assert len(index.exact) <= EXACT
+        assert index.bloom.count <= index.bloom.capacity
+
+    assert missed_new <= 0.05 * total_new
+
+
+def test_bloom_generations_keep_recent_ids_and_bound_false_positives(small_index):
+    index = small_index()
+    capacity = index.bloom.capacity
+    added = [event(i) for i in range(10 * capacity)]
+    for start in range(0, len(added), 97):
+        index.add(added[start:start + 97])
+    # Everything added within the last generation's worth of keys is still known
+    assert all(index._in_bloom(_key64(e.id)) for e in added[-capacity:])
+    # The oldest generations were dropped, so the false-positive rate stays low
+    strangers = [_key64(f"never-{i}") for i in range(5000)]
+    assert sum(map(index._in_bloom, strangers)) / len(strangers) < 0.05
+    forgotten = sum(index._in_bloom(_key64(e.id)) for e in added[:capacity])
+    assert forgotten / capacity < 0.05
+
+
+def test_bloom_filter_has_no_false_negatives():
+    rng = np.random.default_rng(0)
+    bloom = BloomFilter(1 << 16)
+    keys = rng.integers(0, 2 ** 63, size=bloom.capacity).tolist()
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    others = rng.integers(0, 2 ** 63, size=20000).tolist()
+    assert sum(key in bloom for key in others) / len(others) < 0.02
+
+
+def test_index_survives_restart(small_index):
+    index = small_index()
+    batches = [[event(i, v) for i in range(start, start + 100)] for start, v in [(0, 0), (100, 0), (400, 1)]]
+    for batch in batches:
+        index.add(batch)
+    index.save()
+    probe = [event(i, v) for i in range(0, 600, 7) for v in (0, 1)]
+
+    restored = small_index()
+    fresh, novel = index.unseen(probe)
+    assert [e.id for e in restored.unseen(probe)[0]] == [e.id for e in fresh]
+    assert restored.unseen(probe)[1] == novel
+    assert list(restored.exact.items()) == list(index.exact.items())
+    assert restored.bloom.count == index.bloom.count
+    assert np.array_equal(restored.previous_bloom.bits, index.previous_bloom.bits)
+
+
+def test_save_is_throttled_and_skipped_when_clean(small_index, tmp_path):
+    index = small_index()
+    index.save()
+    assert not (tmp_path / "seen_index.npz").exists()
+    index.add([event(1)])
+    index.save(min_interval=60)
+    assert (tmp_path / "seen_index.npz").exists()
+    index.add([event(2)])
+    index.save(min_interval=60)  # Too soon: still dirty
+    assert len(small_index().unseen([event(2)])[0]) == 1
+    index.save()
+    assert small_index().unseen([event(2)])[0] == []
+
+
+def test_index_with_other_bloom_size_rebuilds_from_ids(small_index, monkeypatch):
+    index = small_index()
+    index.add([event(i) for i in range(50)])
+    index.save()
+    monkeypatch.setattr(settings, "dedup_bloom_bits", BLOOM_BITS * 2)
+    resized = small_index()
+    assert resized.bloom.num_bits == BLOOM_BITS * 2
+    assert all(resized._in_bloom(_key64(event(i).id)) for i in range(50))
+    assert resized.unseen([event(i) for i in range(50)]) == ([], 0)
@@ -0,0 +1,158 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.services import embedding_backends
+from app.services.embedding_backends import OnnxBackend, load_backend, parity
+
+
+def onnx_backend(pooling="mean", normalize=True, dim=6):
+    """An OnnxBackend without onnxruntime: a fake tokenizer and session stand in."""
+    backend = object.__new__(OnnxBackend)
+    backend.pipeline = {"dim": dim, "pooling": pooling, "normalize": normalize, "max_seq_length": 16}
+    backend.dim = dim
+    backend.name = "onnx"
+    backend.input_names = {"input_ids", "attention_mask"}
+    backend.batches = []
+
+    def tokenizer(texts, padding, truncation, max_length, return_tensors):
+        width = min(max(len(t.split()) for t in texts), max_length)
+        ids = np.zeros((len(texts), width), dtype=np.int64)
+        mask = np.zeros((len(texts), width), dtype=np.int64)
+        for row, text in enumerate(texts):
+            words = [sum(map(ord, w)) for w in text.split()][:width]
+            ids[row, :len(words)] = words
+            mask[row, :len(words)] = 1
+        backend.batches.append(texts)
+        return {"input_ids": ids, "attention_mask": mask, "token_type_ids": np.zeros_like(ids)}
+
+    class Session:
+        @staticmethod
+        def run(_, feeds):
+            assert set(feeds) == backend.input_names
+            ids = feeds["input_ids"]
+            hidden = np.stack([np.sin(ids * (k + 1) * 0.01) for k in range(dim)], axis=-1)
+            return [hidden.astype(np.float32)]
+
+    backend.tokenizer = tokenizer
+    backend.session = Session()
+    return backend
+
+
+def reference_vector(backend, text):
+    """One text at a time, with plain loops: no padding involved."""
+    words = [sum(map(ord, w)) for w in text.split()][:backend.pipeline["max_seq_length"]]
+    tokens = [[np.sin(w * (k + 1) * 0.01) for k in range(backend.dim)] for w in words]
+    if backend.pipeline["pooling"] == "cls":
+        pooled = np.array(tokens[0])
+    else:
+        pooled = np.array([sum(t[k] for t in tokens) / len(tokens) for k in range(backend.dim)])
+    if backend.pipeline["normalize"]:
+        pooled = pooled / np.linalg.norm(pooled)
+    return pooled
+
+
+@pytest.mark.parametrize("pooling", ["mean", "cls"])
+@pytest.mark.parametrize("normalize", [True, False])
+def test_onnx_pooling_matches_unpadded_reference(pooling, normalize):
+    rng = np.random.default_rng(0)
+    words = ["quake", "fire", "port", "strike", "Kyiv", "cable", "outage", "storm"]
+    texts = [" ".join(rng.choice(words, size=rng.integers(1, 25))) for _ in range(100)]
+    backend = onnx_backend(pooling, normalize)
+    got = backend.encode(texts, batch_size=16)
+    expected = np.array([reference_vector(backend, t) for t in texts])
+    assert got.dtype == np.float32
+    assert np.allclose(got, expected, atol=1e-5)
+    # Batches are cut from length-sorted texts, so padding stays small
+    assert all(len(batch) <= 16 for batch in backend.batches)
+    widths = [max(len(t) for t in batch) - min(len(t) for t in batch) for batch in backend.batches]
+    assert max(widths) < max(len(t) for t in texts) - min(len(t) for t in texts)
+
+
+def test_parity_is_lowest_cosine():
+    class Fixed:
+        def __init__(self, vectors):
+            self.vectors = np.array(vectors, dtype=np.float32)
+
+        def encode(self, texts):
+            return self.vectors[:len(texts)]
+
+    a = Fixed([[1, 0], [0, 1], [1, 1]])
+    b = Fixed([[2, 0], [1, 1], [1, 1]])
+    assert parity(a, b, ["x", "y", "z"]) == pytest.approx(np.cos(np.pi / 4))
+
+
+class FakeTorch:
+    name = "torch"
+    dim = 4
+    loads = 0
+
+    def __init__(self, model_name):
+        FakeTorch.loads += 1
+
+    def encode(self, texts, batch_size=32):
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+
+class FakeOnnx(FakeTorch):
+    agree = True
+
+    def __init__(self, model_dir, quantize):
+        self.name = "onnx-int8" if quantize else "onnx"
+
+    def encode(self, texts, batch_size=32):
+        vectors = np.ones((len(texts), 4), dtype=np.float32)
+        if not FakeOnnx.agree:
+            vectors[:, 0] = -3
+        return vectors
+
+
+@pytest.fixture
+def fake_models(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "data_dir", str(tmp_path))
+    monkeypatch.setattr(embedding_backends, "TorchBackend", FakeTorch)
+    monkeypatch.setattr(embedding_backends, "OnnxBackend", FakeOnnx)
+    exported = []
+
+    def export(reference, model_dir):
+        os.makedirs(model_dir, exist_ok=True)
+        with open(os.path.join(model_dir, "pipeline.json"), "w") as f:
+            json.dump({}, f)
+        exported.append(model_dir)
+
+    monkeypatch.setattr(embedding_backends, "export_onnx", export)
+    FakeOnnx.agree, FakeTorch.loads = True, 0
+    return exported
+
+
+def test_onnx_export_checked_once_then_trusted(fake_models):
+    first = load_backend("onnx", "org/model")
+    assert isinstance(first, FakeOnnx) and first.name == "onnx-int8"
+    assert len(fake_models) == 1
+    second = load_backend("onnx", "org/model")
+    assert isinstance(second, FakeOnnx)
+    # Exported once; the second start trusts the parity marker without loading torch
+    assert len(fake_models) == 1
+    assert FakeTorch.loads == 1
+
+
+def test_onnx_failing_parity_falls_back_to_torch(fake_models):
+    FakeOnnx.agree = False
+    assert isinstance(load_backend("onnx", "org/model"), FakeTorch)
+    # A failed check is never trusted; the next start checks again
+    assert isinstance(load_backend("onnx", "org/model"), FakeTorch)
+    assert len(fake_models) == 1
+    assert FakeTorch.loads == 2
+
+
+def test_unknown_or_broken_backend_uses_torch(fake_models, monkeypatch):
+    assert isinstance(load_backend("tensorrt", "org/model"), FakeTorch)
+
+    def broken(*args):
+        raise ImportError("No module named 'onnxruntime'")
+
+    monkeypatch.setattr(embedding_backends, "_load_onnx", broken)
+    assert isinstance(load_backend("onnx", "org/model"), FakeTorch)
@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import random
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.services.embeddings import EmbeddingBatcher, EmbeddingService, _PendingRequest
+from app.services.enrichment_cache import EmbeddingCache
+
+DIM = 16
+
+
+class FakeBackend:
+    """Deterministic per-text vectors; records every call it gets."""
+
+    name = "fake"
+    dim = DIM
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+
+    @staticmethod
+    def vector(text):
+        seed = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+        return np.random.default_rng(seed).random(DIM, dtype=np.float32)
+
+    def encode(self, texts, batch_size=32):
+        self.calls.append(list(texts))
+        self.threads.add(threading.get_ident())
+        return np.array([self.vector(t) for t in texts], dtype=np.float32).reshape(len(texts), DIM)
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = EmbeddingService()
+    service.backend = FakeBackend()
+    service.dim = DIM
+    service.cache = EmbeddingCache("fake", DIM, root=str(tmp_path / "embeddings"))
+    yield service
+    service.shutdown()
+
+
+def test_encode_refuses_without_backend():
+    service = EmbeddingService()
+    with pytest.raises(RuntimeError):
+        service.encode(["text"])
+    assert service.encode([]).shape == (0, service.dim)
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.embed_batch(["text"]))
+    service.shutdown()
+
+
+def test_embed_batch_matches_backend_off_the_loop(service):
+    texts = [f"event {i % 37} happened" for i in range(300)]
+
+    async def run():
+        return await asyncio.gather(
+            service.embed_batch(texts[:150]), service.embed_batch(texts[150:]), service.embed("a query"),
+        ), threading.get_ident()
+
+    (first, second, query), loop_thread = asyncio.run(run())
+    expected = np.array([FakeBackend.vector(t) for t in texts])
+    assert np.array_equal(np.vstack([first, second]), expected)
+    assert np.array_equal(query, FakeBackend.vector("a query"))
+    assert loop_thread not in service.backend.threads
+
+
+def queue_bulk(batcher, loop, texts):
+    request = _PendingRequest(texts, DIM, loop.create_future())
+    batcher._bulk.extend((request, i) for i in range(len(texts)))
+    return request
+
+
+def id_of(item):
+    return id(item[0]), item[1]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_take_groups_by_length_and_never_starves(service, seed):
+    rng = random.Random(seed)
+    loop = asyncio.new_event_loop()
+    batcher = EmbeddingBatcher(service)
+    batcher.max_batch = 16
+    arrived = []
+    for _ in range(20):
+        texts = ["x" * rng.randrange(1, 400) for _ in range(rng.randrange(1, 30))]
+        request = queue_bulk(batcher, loop, texts)
+        arrived.extend((request, i) for i in range(len(texts)))
+    if rng.random() < 0.5:
+        queue_bulk(batcher, loop, ["cancelled"] * 5).future.cancel()
+
+    taken, spreads = [], []
+    while batcher._waiting():
+        oldest = batcher._bulk[0]
+        waiting = list(batcher._bulk)
+        batch = batcher._take()
+        assert 0 < len(batch) <= batcher.max_batch
+        assert oldest in batch or oldest[0].future.done()
+        live = [item for item in waiting if not item[0].future.done()]
+        if len(live) > batcher.max_batch:
+            # Grouped: similar lengths, shortest first
+            lengths = [len(r.texts[i]) for r, i in batch]
+            assert lengths == sorted(lengths)
+            spreads.append(lengths[-1] - lengths[0])
+        # Whatever was not taken stays queued in arrival order
+        assert [item for item in batcher._bulk if not item[0].future.done()] == [
+            item for item in live if item not in batch
+        ]
+        taken.extend(batch)
+    assert sorted(map(id_of, taken)) == sorted(map(id_of, arrived))
+    # Less padding than first-come-first-served batches of the same texts
+    fifo = [[len(r.texts[i]) for r, i in arrived[n:n + 16]] for n in range(0, len(arrived) - 16, 16)]
+    assert np.mean(spreads) < 0.5 * np.mean([max(chunk) - min(chunk) for chunk in fifo])
+    loop.close()
+
+
+def test_take_puts_interactive_first(service):
+    loop = asyncio.new_event_loop()
+    batcher = EmbeddingBatcher(service)
+    batcher.max_batch = 8
+    queue_bulk(batcher, loop, [f"bulk {i}" for i in range(20)])
+    query = _PendingRequest(["query"], DIM, loop.create_future())
+    batcher._interactive.append((query, 0))
+    batch = batcher._take()
+    assert batch[0] == (query, 0)
+    assert len(batch) == 8
+    loop.close()
+
+
+class SlowBackend(FakeBackend):
+    def encode(self, texts, batch_size=32):
+        time.sleep(0.02)
+        return super().encode(texts, batch_size)
+
+
+def test_concurrent_requests_share_batches_and_queries_jump_the_queue(service, monkeypatch):
+    monkeypatch.setattr(settings, "embedding_workers", 1)
+    service.backend = SlowBackend()
+    service.batcher = EmbeddingBatcher(service)
+    service.batcher.max_batch = 32
+    finished = []
+
+    async def bulk(i):
+        texts = [f"feed {i} item {j}" for j in range(rng.randrange(1, 20))]
+        vectors = await service.embed_batch(texts)
+        finished.append("bulk")
+        return texts, vectors
+
+    async def query():
+        await asyncio.sleep(0.005)
+        vector = await service.embed("what happened near the port")
+        finished.append("query")
+        return vector
+
+    async def run():
+        return await asyncio.gather(query(), *(bulk(i) for i in range(40)))
+
+    rng = random.Random(0)
+    vector, *results = asyncio.run(run())
+    assert np.array_equal(vector, FakeBackend.vector("what happened near the port"))
+    for texts, vectors in results:
+        assert np.array_equal(vectors, np.array([FakeBackend.vector(t) for t in texts]))
+    calls = service.backend.calls
+    assert all(len(call) <= 32 for call in calls)
+    assert len(calls) < 40  # Requests were coalesced
+    assert finished.index("query") < len(finished) // 2
@@ -0,0 +1,129 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.services.enrichment_cache import KEY_BYTES, EmbeddingCache, EntityCache, normalize_text
+
+DIM = 8
+
+
+def vector(text):
+    rng = np.random.default_rng(abs(hash(normalize_text(text))) % (1 << 32))
+    return rng.random(DIM, dtype=np.float32)
+
+
+def random_text(rng):
+    words = ["quake", "near", "Kyiv", "port", "strike", "fire", "  ", "\n"]
+    return " ".join(rng.choice(words) for _ in range(rng.randrange(1, 4)))
+
+
+@pytest.fixture
+def small_caches(monkeypatch):
+    monkeypatch.setattr(settings, "embedding_cache_memory_items", 20)
+    monkeypatch.setattr(settings, "embedding_cache_disk_items", 10_000)
+    monkeypatch.setattr(settings, "entity_cache_memory_items", 20)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_embedding_cache_matches_dict(small_caches, tmp_path, seed):
+    rng = random.Random(seed)
+    root = str(tmp_path / "vectors")
+    cache = EmbeddingCache("model-a", DIM, root=root)
+    stored = set()  # Reference: normalized texts put so far
+
+    for _ in range(300):
+        action = rng.random()
+        texts = [random_text(rng) for _ in range(rng.randrange(1, 12))]
+        if action < 0.4:
+            cache.put_many(texts, np.array([vector(t) for t in texts]))
+            stored.update(normalize_text(t) for t in texts)
+        elif action < 0.9:
+            for text, got in zip(texts, cache.get_many(texts)):
+                if normalize_text(text) in stored:
+                    assert np.array_equal(got, vector(text))
+                else:
+                    assert got is None
+        else:
+            cache = EmbeddingCache("model-a", DIM, root=root)  # Restart
+        assert len(cache._memory) <= cache.memory_capacity
+        assert len(cache._rows) == len(stored)
+
+    stats = cache.get_stats()
+    assert stats["lookups"] == stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+
+
+def test_embedding_cache_keys_by_model(small_caches, tmp_path):
+    root = str(tmp_path / "vectors")
+    EmbeddingCache("model-a", DIM, root=root).put_many(["text"], np.ones((1, DIM)))
+    assert EmbeddingCache("model-b", DIM, root=root).get_many(["text"]) == [None]
+    assert np.array_equal(EmbeddingCache("model-a", DIM, root=root).get_many([" text "])[0], np.ones(DIM))
+
+
+def test_embedding_cache_starts_over_when_full(small_caches, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "embedding_cache_disk_items", 10)
+    root = str(tmp_path / "vectors")
+    cache = EmbeddingCache("model-a", DIM, root=root)
+    texts = [f"text {i}" for i in range(14)]
+    cache.put_many(texts[:8], np.array([vector(t) for t in texts[:8]]))
+    cache.put_many(texts[8:], np.array([vector(t) for t in texts[8:]]))
+    reopened = EmbeddingCache("model-a", DIM, root=root)
+    assert len(reopened._rows) == 6
+    got = reopened.get_many(texts)
+    assert got[:8] == [None] * 8
+    assert all(np.array_equal(v, vector(t)) for v, t in zip(got[8:], texts[8:]))
+
+
+def test_embedding_cache_recovers_from_torn_append(small_caches, tmp_path):
+    root = str(tmp_path / "vectors")
+    cache = EmbeddingCache("model-a", DIM, root=root)
+    texts = [f"text {i}" for i in range(5)]
+    cache.put_many(texts, np.array([vector(t) for t in texts]))
+    # Crash after writing a vector but before its key
+    with open(os.path.join(root, "vectors.f32"), "ab") as f:
+        f.write(np.ones(DIM, dtype=np.float32).tobytes())
+    reopened = EmbeddingCache("model-a", DIM, root=root)
+    assert len(reopened._rows) == 5
+    assert os.path.getsize(os.path.join(root, "vectors.f32")) == 5 * DIM * 4
+    assert os.path.getsize(os.path.join(root, "keys.bin")) == 5 * KEY_BYTES
+    reopened.put_many(["text 5"], np.array([vector("text 5")]))
+    assert np.array_equal(EmbeddingCache("model-a", DIM, root=root).get_many(["text 5"])[0], vector("text 5"))
+
+
+def test_embedding_cache_writes_repeated_text_once(small_caches, tmp_path):
+    root = str(tmp_path / "vectors")
+    cache = EmbeddingCache("model-a", DIM, root=root)
+    texts = ["a", "b", "a ", "c"]
+    cache.put_many(texts, np.array([vector(t) for t in texts]))
+    cache.put_many(["d"], np.array([vector("d")]))
+    assert cache._disk_rows == len(cache._rows) == 4
+    reopened = EmbeddingCache("model-a", DIM, root=root)
+    for text, got in zip("abcd", reopened.get_many(list("abcd"))):
+        assert np.array_equal(got, vector(text))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_entity_cache_matches_dict(small_caches, tmp_path, seed):
+    rng = random.Random(seed)
+    path = str(tmp_path / "entities.sqlite")
+    cache = EntityCache("spacy-1", path=path)
+    reference = {}
+
+    for _ in range(300):
+        action = rng.random()
+        texts = [random_text(rng) for _ in range(rng.randrange(1, 8))]
+        if action < 0.4:
+            values = [[(w, rng.choice(["GPE", "ORG"])) for w in t.split()] for t in texts]
+            cache.put_many(texts, values)
+            for text, value in zip(texts, values):
+                reference[normalize_text(text)] = value
+        elif action < 0.9:
+            for text in texts:
+                assert cache.get(text) == reference.get(normalize_text(text))
+        else:
+            cache = EntityCache("spacy-1", path=path)
+        assert len(cache._memory) <= cache.memory_capacity
+
+    assert EntityCache("spacy-2", path=path).get(next(iter(reference))) is None
@@ -0,0 +1,98 @@
+import asyncio
+import random
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.services.enrichment_cache import EntityCache
+from app.services.entity_extractor import ENTITY_LABELS, MAX_TEXT_CHARS, EntityExtractor
+
+# Capitalised words are entities; the label comes from the word
+LABELS = ["PERSON", "ORG", "GPE", "DATE", "CARDINAL"]
+
+
+def label_of(word):
+    return LABELS[sum(map(ord, word)) % len(LABELS)]
+
+
+class FakeNlp:
+    """Tags capitalised words; records each pipe() call."""
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+
+    def pipe(self, texts, batch_size, n_process):
+        texts = list(texts)
+        self.calls.append((texts, n_process))
+        self.threads.add(threading.get_ident())
+        for text in texts:
+            ents = [SimpleNamespace(text=f" {w} ", label_=label_of(w)) for w in text.split() if w[:1].isupper()]
+            yield SimpleNamespace(ents=ents)
+
+
+def reference(text):
+    pairs = []
+    for word in text[:MAX_TEXT_CHARS].split():
+        pair = (word, label_of(word))
+        if word[:1].isupper() and pair[1] in ENTITY_LABELS and len(word) > 1 and pair not in pairs:
+            pairs.append(pair)
+    return pairs
+
+
+@pytest.fixture
+def extractor(tmp_path):
+    extractor = EntityExtractor()
+    extractor.nlp = FakeNlp()
+    extractor.cache = EntityCache("fake-1", path=str(tmp_path / "entities.sqlite"))
+    yield extractor
+    extractor.shutdown()
+
+
+def random_text(rng):
+    words = ["Kyiv", "NATO", "Putin", "the", "port", "Houthi", "Red", "Sea", "A", "struck", "Odesa"]
+    return " ".join(rng.choice(words) for _ in range(rng.randrange(0, 12)))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_extract_batch_matches_per_text_tagging(extractor, seed):
+    rng = random.Random(seed)
+    for _ in range(30):
+        texts = [random_text(rng) for _ in range(rng.randrange(1, 40))]
+        ids = [f"ev{i}" for i in range(len(texts))]
+        got = extractor.extract_batch(texts, ids)
+        assert [[(e.name, e.type) for e in ents] for ents in got] == [reference(t) for t in texts]
+        assert all(e.source_event_id == i for ents, i in zip(got, ids) for e in ents)
+    tagged = [t for texts, _ in extractor.nlp.calls for t in texts]
+    # Every distinct text is tagged once; repeats and later batches hit the cache
+    assert len(tagged) == len(set(tagged))
+    assert "" not in tagged
+
+
+def test_large_batches_fan_out_to_processes(extractor, monkeypatch):
+    monkeypatch.setattr(settings, "ner_processes", 4)
+    monkeypatch.setattr(settings, "ner_multiprocess_min_texts", 100)
+    extractor.extract_batch([f"Event {i}" for i in range(99)])
+    extractor.extract_batch([f"Other {i}" for i in range(100)])
+    assert [n for _, n in extractor.nlp.calls] == [1, 4]
+
+
+def test_extract_runs_on_worker_thread(extractor):
+    async def run():
+        return await extractor.extract(["Kyiv port struck"]), threading.get_ident()
+
+    (entities,), loop_thread = asyncio.run(run())
+    assert [(e.name, e.type) for e in entities] == reference("Kyiv port struck")
+    assert loop_thread not in extractor.nlp.threads
+
+
+def test_no_model_or_failure_gives_empty_lists(extractor):
+    def broken(*args, **kwargs):
+        raise ValueError("[E088] Text of length 2000000 exceeds maximum")
+
+    extractor.nlp.pipe = broken
+    assert extractor.extract_batch(["Kyiv", "NATO"]) == [[], []]
+    extractor.nlp = None
+    assert extractor.extract_batch(["Kyiv"]) == [[]]
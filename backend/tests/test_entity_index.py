@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.schemas import Entity
+from app.services.entity_index import entity_id, normalize
+from app.services.event_store import EventStore, epoch_us
+from app.services.time_index import id_key
+from tests.conftest import ENTITY_NAMES, make_events
+
+
+def new_store(events, **kwargs):
+    store = EventStore(max_events=kwargs.pop("max_events", 100_000), capacity=64, **kwargs)
+    store.upsert(events)
+    return store
+
+
+def mentions(events):
+    """Brute force: normalized name -> ids of the events mentioning it."""
+    found = {}
+    for event in events:
+        for entity in event.entities:
+            found.setdefault(normalize(entity.name), set()).add(event.id)
+    return found
+
+
+def check_consistent(store, live_events):
+    index = store.entities
+    expected = mentions(live_events)
+    assert set(index.slots) == set(expected)
+    for norm, event_ids in expected.items():
+        slot = index.slots[norm]
+        assert {store.events[row].id for row in index.rows(slot)} == event_ids
+        assert index.describe(slot)["event_count"] == len(event_ids)
+        assert int(index.counts[slot].sum()) == len(event_ids)
+        assert index.slot_of(entity_id(norm)) == slot
+    assert len(index.by_id) == len(expected)
+
+
+def test_postings_match_brute_force(events):
+    store = new_store(events)
+    check_consistent(store, events)
+
+
+def test_postings_after_eviction(events):
+    store = new_store(events, max_events=300)
+    check_consistent(store, events[:300])
+
+
+def test_case_and_whitespace_variants_share_an_entity(events):
+    event = events[0].model_copy(update={"entities": [Entity(name="  nato ", type="ORG"), Entity(name="NATO", type="ORG")]})
+    store = new_store([event])
+    assert len(store.entities) == 1
+    assert store.entities.describe(store.entities.lookup("Nato"))["event_count"] == 1
+
+
+@pytest.mark.parametrize("q", ["a", "k", "se", "sea", "red sea", "ort of", "in", "putin", "KREMLIN", "zzz", "  kyiv "])
+def test_search_matches_brute_force(events, q):
+    store = new_store(events)
+    index = store.entities
+    norm = normalize(q)
+    names = mentions(events)
+    if len(norm) < 3:
+        expected = {n for n in names if any(word.startswith(norm) for word in n.split())}
+    else:
+        expected = {n for n in names if norm in n}
+    found = index.search(q, limit=100)
+    assert {index.norms[slot] for slot in found} == expected
+    if norm in names:
+        assert index.norms[found[0]] == norm
+    totals = [len(names[index.norms[slot]]) for slot in found if index.norms[slot] != norm]
+    assert totals == sorted(totals, reverse=True)
+
+
+def test_search_limit(events):
+    store = new_store(events)
+    assert len(store.entities.search("s", limit=2)) == 2
+    assert store.entities.search("s", limit=0) == []
+
+
+def test_ids_stable_across_eviction_and_reingest(events):
+    store = new_store(events, max_events=2000)
+    ids = {n: store.entities.describe(slot)["id"] for n, slot in store.entities.slots.items()}
+    # Push everything out, so every slot is released and reused in another order
+    other = make_events(2000, seed=5, prefix="other")
+    for i, event in enumerate(other):
+        event.entities = [Entity(name=f"Someone {i % 50}", type="PERSON")]
+    store.upsert(other)
+    assert len(store.entities) == 50
+    store.upsert(events[::-1])
+    assert {n: store.entities.describe(slot)["id"] for n, slot in store.entities.slots.items()} == ids
+
+
+def test_stale_id_finds_nothing(events):
+    events = events[:10]
+    events[0].entities = [Entity(name="Port of Odesa", type="GPE")]
+    store = new_store(events, max_events=10)
+    stale = store.entities.describe(store.entities.lookup("Port of Odesa"))["id"]
+    replacement = make_events(10, seed=6, prefix="r")
+    for event in replacement:
+        event.entities = [Entity(name="Someone Else", type="PERSON")]
+    store.upsert(replacement)
+    assert store.entities.slot_of(stale) is None
+    assert store.entity_events(stale, limit=10) == (0, [])
+
+
+def test_entity_events_newest_first(events):
+    store = new_store(events)
+    name = normalize(ENTITY_NAMES[0])
+    expected = sorted(
+        (e for e in events if name in {normalize(x.name) for x in e.entities}),
+        key=lambda e: (epoch_us(e.timestamp), id_key(e.id)), reverse=True,
+    )
+    total, page = store.entity_events(entity_id(name), limit=20, offset=10)
+    assert total == len(expected)
+    assert [e.id for e in page] == [e.id for e in expected[10:30]]
+    total, page = store.entity_events(entity_id(name), limit=500, sources=[expected[0].source])
+    assert [e.id for e in page] == [e.id for e in expected if e.source == expected[0].source]
+
+
+def test_route_rejects_stale_id(events, monkeypatch):
+    from app.api import routes
+
+    store = new_store(events)
+    monkeypatch.setattr(routes, "get_event_store", lambda: store)
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(routes.get_entity_events(entity_id("nobody"), source=None, limit=10, offset=0))
+    assert raised.value.status_code == 404
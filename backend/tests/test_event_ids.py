@@ -0,0 +1,37 @@
+from app.ingestors.acled import ACLEDIngestor, _event_key
+from app.ingestors.x_osint import XOSINTIngestor, _status_key
+
+
+def test_tweet_id_ignores_nitter_instance():
+    ingestor = XOSINTIngestor()
+    links = [
+        "https://nitter.poast.org/SentDefender/status/1790000000000000000#m",
+        "https://nitter.privacydev.net/sentdefender/status/1790000000000000000",
+        "https://nitter.1d4.us/sentdefender/status/1790000000000000000?s=20",
+    ]
+    assert len({ingestor.event_id(*_status_key("sentdefender", link)) for link in links}) == 1
+    other = _status_key("sentdefender", "https://nitter.poast.org/sentdefender/status/1790000000000000001#m")
+    assert ingestor.event_id(*other) != ingestor.event_id(*_status_key("sentdefender", links[0]))
+
+
+def test_tweet_id_without_status_path_drops_host():
+    assert _status_key("intelcrab", "https://nitter.poast.org/intelcrab#m") == ("intelcrab", "/intelcrab")
+    assert _status_key("intelcrab", "https://x.com/intelcrab") == ("intelcrab", "/intelcrab")
+
+
+def test_acled_rows_without_id_get_distinct_ids():
+    ingestor = ACLEDIngestor()
+    row = {"event_date": "2026-01-02", "latitude": "50.45", "longitude": "30.52", "actor1": "A", "notes": "x"}
+    ids = {
+        ingestor.event_id(*_event_key(r)) for r in [
+            row, {**row, "actor1": "B"}, {**row, "latitude": "50.46"}, {**row, "event_date": "2026-01-03"},
+        ]
+    }
+    assert len(ids) == 4
+    assert ingestor.event_id(*_event_key(dict(row))) in ids
+
+
+def test_acled_id_prefers_event_id_cnty():
+    ingestor = ACLEDIngestor()
+    row = {"event_id_cnty": "UKR123", "event_date": "2026-01-02", "notes": "first"}
+    assert ingestor.event_id(*_event_key(row)) == ingestor.event_id(*_event_key({**row, "notes": "edited"}))
@@ -0,0 +1,222 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from app.models.schemas import EventSource, EventType
+from app.services.event_store import EventStore, epoch_us
+from app.services.spatial_index import haversine_km
+from app.services.time_index import id_key
+from tests.conftest import BASE_TIME, make_events
+
+
+def new_store(events, **kwargs):
+    store = EventStore(max_events=kwargs.pop("max_events", 100_000), capacity=64, **kwargs)
+    store.upsert(events)
+    return store
+
+
+def in_bbox(event, min_lat, max_lat, min_lon, max_lon):
+    if event.lat is None:
+        return False
+    if not min_lat <= event.lat <= max_lat:
+        return False
+    if min_lon > max_lon:
+        return event.lon >= min_lon or event.lon <= max_lon
+    return min_lon <= event.lon <= max_lon
+
+
+def newest_first(events):
+    return sorted(events, key=lambda e: (epoch_us(e.timestamp), id_key(e.id)), reverse=True)
+
+
+def ids(rows_or_events, store=None):
+    if store is not None:
+        return {store.events[row].id for row in rows_or_events.tolist()}
+    return [e.id for e in rows_or_events]
+
+
+FILTERS = [
+    {},
+    {"sources": [EventSource.USGS]},
+    {"sources": [EventSource.USGS, EventSource.GDELT], "event_types": [EventType.NEWS]},
+    {"severities": ["high"]},
+    {"severities": ["", "low"]},
+    {"severities": ["extreme"]},  # Unknown: matches nothing, not the events without a severity
+    {"min_lat": 10.0, "max_lat": 20.0, "min_lon": -30.0, "max_lon": 40.0},
+    {"min_lat": -45.0, "max_lat": 45.0, "min_lon": 170.0, "max_lon": -170.0},  # Antimeridian
+    {"min_lat": 60.0},
+    {"near": (0.0, 179.0, 1500.0)},
+    {"near": (85.0, 0.0, 1000.0), "sources": [EventSource.NASA_FIRMS]},
+    {"since": BASE_TIME + timedelta(days=3), "until": BASE_TIME + timedelta(days=5)},
+    {"since": BASE_TIME + timedelta(days=10), "min_lat": 0.0, "max_lat": 90.0, "min_lon": 0.0, "max_lon": 90.0},
+]
+
+
+def matches(event, sources=None, event_types=None, severities=None, min_lat=None, max_lat=None,
+            min_lon=None, max_lon=None, near=None, since=None, until=None):
+    if sources is not None and event.source not in sources:
+        return False
+    if event_types is not None and event.event_type not in event_types:
+        return False
+    if severities is not None and (event.severity or "") not in severities:
+        return False
+    if any(b is not None for b in (min_lat, max_lat, min_lon, max_lon)):
+        bbox = (
+            -90.0 if min_lat is None else min_lat, 90.0 if max_lat is None else max_lat,
+            -180.0 if min_lon is None else min_lon, 180.0 if max_lon is None else max_lon,
+        )
+        if not in_bbox(event, *bbox):
+            return False
+    if near is not None:
+        if event.lat is None:
+            return False
+        lat, lon, radius = near
+        if haversine_km(np.array([event.lat]), np.array([event.lon]), lat, lon)[0] > radius:
+            return False
+    if since is not None and event.timestamp < since:
+        return False
+    if until is not None and event.timestamp > until:
+        return False
+    return True
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_select_matches_brute_force(events, filters):
+    store = new_store(events)
+    expected = {e.id for e in events if matches(e, **filters)}
+    assert ids(store.select(**filters), store) == expected
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_query_total_and_order(events, filters):
+    store = new_store(events)
+    total, page = store.query(limit=25, offset=5, **filters)
+    expected = [e.id for e in events if matches(e, **filters)]  # events[0] is the newest ingested
+    assert total == len(expected)
+    assert ids(page) == expected[5:30]
+
+
+@pytest.mark.parametrize("lat,lon", [(0.0, 0.0), (0.0, 179.9), (-89.0, 10.0), (51.5, -0.1)])
+def test_nearest_matches_brute_force(events, lat, lon):
+    store = new_store(events)
+    placed = [e for e in events if e.lat is not None]
+    dist = haversine_km(np.array([e.lat for e in placed]), np.array([e.lon for e in placed]), lat, lon)
+    expected = sorted(zip(dist.tolist(), [e.id for e in placed]))[:10]
+    got = store.nearest(lat, lon, k=10)
+    assert [d for _, d in got] == pytest.approx([d for d, _ in expected])
+    assert {e.id for e, _ in got} == {i for _, i in expected}
+
+
+def walk(store, limit, **filters):
+    """Every page from the first, following next_cursor."""
+    pages = [store.page(limit, **filters)]
+    while pages[-1].next_cursor:
+        pages.append(store.page(limit, cursor=pages[-1].next_cursor, **filters))
+    return pages
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("limit", [1, 7, 100])
+def test_page_walks_both_directions(events, filters, limit):
+    store = new_store(events)
+    expected = ids(newest_first(e for e in events if matches(e, **filters)))
+    pages = walk(store, limit, **filters)
+    assert all(p.total == len(expected) for p in pages)
+    assert [i for p in pages for i in ids(p.events)] == expected
+
+    # And back again from the last page
+    assert pages[0].prev_cursor is None
+    back = [pages[-1]]
+    while back[-1].prev_cursor:
+        back.append(store.page(limit, cursor=back[-1].prev_cursor, **filters))
+    assert [ids(p.events) for p in back[::-1] if p.events] == [ids(p.events) for p in pages if p.events]
+
+
+def test_page_offset_without_cursor(events):
+    store = new_store(events)
+    expected = ids(newest_first(events))
+    page = store.page(10, offset=35)
+    assert ids(page.events) == expected[35:45]
+    assert ids(store.page(10, cursor=page.prev_cursor).events) == expected[25:35]
+
+
+def test_page_stable_while_newer_events_arrive(events):
+    store = new_store(events)
+    first = store.page(50)
+    assert first.prev_cursor is None
+    later = make_events(500, seed=9, prefix="new")
+    for event in later:
+        event.timestamp = BASE_TIME + timedelta(days=30)
+    store.upsert(later)
+    second = store.page(50, cursor=first.next_cursor)
+    assert ids(second.events) == ids(newest_first(events))[50:100]
+    # Paging back towards the newer end passes the first page and reaches the arrivals
+    back = store.page(50, cursor=second.prev_cursor)
+    assert ids(back.events) == ids(first.events)
+    back = store.page(50, cursor=back.prev_cursor)
+    assert ids(back.events) == ids(newest_first(later))[-50:]
+
+
+def test_page_rejects_bad_cursor(events):
+    store = new_store(events)
+    with pytest.raises(ValueError):
+        store.page(10, cursor="garbage")
+
+
+def test_upsert_replaces_in_place(events):
+    store = new_store(events)
+    moved = events[100].model_copy(update={"lat": 1.0, "lon": 179.5, "timestamp": BASE_TIME - timedelta(days=1)})
+    store.upsert([moved])
+    assert len(store) == len(events)
+    assert store.get(moved.id).lat == 1.0
+    assert next(iter(store)).id == moved.id
+    assert moved.id in ids(store.select(min_lat=0.0, max_lat=2.0, min_lon=179.0, max_lon=-179.0), store)
+    assert ids(store.page(1, until=BASE_TIME - timedelta(hours=1)).events) == [moved.id]
+
+
+def test_eviction_keeps_most_recently_ingested(events):
+    store = new_store(events[500:], max_events=1000)
+    store.upsert(events[:500])
+    assert len(store) == 1000
+    assert [e.id for e in store] == [e.id for e in events[:1000]]
+    kept = events[:1000]
+    assert store.get(events[1500].id) is None
+    # Every index forgets the evicted rows
+    assert ids(store.select(), store) == {e.id for e in kept}
+    assert len(store.timeline) == 1000
+    assert store.grid.get_stats()["indexed_events"] == sum(e.lat is not None for e in kept)
+    assert [i for p in walk(store, 97) for i in ids(p.events)] == ids(newest_first(kept))
+    assert sum(store.source_counts) == 1000
+
+
+def test_rows_are_reused_after_eviction(events):
+    store = new_store(events[:1000], max_events=1000)
+    store.upsert(events[1000:1100])
+    capacity = store.capacity
+    for start in range(1100, 2000, 100):
+        store.upsert(events[start:start + 100])
+    assert store.capacity == capacity
+    assert len(store) == 1000
+    assert ids(store.select(), store) == {e.id for e in events[1000:]}
+
+
+def test_per_source_cap(events):
+    store = new_store(events, max_per_source=100)
+    for source in {e.source for e in events}:
+        own = [e.id for e in events if e.source == source]
+        assert [e.id for e in store if e.source == source] == own[:100]
+    assert len(store) == sum(min(100, sum(e.source == s for e in events)) for s in {e.source for e in events})
+
+
+def test_per_source_cap_spares_other_sources():
+    quiet = make_events(30, seed=1, prefix="quiet")
+    for event in quiet:
+        event.source = EventSource.USGS
+    bulk = make_events(600, seed=2, prefix="bulk")
+    for event in bulk:
+        event.source = EventSource.NASA_FIRMS
+    store = new_store(quiet, max_events=500, max_per_source=200)
+    store.upsert(bulk)
+    assert store.query(sources=[EventSource.USGS])[0] == 30
+    assert store.query(sources=[EventSource.NASA_FIRMS])[0] == 200
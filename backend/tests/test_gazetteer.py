@@ -0,0 +1,130 @@
+import random
+
+import pytest
+
+from app.ingestors import base
+from app.ingestors.base import BaseIngestor
+from app.models.schemas import Entity, EventSource, EventType, GeoEvent
+from app.services.gazetteer import KEY_BYTES, NAME_BYTES, Gazetteer, build_index, normalize
+
+SYLLABLES = ["san", "ta", "Mar", "ía", "ko", "vo", "Kyi", "v", "Ō", "sa", "ka", "-", " ", "'", "ber", "lin"]
+COUNTRIES = ["UA", "DE", "JP", "US", "ES"]
+
+
+def random_rows(seed, count=600):
+    """GeoNames-style rows with many shared names across countries; populations are distinct."""
+    rng = random.Random(seed)
+    populations = rng.sample(range(1, 10_000_000), count)
+    rows = []
+    for i in range(count):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randrange(1, 4))).strip(" -'") or "x"
+        ascii_name = normalize(name).title() if rng.random() < 0.7 else name
+        rows.append([
+            str(i), name, ascii_name, "", f"{rng.uniform(-90, 90):.4f}", f"{rng.uniform(-180, 180):.4f}",
+            "P", "PPL", rng.choice(COUNTRIES), "", "", "", "", "", str(populations[i]),
+        ])
+    return rows
+
+
+@pytest.fixture(params=range(2))
+def built(request, tmp_path):
+    rows = random_rows(request.param)
+    source = tmp_path / "cities.txt"
+    source.write_text("\n".join("\t".join(row) for row in rows) + "\n", encoding="utf-8")
+    build_index(str(source), str(tmp_path / "index"))
+    return Gazetteer(str(tmp_path / "index")), rows
+
+
+def entries(rows):
+    """Every (key, row) the index holds: one per distinct normalized spelling of a row."""
+    out = []
+    for row in rows:
+        for key in {normalize(s).encode("utf-8")[:KEY_BYTES] for s in (row[1], row[2])}:
+            if key:
+                out.append((key, row))
+    return out
+
+
+def as_place(row):
+    return (row[1].encode("utf-8")[:NAME_BYTES].decode("utf-8", errors="replace"), row[8], int(row[14]))
+
+
+def reference_place(indexed, name, country=None):
+    key = normalize(name).encode("utf-8")[:KEY_BYTES]
+    matches = [row for k, row in indexed if k == key and (not country or row[8] == country)]
+    if not key or not matches:
+        return None
+    matches.sort(key=lambda row: -int(row[14]))
+    exact = [row for row in matches if row[1] == name.strip()]
+    return as_place((exact or matches)[0])
+
+
+def test_place_matches_linear_scan(built):
+    gazetteer, rows = built
+    indexed = entries(rows)
+    rng = random.Random(1)
+    queries = [rng.choice(rows)[rng.choice([1, 2])] for _ in range(300)]
+    queries += [q.upper() for q in queries[:50]] + [f"  {q}!" for q in queries[50:100]] + ["", "Atlantis"]
+    for query in queries:
+        for country in (None, rng.choice(COUNTRIES)):
+            place = gazetteer.place(query, country)
+            got = None if place is None else (place.name, place.country, place.population)
+            assert got == reference_place(indexed, query, country), (query, country)
+
+
+def test_prefix_matches_linear_scan(built):
+    gazetteer, rows = built
+    indexed = entries(rows)
+    for text in ["s", "sa", "San", "mar", "ko", "kyiv", "o", "zz", ""]:
+        for limit in (1, 3, 10, 1000):
+            key = normalize(text).encode("utf-8")[:KEY_BYTES]
+            matches = sorted((row for k, row in indexed if key and k.startswith(key)), key=lambda row: -int(row[14]))
+            got = [(p.name, p.country, p.population) for p in gazetteer.prefix(text, limit)]
+            assert got == [as_place(row) for row in matches[:limit]]
+
+
+def test_countries_resolve_by_code_name_and_alias(tmp_path):
+    gazetteer = Gazetteer(str(tmp_path / "missing"))
+    assert gazetteer.country("UA") == gazetteer.country("ukr") == gazetteer.country(" Ukraine ")
+    assert gazetteer.country("USA").name == gazetteer.resolve("United States of America").name == "United States"
+    # Names never match as codes; without an index only countries resolve
+    assert gazetteer.country_named("UA") is None
+    assert gazetteer.resolve("Kyiv") is None
+    assert gazetteer.get_stats()["places"] == 0
+
+
+class NewsFeed(BaseIngestor):
+    name = "test-news"
+    source = EventSource.RSS_NEWS
+
+    def is_configured(self) -> bool:
+        return True
+
+    async def fetch(self):
+        return []
+
+
+def test_locate_by_entities_uses_first_known_place(built, monkeypatch):
+    gazetteer, rows = built
+    monkeypatch.setattr(base, "gazetteer", gazetteer)
+    known = rows[0][1]
+
+    def event(entities, lat=None, lon=None):
+        return GeoEvent(
+            id=f"e{len(entities)}{lat}", source=EventSource.RSS_NEWS, event_type=EventType.NEWS,
+            title="t", lat=lat, lon=lon,
+            entities=[Entity(name=name, type=kind) for name, kind in entities],
+        )
+
+    placed = event([("Ukraine", "GPE")], lat=1.0, lon=2.0)
+    person = event([(known, "PERSON"), ("Atlantis", "LOC"), (known, "FAC"), ("Ukraine", "GPE")])
+    country = event([("Ukraine", "GPE"), (known, "GPE")])
+    nowhere = event([("Atlantis", "GPE"), ("Ukraine", "ORG")])
+    NewsFeed().locate_by_entities([placed, person, country, nowhere])
+
+    assert (placed.lat, placed.lon) == (1.0, 2.0) and "geocoded" not in placed.metadata
+    expected = gazetteer.resolve(known)
+    assert (person.lat, person.lon) == (expected.lat, expected.lon)
+    assert person.metadata["geocoded"] == expected.kind
+    assert country.metadata == {"geocoded": "country", "geocoded_name": "Ukraine"}
+    assert nowhere.lat is None and nowhere.lon is None
@@ -0,0 +1,144 @@
+import asyncio
+import random
+import time
+from collections import Counter
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.geocoder import Geocoder, TokenBucket
+
+# Nominatim knows the first group, Photon the second; "Atlantis" nobody knows
+NOMINATIM = {f"City {i}": (float(i), float(-i)) for i in range(20)}
+PHOTON = {f"Town {i}": (float(i) / 2, float(i) * 2) for i in range(20)}
+PLACES = list(NOMINATIM) + list(PHOTON) + ["Atlantis", "Nowhere", "Flaky"]
+CANONICAL = {p.lower(): p for p in PLACES}
+
+
+def reference(name):
+    place = CANONICAL[name.strip().lower()]
+    return NOMINATIM.get(place) or PHOTON.get(place)
+
+
+@pytest.fixture
+def places_api(mock_http, monkeypatch):
+    """Both providers behind one mock transport; records (host, query) per request."""
+    monkeypatch.setattr(settings, "geocoder_providers", "nominatim,photon")
+    monkeypatch.setattr(settings, "geocoder_nominatim_rate", 1000.0)
+    monkeypatch.setattr(settings, "geocoder_photon_rate", 1000.0)
+    requests = Counter()
+    delay = {"seconds": 0.0}
+
+    async def handler(request):
+        place = CANONICAL[request.url.params["q"].strip().lower()]
+        requests[request.url.host, place] += 1
+        await asyncio.sleep(delay["seconds"])
+        if place == "Flaky":
+            return httpx.Response(503)
+        if request.url.host == "nominatim.openstreetmap.org":
+            coords = NOMINATIM.get(place)
+            return httpx.Response(200, json=[{"lat": str(coords[0]), "lon": str(coords[1])}] if coords else [])
+        coords = PHOTON.get(place)
+        features = [{"geometry": {"coordinates": [coords[1], coords[0]]}}] if coords else []
+        return httpx.Response(200, json={"features": features})
+
+    mock_http(handler)
+    return requests, delay
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_resolve_matches_providers_with_one_request_per_place(places_api, tmp_path, seed):
+    requests, _ = places_api
+    rng = random.Random(seed)
+    path = str(tmp_path / "geocode.sqlite")
+    batches = [[rng.choice(PLACES) for _ in range(rng.randrange(1, 15))] for _ in range(20)]
+
+    async def run(geocoder):
+        # Overlapping batches, with names in several spellings of the same key
+        results = await asyncio.gather(*(
+            geocoder.resolve_many([p if rng.random() < 0.5 else f" {p.upper()} " for p in batch])
+            for batch in batches
+        ))
+        single = await asyncio.gather(*(geocoder.resolve(p) for p in PLACES))
+        return results, single
+
+    geocoder = Geocoder(path)
+    results, single = asyncio.run(run(geocoder))
+    for got in results:
+        assert got == {name: reference(name) for name in got}
+    assert single == [reference(p) for p in PLACES]
+    # Concurrent lookups of a place share one request; later ones hit the cache
+    assert all(count == 1 for (_, place), count in requests.items() if place != "Flaky")
+    assert all(("photon.komoot.io", p) not in requests for p in NOMINATIM)
+    geocoder.shutdown()
+
+    # A restart answers everything but the failed place from disk
+    requests.clear()
+    restarted = Geocoder(path)
+    again = asyncio.run(restarted.resolve_many(PLACES))
+    assert again == {p: reference(p) for p in PLACES}
+    assert {place for _, place in requests} == {"Flaky"}
+    assert restarted.get_stats()["disk_hits"] == len(PLACES) - 1
+    restarted.shutdown()
+
+
+def test_errors_are_retried_and_misses_expire(places_api, tmp_path, monkeypatch):
+    requests, _ = places_api
+    path = str(tmp_path / "geocode.sqlite")
+
+    async def resolve_twice(geocoder, place):
+        return [await geocoder.resolve(place), await geocoder.resolve(place)]
+
+    geocoder = Geocoder(path)
+    assert asyncio.run(resolve_twice(geocoder, "Flaky")) == [None, None]
+    assert requests["nominatim.openstreetmap.org", "Flaky"] == 2
+    assert geocoder.failures == 4
+    assert asyncio.run(resolve_twice(geocoder, "Atlantis")) == [None, None]
+    assert requests["nominatim.openstreetmap.org", "Atlantis"] == 1
+    geocoder.shutdown()
+
+    asyncio.run(Geocoder(path).resolve("Atlantis"))
+    assert requests["nominatim.openstreetmap.org", "Atlantis"] == 1
+    monkeypatch.setattr(settings, "geocoder_negative_ttl_hours", 0)
+    asyncio.run(Geocoder(path).resolve("Atlantis"))
+    assert requests["nominatim.openstreetmap.org", "Atlantis"] == 2
+
+
+def test_timed_out_lookups_finish_in_the_background(places_api, tmp_path):
+    requests, delay = places_api
+    delay["seconds"] = 0.2
+    geocoder = Geocoder(str(tmp_path / "geocode.sqlite"))
+
+    async def run():
+        first = await geocoder.resolve_many(["City 3", "City 4"], timeout=0.05)
+        await asyncio.sleep(0.4)
+        return first, await geocoder.cached_many(["City 3", "City 4"])
+
+    first, cached = asyncio.run(run())
+    assert first == {"City 3": None, "City 4": None}
+    assert cached == {"City 3": NOMINATIM["City 3"], "City 4": NOMINATIM["City 4"]}
+    assert sum(requests.values()) == 2
+
+
+def test_token_bucket_paces_to_rate():
+    rate, burst, count = 50.0, 5, 30
+
+    async def run():
+        bucket = TokenBucket(rate, burst)
+        start = time.monotonic()
+        times = []
+
+        async def one():
+            await bucket.acquire()
+            times.append(time.monotonic() - start)
+
+        await asyncio.gather(*(one() for _ in range(count)))
+        return sorted(times)
+
+    times = asyncio.run(run())
+    # The burst goes at once; then no window admits more than rate allows
+    assert times[burst - 1] < 0.05
+    for i, t in enumerate(times):
+        assert i + 1 <= burst + t * rate + 1e-6
+    assert times[-1] >= (count - burst) / rate * 0.95
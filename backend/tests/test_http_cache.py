@@ -0,0 +1,140 @@
+import asyncio
+import hashlib
+import random
+
+import httpx
+import pytest
+
+from app import scheduler
+from app.ingestors.base import BaseIngestor, FeedUnchanged
+from app.models.schemas import EventSource
+from app.services.http_cache import http_cache
+from app.services.http_client import http_client
+
+URL = "https://example.test/feed.csv"
+
+
+class Upstream:
+    """A document server that honours If-None-Match, unless told to be sloppy."""
+
+    def __init__(self):
+        self.content = b"v0"
+        self.etag_salt = 0
+        self.ignore_validators = False
+
+    @property
+    def etag(self):
+        return '"%s-%d"' % (hashlib.sha1(self.content).hexdigest()[:8], self.etag_salt)
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if not self.ignore_validators and request.headers.get("if-none-match") == self.etag:
+            return httpx.Response(304, headers={"etag": self.etag})
+        return httpx.Response(200, content=self.content, headers={"etag": self.etag})
+
+
+async def get_body(feed, streaming):
+    """The body handed to the feed, or None when it was reported unchanged."""
+    if not streaming:
+        resp = await feed.get_cached(URL)
+        return None if resp.status_code == 304 else resp.content
+    async with feed.stream_cached(URL) as body:
+        if body.status_code == 304:
+            return None
+        data = b"".join([chunk async for chunk in body.aiter_bytes()])
+    return None if body.unchanged else data
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+@pytest.mark.parametrize("seed", range(5))
+def test_body_delivered_until_acknowledged(mock_http, streaming, seed):
+    rng = random.Random(seed)
+    upstream = Upstream()
+    mock_http(upstream)
+    feed = http_client.for_feed(f"test-{streaming}-{seed}")
+    acknowledged = None  # Reference: content the feed last stored
+    settled = False  # The feed just stored the current content and nothing changed since
+
+    for step in range(200):
+        action = rng.random()
+        if action < 0.2:
+            content = b"v%d" % rng.randrange(4)
+            settled = settled and content == upstream.content
+            upstream.content = content
+        elif action < 0.3:
+            upstream.etag_salt += 1  # New validators, same bytes
+        elif action < 0.35:
+            http_cache._delivered.clear()  # Process restart
+            acknowledged, settled = None, False
+        upstream.ignore_validators = rng.random() < 0.2
+
+        got = asyncio.run(get_body(feed, streaming))
+        # Never skip content the feed has not stored; skip it once it has
+        if got is None:
+            assert upstream.content == acknowledged, step
+        else:
+            assert got == upstream.content, step
+        if settled:
+            assert got is None, step
+        if rng.random() < 0.6:
+            feed.acknowledge()
+            if got is not None:
+                acknowledged = got
+            settled = acknowledged == upstream.content
+        else:
+            feed.discard_pending()
+            settled = settled and got is None
+
+
+def test_new_body_after_ack_is_not_skipped(mock_http):
+    upstream = Upstream()
+    mock_http(upstream)
+    feed = http_client.for_feed("test-replaced")
+    assert asyncio.run(get_body(feed, True)) == b"v0"
+    feed.acknowledge()
+    upstream.content = b"v1"
+    assert asyncio.run(get_body(feed, True)) == b"v1"
+    feed.discard_pending()
+    # Upstream now says 304 for v1, which was never stored: replay it from disk
+    assert asyncio.run(get_body(feed, True)) == b"v1"
+    feed.acknowledge()
+    assert asyncio.run(get_body(feed, True)) is None
+
+
+class DocumentFeed(BaseIngestor):
+    """Reads one cached document; fails while `broken` is set, as a parse error would."""
+
+    name = "test-document"
+    source = EventSource.USGS
+
+    def __init__(self):
+        super().__init__()
+        self.broken = False
+        self.bodies = []
+
+    def is_configured(self) -> bool:
+        return True
+
+    async def fetch(self):
+        resp = await self.http.get_cached(URL)
+        if resp.status_code == 304:
+            raise FeedUnchanged()
+        self.bodies.append(resp.content)
+        if self.broken:
+            raise ValueError("unparseable document")
+        return []
+
+
+def test_ingest_acknowledges_only_stored_fetches(mock_http, monkeypatch):
+    monkeypatch.setitem(scheduler._state, "feed_statuses", {})
+    upstream = Upstream()
+    mock_http(upstream)
+    feed = DocumentFeed()
+
+    feed.broken = True
+    asyncio.run(scheduler.ingest_one(feed))
+    feed.broken = False
+    # The failed fetch rolled back, so the same document is read again
+    asyncio.run(scheduler.ingest_one(feed))
+    asyncio.run(scheduler.ingest_one(feed))
+    assert feed.bodies == [b"v0", b"v0"]
+    assert scheduler.get_feed_statuses()[feed.name].error is None
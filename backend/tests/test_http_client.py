@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from app.services.http_client import TIMEOUT_PROFILES, USER_AGENT, HttpClientService
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = self.path.encode()
+        self.send_response(404 if self.path == "/missing" else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_feeds_share_one_pooled_connection(server):
+    service = HttpClientService()
+    feeds = [service.for_feed(name) for name in ("usgs", "gdelt", "who")]
+
+    async def run():
+        bodies = []
+        for i in range(12):
+            resp = await feeds[i % 3].get(f"{server}/item/{i}")
+            bodies.append(resp.text)
+        await service.aclose()
+        return bodies
+
+    assert asyncio.run(run()) == [f"/item/{i}" for i in range(12)]
+    stats = service.get_stats()
+    assert sum(s["new_connections"] for s in stats.values()) == 1
+    assert sum(s["reused_connections"] for s in stats.values()) == 11
+    assert all(s["requests"] == 4 and s["status_codes"] == {200: 4} for s in stats.values())
+    assert stats["usgs"]["bytes_received"] == sum(len(f"/item/{i}") for i in (0, 3, 6, 9))
+
+
+def test_streams_and_errors_are_counted_per_feed(server):
+    service = HttpClientService()
+    feed = service.for_feed("noaa", "bulk")
+
+    async def run():
+        async with feed.stream("GET", f"{server}/stream") as resp:
+            body = b"".join([chunk async for chunk in resp.aiter_bytes()])
+        missing = await feed.get(f"{server}/missing")
+        with pytest.raises(httpx.ConnectError):
+            await feed.get("http://127.0.0.1:1/refused")
+        await service.aclose()
+        return body, missing.status_code
+
+    assert asyncio.run(run()) == (b"/stream", 404)
+    stats = service.get_stats()["noaa"]
+    assert stats["requests"] == 3
+    assert stats["errors"] == 1
+    assert stats["status_codes"] == {200: 1, 404: 1}
+    assert stats["last_error"].startswith("ConnectError")
+
+
+def test_feed_timeout_profile_and_user_agent():
+    seen = []
+
+    def handler(request):
+        seen.append((request.extensions["timeout"], request.headers["user-agent"]))
+        return httpx.Response(200)
+
+    service = HttpClientService()
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler), headers={"User-Agent": USER_AGENT})
+
+    async def run():
+        await service.for_feed("a", "fast").get("https://example.test/")
+        await service.for_feed("b", "no-such-profile").get("https://example.test/")
+        await service.for_feed("c", "bulk").get("https://example.test/", timeout=5)
+        await service.aclose()
+
+    asyncio.run(run())
+    assert [t for t, _ in seen] == [
+        TIMEOUT_PROFILES["fast"].as_dict(),
+        TIMEOUT_PROFILES["default"].as_dict(),
+        httpx.Timeout(5).as_dict(),
+    ]
+    assert all(agent == USER_AGENT for _, agent in seen)
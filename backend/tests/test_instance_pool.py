@@ -0,0 +1,148 @@
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.ingestors.x_osint import XOSINTIngestor
+from app.services import instance_pool
+from app.services.instance_pool import EWMA_ALPHA, LATENCY_SCALE, InstancePool
+
+
+def ewma(samples):
+    """Closed form of the pool's EWMA: the first sample seeds it, later ones decay geometrically."""
+    n = len(samples)
+    return samples[0] * (1 - EWMA_ALPHA) ** (n - 1) + sum(
+        EWMA_ALPHA * (1 - EWMA_ALPHA) ** (n - 1 - k) * x for k, x in enumerate(samples) if k > 0
+    )
+
+
+def reference(history, cooldown, max_cooldown):
+    """Per-instance (score, cooldown_until) from the full request history."""
+    outcomes = [ok for _, ok, _ in history if ok is not None]
+    latencies = [latency for _, ok, latency in history if ok is not False]
+    success = ewma([1.0] + [float(ok) for ok in outcomes])
+    latency = ewma(latencies) if latencies else 0.0
+    trailing = len(outcomes) - max((i + 1 for i, ok in enumerate(outcomes) if ok), default=0)
+    last_failure = max((t for t, ok, _ in history if ok is False), default=0.0)
+    until = last_failure + min(cooldown * 2 ** (trailing - 1), max_cooldown) if trailing else 0.0
+    return success / (1 + latency / LATENCY_SCALE), until, success
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_ranking_matches_history_reference(monkeypatch, seed):
+    rng = random.Random(seed)
+    clock = [1000.0]
+    monkeypatch.setattr(instance_pool, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    urls = [f"https://nitter{i}.example" for i in range(5)]
+    pool = InstancePool(urls, cooldown=10, max_cooldown=120)
+    reliability = {url: rng.random() for url in urls}
+    history = {url: [] for url in urls}
+
+    for _ in range(400):
+        clock[0] += rng.expovariate(1 / 3)
+        url = rng.choice(urls + ["https://unknown.example"])
+        latency = rng.uniform(0.05, 6.0)
+        if rng.random() < 0.1:
+            pool.record_latency(url, latency)
+            history.get(url, []).append((clock[0], None, latency))
+        else:
+            ok = rng.random() < reliability.get(url, 0)
+            pool.record(url, ok, latency)
+            history.get(url, []).append((clock[0], ok, latency))
+
+        expected = {url: reference(h, 10, 120) for url, h in history.items()}
+        for url, (score, until, success) in expected.items():
+            assert pool.instances[url].score == pytest.approx(score)
+            assert pool.instances[url].cooldown_until == pytest.approx(until)
+            assert pool.instances[url].success_rate == pytest.approx(success)
+        ranked = pool.ranked()
+        available = [u for u in ranked if expected[u][1] <= clock[0]]
+        cooling = [u for u in ranked if expected[u][1] > clock[0]]
+        # Every available instance comes before every cooling one, each group in its order
+        assert ranked == available + cooling and sorted(ranked) == sorted(urls)
+        scores = [expected[u][0] for u in available]
+        assert all(a >= b - 1e-9 for a, b in zip(scores, scores[1:]))
+        untils = [expected[u][1] for u in cooling]
+        assert untils == sorted(untils)
+
+
+RSS = (
+    '<?xml version="1.0"?><rss version="2.0"><channel><title>{handle}</title>'
+    '<item><title>{handle} one</title><link>{instance}/{handle}/status/1#m</link></item>'
+    '<item><title>{handle} two</title><link>{instance}/{handle}/status/2#m</link></item>'
+    "</channel></rss>"
+)
+
+
+@pytest.fixture
+def nitter(mock_http, monkeypatch):
+    """Nitter mirrors behind a mock transport: "dead" fails, "slow" stalls, "good" answers."""
+    async def no_entities(self, events, texts, locate=False):
+        return events
+
+    monkeypatch.setattr(XOSINTIngestor, "attach_entities", no_entities)
+    monkeypatch.setattr(settings, "x_osint_handles", ",".join(f"@Handle{i}" for i in range(10)))
+    monkeypatch.setattr(settings, "x_osint_concurrency", 3)
+    state = {"active": {}, "peak": 0, "requests": []}
+
+    async def handler(request):
+        host = request.url.host.split(".")[0]
+        handle = request.url.path.split("/")[1]
+        state["requests"].append((host, handle))
+        state["active"][handle] = state["active"].get(handle, 0) + 1
+        state["peak"] = max(state["peak"], len(state["active"]))
+        try:
+            await asyncio.sleep({"slow": 1.0, "good": 0.02}.get(host, 0.01))
+            if host == "dead":
+                return httpx.Response(503)
+            return httpx.Response(200, text=RSS.format(handle=handle, instance=f"https://{request.url.host}"))
+        finally:
+            state["active"][handle] -= 1
+            if not state["active"][handle]:
+                del state["active"][handle]
+
+    mock_http(handler)
+    return state
+
+
+def test_handles_fetch_concurrently_and_skip_failing_instances(nitter, monkeypatch):
+    monkeypatch.setattr(settings, "nitter_instances", "https://dead.example,https://good.example")
+    monkeypatch.setattr(settings, "nitter_hedge_after", 0)
+    ingestor = XOSINTIngestor()
+    events = asyncio.run(ingestor.fetch())
+
+    assert sorted(e.id for e in events) == sorted(
+        ingestor.event_id(f"handle{i}", str(n)) for i in range(10) for n in (1, 2)
+    )
+    assert {e.metadata["nitter_instance"] for e in events} == {"https://good.example"}
+    # Bounded, but actually concurrent
+    assert 2 <= nitter["peak"] <= 3
+    # The dead mirror is only tried until its first failures are recorded
+    dead = [handle for host, handle in nitter["requests"] if host == "dead"]
+    assert len(dead) <= 3
+    assert ingestor.instances.ranked() == ["https://good.example", "https://dead.example"]
+
+
+def test_slow_instance_is_hedged(nitter, monkeypatch):
+    monkeypatch.setattr(settings, "x_osint_handles", "handle0")
+    monkeypatch.setattr(settings, "nitter_instances", "https://slow.example,https://good.example")
+    monkeypatch.setattr(settings, "nitter_hedge_after", 0.05)
+    ingestor = XOSINTIngestor()
+    started = time.monotonic()
+    events = asyncio.run(ingestor.fetch())
+    assert time.monotonic() - started < 0.5
+    assert {e.metadata["nitter_instance"] for e in events} == {"https://good.example"}
+    slow = ingestor.instances.instances["https://slow.example"]
+    # The abandoned request is no failure, but its latency counts against the instance
+    assert slow.requests == 0 and slow.latency >= 0.05
+    assert ingestor.instances.ranked()[0] == "https://good.example"
+
+
+def test_no_instance_serving_is_a_failure(nitter, monkeypatch):
+    monkeypatch.setattr(settings, "nitter_instances", "https://dead.example")
+    with pytest.raises(RuntimeError):
+        asyncio.run(XOSINTIngestor().fetch())
@@ -0,0 +1,126 @@
+import asyncio
+import csv
+import math
+import random
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.ingestors.nasa_firms import CONFIDENCE_CLASSES, KM_PER_DEGREE, NASAFIRMSIngestor
+from app.services.csv_stream import ColumnarCsv
+
+HEADER = "latitude,longitude,brightness,scan,track,acq_date,acq_time,satellite,confidence,version,bright_t31,frp,daynight"
+
+
+def random_csv(rows: int, seed: int, newline: str = "\n", garbage: bool = True) -> str:
+    rng = random.Random(seed)
+
+    def coordinate(limit):
+        if garbage and rng.random() < 0.03:
+            return rng.choice(["", "abc", "nan", "inf", "1.2.3"])
+        return "%.4f" % rng.uniform(-limit, limit)
+
+    lines = [HEADER]
+    for _ in range(rows):
+        fields = [
+            coordinate(60), coordinate(180), "%.1f" % rng.uniform(300, 500), "1.0", "1.0",
+            "2026-01-%02d" % rng.randrange(1, 3),
+            rng.choice(["%02d%02d" % (rng.randrange(24), rng.randrange(60))] * 20 + [""]),
+            rng.choice(["Terra", "Aqua"]),
+            rng.choice([str(rng.randrange(101))] * 3 + list(CONFIDENCE_CLASSES)),
+            "6.1NRT", "290.0",
+            rng.choice(["%.1f" % rng.uniform(0, 200)] * 10 + ["", "n/a"] * garbage),
+            rng.choice(["D", "N"]),
+        ]
+        if garbage and rng.random() < 0.01:
+            fields = fields[:-2]  # Ragged row
+        lines.append(",".join(fields))
+    return newline.join(lines) + newline
+
+
+def reference(text: str):
+    """Rows a careful row-by-row parser keeps: (lat, lon, when, conf, frp, acq_date, acq_time, satellite)."""
+    kept = []
+    reader = csv.reader(text.splitlines())
+    header = next(reader)
+    for row in reader:
+        if len(row) != len(header):
+            continue
+        r = dict(zip(header, row))
+        try:
+            lat, lon = float(r["latitude"]), float(r["longitude"])
+        except ValueError:
+            continue
+        if not (math.isfinite(lat) and math.isfinite(lon)):
+            continue
+        c = r["confidence"]
+        conf = float(c) if c.isdigit() else CONFIDENCE_CLASSES.get(c, -1.0)
+        try:
+            frp = float(r["frp"])
+        except ValueError:
+            frp = math.nan
+        if conf < settings.firms_min_confidence:
+            continue
+        if settings.firms_min_frp > 0 and not frp >= settings.firms_min_frp:
+            continue
+        if len(r["acq_date"]) != 10 or not r["acq_time"].isdigit():
+            continue
+        t = int(r["acq_time"])
+        when = datetime.fromisoformat(r["acq_date"]) + timedelta(hours=t // 100, minutes=t % 100)
+        kept.append((lat, lon, when, conf, frp, r["acq_date"], r["acq_time"], r["satellite"]))
+    return kept
+
+
+def fetch(mock_http, text: str):
+    mock_http(lambda request: httpx.Response(200, text=text))
+    ingestor = NASAFIRMSIngestor()
+    return ingestor, asyncio.run(ingestor.fetch())
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+@pytest.mark.parametrize("min_frp", [0.0, 50.0])
+def test_detections_match_row_by_row_parse(mock_http, monkeypatch, newline, min_frp):
+    monkeypatch.setattr(settings, "firms_cluster_km", 0.0)
+    monkeypatch.setattr(settings, "firms_min_frp", min_frp)
+    # Large enough to arrive as several line blocks
+    text = random_csv(25_000, seed=1, newline=newline)
+    ingestor, events = fetch(mock_http, text)
+    expected = {
+        ingestor.event_id(lat, lon, date, time_, sat): (lat, lon, when, "high" if conf >= 80 else "medium")
+        for lat, lon, when, conf, frp, date, time_, sat in reference(text)
+    }
+    assert {e.id: (e.lat, e.lon, e.timestamp, e.severity) for e in events} == expected
+    assert all(math.isfinite(e.lat) and math.isfinite(e.lon) for e in events)
+
+
+@pytest.mark.parametrize("cluster_km", [5.0, 50.0])
+def test_clusters_match_brute_force_grouping(mock_http, monkeypatch, cluster_km):
+    monkeypatch.setattr(settings, "firms_cluster_km", cluster_km)
+    monkeypatch.setattr(settings, "firms_min_frp", 0.0)
+    text = random_csv(5000, seed=2, newline="\r\n")
+    ingestor, events = fetch(mock_http, text)
+    cell = cluster_km / KM_PER_DEGREE
+    groups = {}
+    for lat, lon, when, conf, frp, *_ in reference(text):
+        groups.setdefault((math.floor(lat / cell), math.floor(lon / cell)), []).append((lat, lon, when, conf, frp))
+    assert len(events) == len(groups)
+    by_id = {e.id: e for e in events}
+    for (row, col), members in groups.items():
+        event = by_id[ingestor.event_id("cluster", cluster_km, row, col)]
+        frp = [0.0 if math.isnan(m[4]) else m[4] for m in members]
+        assert event.metadata["detections"] == len(members)
+        assert event.timestamp == max(m[2] for m in members)
+        assert event.metadata["frp_total"] == round(sum(frp), 1)
+        weights = [f + 1.0 for f in frp]
+        lat = sum(m[0] * w for m, w in zip(members, weights)) / sum(weights)
+        assert event.lat == pytest.approx(lat, abs=1e-4)
+        assert event.metadata["confidence_max"] == round(max(m[3] for m in members), 1)
+
+
+def test_columnar_csv_strips_carriage_returns():
+    parser = ColumnarCsv(["a", "c"])
+    block = parser.feed(["a,b,c\r", "1,2,3\r", "4,5,\r", "\r"])
+    assert block["a"].tolist() == ["1", "4"]
+    assert block["c"].tolist() == ["3", ""]
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+
+import feedparser
+import httpx
+import pytest
+
+from app.config import settings
+from app.ingestors.base import FeedUnchanged
+from app.ingestors.reddit import RedditIngestor
+from app.ingestors.rss_news import RSSNewsIngestor
+
+
+class Upstream:
+    """Serves each host's document after a short delay; tracks how many hosts are in flight."""
+
+    def __init__(self, documents, failing=()):
+        self.documents = documents
+        self.failing = set(failing)
+        self.active = 0
+        self.peak = 0
+        self.requests = 0
+
+    async def __call__(self, request):
+        host = request.url.host
+        self.requests += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.active -= 1
+        if host in self.failing:
+            return httpx.Response(503 if "news" in host else 429)
+        return self.documents[host](request)
+
+
+@pytest.fixture(autouse=True)
+def no_entities(monkeypatch):
+    async def attach(self, events, texts, locate=False):
+        assert len(events) == len(texts)
+        return events
+
+    for ingestor in (RSSNewsIngestor, RedditIngestor):
+        monkeypatch.setattr(ingestor, "attach_entities", attach)
+
+
+def rss(i):
+    items = "".join(
+        f"<item><title>story {i}.{n}</title><link>https://news{i}.test/{n}</link>"
+        f"<description>body {n}</description><pubDate>Mon, 05 Jan 2026 10:{n:02d}:00 GMT</pubDate></item>"
+        for n in range(i % 20)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>{i}</title>{items}</channel></rss>'
+
+
+def test_rss_feeds_fetched_concurrently_in_feed_order(mock_http, monkeypatch):
+    count = 25
+    failing = {f"news{i}.test" for i in range(count) if i % 7 == 3}
+    monkeypatch.setattr(settings, "rss_feeds", ",".join(f"Feed {i}|https://news{i}.test/rss" for i in range(count)))
+    monkeypatch.setattr(settings, "rss_feeds_file", None)
+    monkeypatch.setattr(settings, "rss_concurrency", 4)
+    documents = {f"news{i}.test": (lambda _, i=i: httpx.Response(200, text=rss(i))) for i in range(count)}
+    upstream = Upstream(documents, failing)
+    mock_http(upstream)
+    parse, threads = feedparser.parse, set()
+
+    def traced_parse(*args, **kwargs):
+        threads.add(threading.get_ident())
+        return parse(*args, **kwargs)
+
+    monkeypatch.setattr(feedparser, "parse", traced_parse)
+    ingestor = RSSNewsIngestor()
+
+    async def run():
+        return await ingestor.fetch(), threading.get_ident()
+
+    events, loop_thread = asyncio.run(run())
+    # Reference: each working feed in turn, at most 15 entries each
+    expected = [
+        (ingestor.event_id(f"https://news{i}.test/{n}"), f"[Feed {i}] story {i}.{n}")
+        for i in range(count) if f"news{i}.test" not in failing for n in range(min(i % 20, 15))
+    ]
+    assert [(e.id, e.title) for e in events] == expected
+    assert all(e.metadata["feed_url"] == f"https://{e.url.split('/')[2]}/rss" for e in events)
+    assert 2 <= upstream.peak <= 4
+    assert threads and loop_thread not in threads
+
+    # Once stored, the same documents come back unchanged
+    asyncio.run(ingestor.commit())
+    with pytest.raises(FeedUnchanged):
+        asyncio.run(ingestor.fetch())
+
+
+def test_rss_fails_only_when_every_feed_fails(mock_http, monkeypatch):
+    monkeypatch.setattr(settings, "rss_feeds", "https://news1.test/rss,https://news2.test/rss")
+    monkeypatch.setattr(settings, "rss_feeds_file", None)
+    mock_http(Upstream({}, {"news1.test", "news2.test"}))
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(RSSNewsIngestor().fetch())
+
+
+def listing(sub, posts):
+    return {"data": {"children": [
+        {"data": {"id": f"{sub}{n}", "title": f"{sub} post {n}", "created_utc": 1_767_600_000 + n,
+                  "permalink": f"/r/{sub}/comments/{sub}{n}/", "url": f"https://example.test/{n}", "score": n}}
+        for n in range(posts)
+    ]}}
+
+
+def test_subreddits_fetched_concurrently_in_order(mock_http, monkeypatch):
+    subs = [f"sub{i}" for i in range(12)]
+    monkeypatch.setattr(settings, "subreddits", " r/".join(["", *subs, "sub0"]))
+    monkeypatch.setattr(settings, "reddit_concurrency", 3)
+
+    def hot(request):
+        sub = request.url.path.split("/")[2]
+        return httpx.Response(200, json=listing(sub, int(sub[3:]) % 5))
+
+    upstream = Upstream({"www.reddit.com": hot})
+    mock_http(upstream)
+    ingestor = RedditIngestor()
+    assert ingestor.subreddits == subs
+    events = asyncio.run(ingestor.fetch())
+    assert [e.title for e in events] == [f"r/{s}: {s} post {n}" for s in subs for n in range(int(s[3:]) % 5)]
+    assert upstream.requests == len(subs)
+    assert 2 <= upstream.peak <= 3
+
+    upstream.failing = {"www.reddit.com"}
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(RedditIngestor().fetch())
@@ -0,0 +1,75 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from app.services.readiness import FAILED, PENDING, READY, Readiness
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_warm_up_settles_each_subsystem_off_the_loop():
+    readiness = Readiness()
+    threads = {}
+
+    def load(name, seconds, result=True):
+        def fn():
+            threads[name] = threading.get_ident()
+            time.sleep(seconds)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return fn
+
+    async def run():
+        readiness.register("embeddings", "ner", "qdrant")
+        assert readiness.report()["status"] == "starting"
+        tasks = [
+            asyncio.create_task(readiness.warm("embeddings", load("embeddings", 0.1))),
+            asyncio.create_task(readiness.warm("ner", load("ner", 0.02, False))),
+            asyncio.create_task(readiness.warm("qdrant", load("qdrant", 0.05, ConnectionError("refused")))),
+        ]
+        # Never-registered subsystems don't block; registered ones wait for their warm-up
+        await readiness.wait("geocoder")
+        await readiness.wait("ner")
+        partial = readiness.report()
+        ticks = 0
+        while not readiness.settled:
+            ticks += 1
+            await asyncio.sleep(0.005)
+        return await asyncio.gather(*tasks), partial, ticks, threading.get_ident()
+
+    results, partial, ticks, loop_thread = asyncio.run(run())
+    assert results == [True, False, False]
+    assert partial["status"] == "starting"
+    assert partial["subsystems"]["ner"]["state"] == FAILED
+    assert partial["subsystems"]["embeddings"]["state"] == PENDING
+    # The loop kept running while the models loaded
+    assert ticks > 5
+    assert loop_thread not in threads.values()
+
+    report = readiness.report()
+    assert report["status"] == "degraded"
+    assert report["subsystems"]["embeddings"]["state"] == READY
+    assert report["subsystems"]["ner"]["detail"] == "unavailable"
+    assert report["subsystems"]["qdrant"]["detail"] == "ConnectionError: refused"
+    assert report["ready_after_seconds"] is not None
+    assert readiness.is_ready("embeddings") and not readiness.is_ready("qdrant") and not readiness.is_ready("nope")
+
+
+def test_app_imports_without_loading_models():
+    """Importing the app must not pull in spaCy or the embedding stack."""
+    script = (
+        "import sys\n"
+        "class Block:\n"
+        "    def find_spec(self, name, path=None, target=None):\n"
+        "        if name.split('.')[0] in ('spacy', 'sentence_transformers', 'torch', 'onnxruntime', 'transformers'):\n"
+        "            raise ImportError('heavy import at startup: ' + name)\n"
+        "sys.meta_path.insert(0, Block())\n"
+        "import app.main\n"
+    )
+    env = {**os.environ, "PYTHONPATH": BACKEND}
+    result = subprocess.run([sys.executable, "-c", script], cwd=BACKEND, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr[-2000:]
@@ -0,0 +1,172 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.ingestors.base import BaseIngestor, FeedUnchanged
+from app.models.schemas import EventSource
+from app.services import resilience
+from app.services.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, backoff_delay, is_retryable
+
+
+def status_error(code, headers=None):
+    request = httpx.Request("GET", "https://upstream.test/")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(code, headers=headers, request=request))
+
+
+class ReferenceBreaker:
+    """The breaker's contract, replayed from the outcomes of the fetches it let through."""
+
+    def __init__(self, threshold, reset, max_reset):
+        self.threshold, self.reset, self.max_reset = threshold, reset, max_reset
+        self.outcomes = []  # (time, ok) of finished fetches
+        self.open_until = None
+        self.wait = reset
+        self.probe_out = False
+
+    def allow(self, now):
+        if self.open_until is None:
+            return True
+        if now < self.open_until or self.probe_out:
+            return False
+        self.probe_out = True
+        return True
+
+    def finish(self, now, ok):
+        probing, self.probe_out = self.probe_out, False
+        self.outcomes.append((now, ok))
+        if ok:
+            self.open_until, self.wait = None, self.reset
+        elif probing:
+            self.wait = min(self.wait * 2, self.max_reset)
+            self.open_until = now + self.wait
+        else:
+            trailing = len(self.outcomes) - max((i + 1 for i, (_, o) in enumerate(self.outcomes) if o), default=0)
+            if trailing >= self.threshold:
+                self.open_until = now + self.wait
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_breaker_matches_reference(monkeypatch, seed):
+    rng = random.Random(seed)
+    clock = [0.0]
+    monkeypatch.setattr(resilience, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    threshold = rng.randrange(1, 5)
+    breaker = CircuitBreaker(threshold=threshold, reset=10, max_reset=80)
+    reference = ReferenceBreaker(threshold, 10, 80)
+    running = []  # fetches let through and not finished yet
+    healthy = rng.random()
+
+    for _ in range(2000):
+        clock[0] += rng.expovariate(1 / 2)
+        if running and rng.random() < 0.5:
+            running.pop()
+            ok = rng.random() < healthy
+            breaker.success() if ok else breaker.failure()
+            reference.finish(clock[0], ok)
+        else:
+            allowed = breaker.allow()
+            assert allowed == reference.allow(clock[0])
+            if allowed:
+                running.append(clock[0])
+        expected_open = reference.open_until is not None and not reference.probe_out
+        assert (breaker.state == OPEN) == (expected_open and clock[0] < reference.open_until)
+        assert breaker.state in (CLOSED, OPEN, HALF_OPEN)
+        assert breaker.reset == reference.wait <= 80
+        if breaker.state == OPEN:
+            assert breaker.retry_in() == pytest.approx(reference.open_until - clock[0])
+
+
+def test_backoff_is_full_jitter_within_cap():
+    random.seed(0)
+    for attempt in range(8):
+        bound = min(30, 2 * 2 ** attempt)
+        delays = [backoff_delay(attempt, 2, 30) for _ in range(2000)]
+        assert 0 <= min(delays) and max(delays) <= bound
+        # Spread over the whole window, not clustered at its top
+        assert min(delays) < bound * 0.05 and max(delays) > bound * 0.95
+        assert sum(delays) / len(delays) == pytest.approx(bound / 2, rel=0.1)
+
+
+def test_backoff_honours_retry_after_up_to_cap():
+    assert backoff_delay(0, 2, 30, status_error(429, {"Retry-After": "7"})) == 7
+    assert backoff_delay(0, 2, 30, status_error(503, {"Retry-After": "120"})) == 30
+    # An HTTP-date or missing header falls back to jitter
+    assert 0 <= backoff_delay(0, 2, 30, status_error(503, {"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"})) <= 2
+    assert 0 <= backoff_delay(1, 2, 30, status_error(503)) <= 4
+
+
+@pytest.mark.parametrize("exc, retryable", [
+    (status_error(429), True), (status_error(500), True), (status_error(503), True), (status_error(408), True),
+    (status_error(404), False), (status_error(401), False), (status_error(400), False),
+    (httpx.ReadTimeout("slow"), True), (httpx.ConnectError("refused"), True),
+    (httpx.RemoteProtocolError("closed"), True), (ValueError("bad csv"), False), (KeyError("lat"), False),
+])
+def test_is_retryable(exc, retryable):
+    assert is_retryable(exc) is retryable
+
+
+class ScriptedFeed(BaseIngestor):
+    """Raises each scripted error in turn, then returns its events; `delay` stalls every call."""
+
+    name = "test-scripted"
+    source = EventSource.USGS
+
+    def __init__(self, errors=(), delay=0.0):
+        super().__init__()
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = 0
+
+    def is_configured(self) -> bool:
+        return True
+
+    async def fetch(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.errors:
+            raise self.errors.pop(0)
+        return ["event"]
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "feed_retries", 2)
+    monkeypatch.setattr(settings, "feed_retry_base_seconds", 0.001)
+    monkeypatch.setattr(settings, "feed_retry_max_seconds", 0.01)
+    monkeypatch.setattr(settings, "circuit_failure_threshold", 2)
+
+
+def test_transient_errors_are_retried(fast_retries):
+    feed = ScriptedFeed([status_error(503), httpx.ReadTimeout("slow")])
+    assert asyncio.run(feed.safe_fetch()) == ["event"]
+    assert feed.calls == 3 and feed.last_error is None and feed.breaker.state == CLOSED
+
+    feed = ScriptedFeed([status_error(503)] * 3)
+    assert asyncio.run(feed.safe_fetch()) == []
+    assert feed.calls == 3 and feed.breaker.failures == 1
+
+
+def test_permanent_errors_fail_at_once_and_open_the_circuit(fast_retries):
+    feed = ScriptedFeed([status_error(404), ValueError("bad csv")])
+    assert asyncio.run(feed.safe_fetch()) == []
+    assert feed.calls == 1 and feed.last_error == "error"
+    assert asyncio.run(feed.safe_fetch()) == []
+    assert feed.breaker.state == OPEN and feed.last_error == "bad csv"
+    # An open circuit skips the feed without calling it
+    assert asyncio.run(feed.safe_fetch()) is None
+    assert feed.calls == 2
+
+
+def test_deadline_bounds_fetch_including_retries(fast_retries, monkeypatch):
+    monkeypatch.setattr(settings, "feed_deadline_seconds", 0.05)
+    feed = ScriptedFeed(delay=1.0)
+    assert asyncio.run(feed.safe_fetch()) == []
+    assert feed.last_error == "deadline of 0.05s exceeded"
+    feed = ScriptedFeed([FeedUnchanged()])
+    feed.fetch_deadline = 5
+    assert asyncio.run(feed.safe_fetch()) is None
+    assert feed.last_error is None and feed.breaker.state == CLOSED
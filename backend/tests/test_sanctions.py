@@ -0,0 +1,107 @@
+import asyncio
+import random
+
+import httpx
+import pytest
+
+from app.ingestors.ofac import SDN_URL, OFACIngestor
+from app.services.http_cache import http_cache
+from app.services.sanctions_snapshot import ADDED, AMENDED, SnapshotDiff, TruncatedList
+
+
+def random_list(rng, keys):
+    return {key: (rng.getrandbits(64), f"name {key}") for key in keys}
+
+
+def run_pass(diff, records):
+    diff.begin()
+    changes = {key: diff.observe(key, h, label) for key, (h, label) in records.items()}
+    removed = asyncio.run(diff.finish())
+    return changes, removed
+
+
+def test_diff_matches_set_operations(tmp_path):
+    rng = random.Random(0)
+    diff = SnapshotDiff("test", path=str(tmp_path / "test.npz"))
+    old = random_list(rng, map(str, range(1000)))
+    changes, removed = run_pass(diff, old)
+    assert diff.baseline and set(changes.values()) == {ADDED} and removed == []
+    asyncio.run(diff.save())
+
+    for _ in range(5):
+        new = {k: v for k, v in old.items() if rng.random() > 0.1}
+        for key in rng.sample(sorted(new), 50):
+            new[key] = (rng.getrandbits(64), new[key][1])
+        new.update(random_list(rng, (str(rng.randrange(10**4, 10**6)) for _ in range(40))))
+        changes, removed = run_pass(diff, new)
+        assert {k for k, c in changes.items() if c == ADDED} == new.keys() - old.keys()
+        assert {k for k, c in changes.items() if c == AMENDED} == {
+            k for k in new.keys() & old.keys() if new[k][0] != old[k][0]
+        }
+        assert {(k, h, label) for k, h, label in removed} == {(k, *old[k]) for k in old.keys() - new.keys()}
+        asyncio.run(diff.save())
+        old = new
+
+    # A fresh process picks the last snapshot up from disk
+    reloaded = SnapshotDiff("test", path=str(tmp_path / "test.npz"))
+    changes, removed = run_pass(reloaded, old)
+    assert not reloaded.baseline and not any(changes.values()) and removed == []
+
+
+def test_unsaved_pass_is_diffed_again(tmp_path):
+    diff = SnapshotDiff("test", path=str(tmp_path / "test.npz"))
+    run_pass(diff, {"1": (1, "a")})
+    asyncio.run(diff.save())
+    changes, _ = run_pass(diff, {"1": (1, "a"), "2": (2, "b")})
+    assert changes["2"] == ADDED
+    # Events of that pass were never stored: no save(), so "2" is still new
+    changes, _ = run_pass(diff, {"1": (1, "a"), "2": (2, "b")})
+    assert changes["2"] == ADDED
+
+
+def test_truncated_pass_raises_and_keeps_snapshot(tmp_path):
+    diff = SnapshotDiff("test", path=str(tmp_path / "test.npz"))
+    full = {str(i): (i, f"n{i}") for i in range(100)}
+    run_pass(diff, full)
+    asyncio.run(diff.save())
+    with pytest.raises(TruncatedList):
+        run_pass(diff, dict(list(full.items())[:10]))
+    asyncio.run(diff.save())
+    assert diff.previous == full
+
+
+def sdn_csv(rows):
+    return "".join(f'{n},"{name}","individual","PROG",-0-,-0-,-0-,-0-,-0-,-0-,-0-,"-0-"\r\n' for n, name in rows)
+
+
+def test_truncated_ofac_list_is_read_again(mock_http, tmp_path):
+    full = [(i, f"Person {i}") for i in range(1, 201)]
+    served = {"body": sdn_csv(full), "etag": '"v1"'}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("if-none-match") == served["etag"]:
+            return httpx.Response(304, headers={"etag": served["etag"]})
+        return httpx.Response(200, text=served["body"], headers={"etag": served["etag"]})
+
+    mock_http(handler)
+    ingestor = OFACIngestor()
+    ingestor.snapshot = SnapshotDiff("ofac_sdn", path=str(tmp_path / "ofac.npz"))
+    key = http_cache.key_for(SDN_URL)
+
+    assert asyncio.run(ingestor.safe_fetch()) == []  # Silent baseline
+    asyncio.run(ingestor.commit())
+    assert http_cache.was_delivered(key)
+
+    served.update(body=sdn_csv(full[:20] + [(999, "New Person")]), etag='"v2"')
+    assert asyncio.run(ingestor.safe_fetch()) == []
+    assert "records read" in ingestor.last_error
+    ingestor.rollback()  # What ingest_one does for a failed fetch
+    assert not http_cache.was_delivered(key)
+    assert len(ingestor.snapshot.previous) == 200
+
+    # Upstream now answers 304, but the body was never consumed, so it is replayed
+    seen = []
+    original = ingestor.snapshot.observe
+    ingestor.snapshot.observe = lambda *args: seen.append(args[0]) or original(*args)
+    asyncio.run(ingestor.safe_fetch())
+    assert len(seen) == 21
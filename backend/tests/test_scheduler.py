@@ -0,0 +1,164 @@
+import asyncio
+import random
+
+import pytest
+
+from app import scheduler
+from app.models.schemas import EventSource, FeedStatus
+from app.services.resilience import CircuitBreaker
+
+
+class FakeFeed:
+    """Stands in for an ingestor; the fake ingest_one below does the 'fetch'."""
+
+    def __init__(self, name, seconds, events=0):
+        self.name = name
+        self.source = EventSource.USGS
+        self.seconds = seconds
+        self.events = [f"{name}-{i}" for i in range(events)]
+
+
+class Recorder:
+    """Fake ingest_one: sleeps for the feed's fetch time and tracks overlap."""
+
+    def __init__(self):
+        self.active = set()
+        self.peak = 0
+        self.calls = []
+
+    async def __call__(self, feed):
+        assert feed.name not in self.active, f"{feed.name} fetched twice at once"
+        self.active.add(feed.name)
+        self.peak = max(self.peak, len(self.active))
+        self.calls.append(feed.name)
+        try:
+            await asyncio.sleep(feed.seconds)
+        finally:
+            self.active.discard(feed.name)
+        return list(feed.events)
+
+
+@pytest.fixture
+def fresh_scheduler(monkeypatch):
+    """Scheduler state bound to the test's own event loop."""
+    def install(feeds, concurrency):
+        recorder = Recorder()
+        monkeypatch.setattr(scheduler, "ALL_INGESTORS", feeds)
+        monkeypatch.setattr(scheduler, "ingest_one", recorder)
+        monkeypatch.setattr(scheduler, "_ingest_slots", asyncio.Semaphore(concurrency))
+        monkeypatch.setattr(scheduler, "_fetch_locks", {})
+        return recorder
+    return install
+
+
+@pytest.mark.parametrize("concurrency", [1, 3, 8])
+def test_run_ingestors_bounded_and_complete(fresh_scheduler, concurrency):
+    rng = random.Random(concurrency)
+    feeds = [FakeFeed(f"feed{i}", rng.uniform(0.001, 0.02), events=rng.randrange(5)) for i in range(20)]
+    recorder = fresh_scheduler(feeds, concurrency)
+    events = asyncio.run(scheduler.run_ingestors())
+    assert sorted(recorder.calls) == sorted(f.name for f in feeds)
+    assert recorder.peak == min(concurrency, len(feeds))
+    assert sorted(events) == sorted(e for f in feeds for e in f.events)
+
+
+def test_run_ingestors_overlaps_slow_feeds(fresh_scheduler):
+    feeds = [FakeFeed(f"slow{i}", 0.2) for i in range(6)]
+    fresh_scheduler(feeds, 6)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await scheduler.run_ingestors()
+        return loop.time() - started
+
+    # Serially this would take 1.2 s
+    assert asyncio.run(run()) < 0.6
+
+
+def test_run_ingestors_skips_feed_being_fetched(fresh_scheduler):
+    feeds = [FakeFeed("busy", 0.01, events=2), FakeFeed("idle", 0.01, events=3)]
+    recorder = fresh_scheduler(feeds, 4)
+
+    async def run():
+        async with scheduler._fetch_lock(feeds[0]):
+            return await scheduler.run_ingestors()
+
+    events = asyncio.run(run())
+    assert recorder.calls == ["idle"]
+    assert sorted(events) == ["idle-0", "idle-1", "idle-2"]
+
+
+def status(feed, error=None, event_count=0, new_count=0):
+    return FeedStatus(
+        name=feed.name, source=feed.source, enabled=True, configured=True,
+        error=error, event_count=event_count, new_count=new_count,
+    )
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_next_interval_backs_off_and_speeds_up(seed):
+    rng = random.Random(seed)
+    feed = FakeFeed("feed", 0)
+    for _ in range(500):
+        feed.min_interval = rng.uniform(1, 100)
+        feed.max_interval = feed.min_interval * rng.uniform(1, 50)
+        interval = rng.uniform(feed.min_interval, feed.max_interval)
+        fetched = rng.randrange(1, 1000)
+        failed = scheduler.next_interval(feed, interval, status(feed, error="boom"))
+        unchanged = scheduler.next_interval(feed, interval, status(feed, event_count=fetched))
+        novel = scheduler.next_interval(feed, interval, status(feed, event_count=fetched, new_count=rng.randrange(1, fetched + 1)))
+        all_new = scheduler.next_interval(feed, interval, status(feed, event_count=fetched, new_count=fetched))
+        for got in (failed, unchanged, novel, all_new):
+            assert feed.min_interval <= got <= feed.max_interval
+        assert failed == min(interval * 2, feed.max_interval)
+        assert unchanged == min(interval * 1.5, feed.max_interval)
+        assert all_new == max(interval / 2, feed.min_interval)
+        assert all_new <= novel <= interval <= unchanged <= failed
+
+
+class ScheduledFeed(FakeFeed):
+    def __init__(self, name, seconds, interval, error=None):
+        super().__init__(name, seconds)
+        self.poll_interval = self.min_interval = interval
+        self.max_interval = 10 * interval
+        self.breaker = CircuitBreaker()
+        self.error = error
+
+
+def test_scheduler_loop_polls_each_feed_on_its_interval(fresh_scheduler, monkeypatch):
+    feeds = [
+        ScheduledFeed("fast", 0.01, 0.05),
+        ScheduledFeed("slow", 0.01, 0.2),
+        ScheduledFeed("failing", 0.01, 0.05, error="upstream down"),
+    ]
+    recorder = fresh_scheduler(feeds, 2)
+    statuses = {}
+    monkeypatch.setitem(scheduler._state, "feed_statuses", statuses)
+
+    async def fetch(feed):
+        await recorder(feed)
+        # Unchanged feeds keep their interval at the minimum; failing ones back off
+        statuses[feed.name] = status(feed, error=feed.error, event_count=1, new_count=0 if feed.error else 1)
+        return []
+
+    monkeypatch.setattr(scheduler, "ingest_one", fetch)
+
+    async def run():
+        loop_task = asyncio.create_task(scheduler.scheduler_loop())
+        await asyncio.sleep(1.0)
+        # A manual refresh meanwhile must not overlap the scheduled fetches
+        await scheduler.run_ingestors()
+        await asyncio.sleep(0.2)
+        loop_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await loop_task
+
+    asyncio.run(run())
+    counts = {feed.name: recorder.calls.count(feed.name) for feed in feeds}
+    # Due every interval plus fetch time (plus one manual refresh), over ~1.2 s
+    assert 12 <= counts["fast"] <= 26
+    assert 4 <= counts["slow"] <= 9
+    # Backing off: 0.05, 0.1, 0.2, 0.4, 0.5 (capped) ...
+    assert 3 <= counts["failing"] <= 7
+    assert counts["failing"] < counts["fast"] / 2
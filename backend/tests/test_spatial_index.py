@@ -0,0 +1,79 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.services.spatial_index import GridIndex, bbox_mask, circle_bbox, haversine_km
+
+
+def random_points(count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-90, 90, count), rng.uniform(-180, 180, count)
+
+
+def test_haversine_known_distance():
+    # London -> Paris is about 344 km
+    d = haversine_km(np.array([51.5074]), np.array([-0.1278]), 48.8566, 2.3522)
+    assert d[0] == pytest.approx(343.5, abs=1.0)
+
+
+def test_haversine_keeps_nan():
+    assert np.isnan(haversine_km(np.array([np.nan]), np.array([0.0]), 0.0, 0.0)[0])
+
+
+@pytest.mark.parametrize("lat,lon,radius", [
+    (0.0, 0.0, 500.0),
+    (10.0, 179.5, 300.0),  # crosses the antimeridian eastwards
+    (-20.0, -179.0, 800.0),  # and westwards
+    (88.0, 30.0, 400.0),  # reaches the pole
+    (45.0, 90.0, 25000.0),  # larger than a hemisphere
+])
+def test_circle_bbox_contains_circle(lat, lon, radius):
+    lats, lons = random_points(20000, seed=1)
+    inside = haversine_km(lats, lons, lat, lon) <= radius
+    assert bbox_mask(lats, lons, circle_bbox(lat, lon, radius))[inside].all()
+
+
+def test_circle_bbox_crossing_antimeridian_wraps():
+    min_lat, max_lat, min_lon, max_lon = circle_bbox(0.0, 179.0, 500.0)
+    assert min_lon > max_lon
+    assert min_lon > 170 and max_lon < -170
+
+
+def test_bbox_mask_antimeridian():
+    lats = np.array([0.0, 0.0, 0.0, 0.0])
+    lons = np.array([175.0, -175.0, 0.0, 170.0])
+    assert bbox_mask(lats, lons, (-10.0, 10.0, 172.0, -172.0)).tolist() == [True, True, False, False]
+
+
+def test_bbox_mask_excludes_unplaced():
+    assert not bbox_mask(np.array([np.nan]), np.array([np.nan]), (-90.0, 90.0, -180.0, 180.0))[0]
+
+
+@pytest.mark.parametrize("cell_degrees", [1.0, 5.0])
+def test_grid_candidates_superset_of_bbox(cell_degrees):
+    lats, lons = random_points(5000, seed=2)
+    grid = GridIndex(cell_degrees)
+    cells = grid.cell_of(lats, lons)
+    rows = np.arange(len(lats))
+    grid.move(rows.tolist(), [-1] * len(rows), cells.tolist())
+    rng = random.Random(3)
+    boxes = [(-90.0, 90.0, -180.0, 180.0), (-5.0, 5.0, 170.0, -170.0)]
+    for _ in range(50):
+        lat0, lat1 = sorted(rng.uniform(-90, 90) for _ in range(2))
+        boxes.append((lat0, lat1, rng.uniform(-180, 180), rng.uniform(-180, 180)))
+    for bbox in boxes:
+        expected = set(np.flatnonzero(bbox_mask(lats, lons, bbox)).tolist())
+        candidates = grid.candidates(bbox)
+        assert expected <= set(candidates.tolist())
+        assert len(candidates) == len(set(candidates.tolist()))
+
+
+def test_grid_move_and_remove():
+    grid = GridIndex(1.0)
+    grid.move([0, 1], [-1, -1], [10, 10])
+    grid.move([0], [10], [20])
+    assert grid.cells == {10: {1}, 20: {0}}
+    grid.remove([0, 1], [20, 10])
+    assert grid.cells == {}
+    assert grid.get_stats()["indexed_events"] == 0
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from app.services.time_index import NEXT, PREV, TimeIndex, decode_cursor, encode_cursor, id_key
+
+
+def test_cursor_round_trip():
+    for direction in (NEXT, PREV):
+        cursor = encode_cursor(direction, 1_767_225_600_000_000, id_key("event-1"))
+        assert decode_cursor(cursor) == (direction, 1_767_225_600_000_000, id_key("event-1"))
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "AAAA", encode_cursor(NEXT, 1, 2)[:-3]])
+def test_bad_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_unknown_direction_rejected():
+    cursor = encode_cursor("x", 1, 2)
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_id_key_is_stable_signed_64_bit():
+    assert id_key("abc") == id_key("abc")
+    assert id_key("abc") != id_key("abd")
+    assert -(2 ** 63) <= id_key("abc") < 2 ** 63
+
+
+def test_stays_sorted_through_adds_and_removes():
+    rng = np.random.default_rng(0)
+    index = TimeIndex()
+    live = {}
+    for _ in range(30):
+        rows = rng.choice(5000, 200, replace=False)
+        index.remove(np.array([r for r in rows if r in live], dtype=np.int64))
+        ts = rng.integers(0, 50, len(rows))  # Many ties
+        keys = rng.integers(-(2 ** 63), 2 ** 63 - 1, len(rows))
+        index.add(rows.astype(np.int64), ts, keys)
+        live.update(zip(rows.tolist(), zip(ts.tolist(), keys.tolist())))
+        if live:
+            gone = rng.choice(list(live), 50)
+            index.remove(np.unique(gone).astype(np.int64))
+            for row in gone.tolist():
+                live.pop(row, None)
+        expected = sorted(live, key=lambda r: live[r])
+        assert index.rows.tolist() == expected
+        assert [tuple(k) for k in index.keys.tolist()] == [live[r] for r in expected]
+
+
+def test_span_matches_brute_force():
+    rng = np.random.default_rng(1)
+    index = TimeIndex()
+    ts = rng.integers(0, 100, 1000)
+    index.add(np.arange(1000, dtype=np.int64), ts, rng.integers(-1000, 1000, 1000))
+    for since, until in [(None, None), (10, None), (None, 50), (20, 20), (30, 10), (-5, 500)]:
+        lo, hi = index.span(since, until)
+        rows = index.rows[lo:hi]
+        expected = {
+            r for r in range(1000)
+            if (since is None or ts[r] >= since) and (until is None or ts[r] <= until)
+        }
+        assert set(rows.tolist()) == expected
@@ -0,0 +1,96 @@
+import random
+from collections import deque
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.services.track_store import BYTES_PER_POINT, TrackStore
+
+DEPTH = 6
+
+
+def small_store(slots: int) -> TrackStore:
+    store = TrackStore(depth=DEPTH, memory_mb=slots * DEPTH * BYTES_PER_POINT / (1024 * 1024))
+    assert store.slots == slots
+    return store
+
+
+def random_batch(rng, keys, now):
+    picked = rng.sample(keys, rng.randrange(1, len(keys) // 2))
+    times = np.array([now - rng.choice([0.0, 0.0, 1.0, 30.0]) for _ in picked])
+    lats = np.array([rng.uniform(-80, 80) for _ in picked])
+    lons = np.array([rng.uniform(-180, 180) for _ in picked])
+    alts = np.array([rng.choice([rng.uniform(0, 12000), np.nan]) for _ in picked])
+    if rng.random() < 0.2:
+        lats[0] = np.nan  # No position
+    return picked, times, lats, lons, alts
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_tracks_match_per_object_history(monkeypatch, seed):
+    monkeypatch.setattr(settings, "track_idle_seconds", 1e9)
+    rng = random.Random(seed)
+    keys = ["%06x" % rng.randrange(1 << 24) for _ in range(60)]
+    store = small_store(40)
+    history = {}  # Reference: key -> last DEPTH fixes, dropped when the store evicts the key
+
+    for step in range(300):
+        now = 1000.0 + step * 10
+        batch = random_batch(rng, keys, now)
+        appended = [k for k, lat in zip(batch[0], batch[2]) if k in store.index and not np.isnan(lat)]
+        store.append(*batch)
+        # Tracks with a fix in the batch are never evicted to make room for newcomers
+        assert all(k in store.index for k in appended), step
+        for key in list(history):
+            if key not in store.index:
+                del history[key]
+        for key, t, lat, lon, alt in zip(*batch):
+            if np.isnan(lat) or key not in store.index:
+                continue
+            track = history.setdefault(key, deque(maxlen=DEPTH))
+            if not track or t > track[-1][0]:
+                track.append((t, lat, lon, alt))
+
+        assert set(store.index) == set(history)
+        assert len(store) + len(store.free) == store.slots
+        for key, fixes in history.items():
+            got = store.track(key)["points"]
+            assert got["time"] == [f[0] for f in fixes]
+            assert got["lat"] == pytest.approx([f[1] for f in fixes], abs=1e-4)
+            assert got["lon"] == pytest.approx([f[2] for f in fixes], abs=1e-3)
+
+
+def test_full_store_evicts_least_recent_outside_batch(monkeypatch):
+    monkeypatch.setattr(settings, "track_idle_seconds", 1e9)
+    store = small_store(4)
+    one = np.ones(1)
+    for i, key in enumerate(["a", "b", "c", "d"]):
+        store.append([key], one * (100 + i), one, one, one)
+    # "a" is the least recently updated track but gets a fix in this batch
+    store.append(["a", "e", "f"], np.array([200.0, 200.0, 200.0]), np.ones(3), np.ones(3), np.ones(3))
+    assert set(store.index) == {"a", "d", "e", "f"}
+    assert store.track("a")["count"] == 2
+    assert store.evicted == 2
+
+
+def test_new_keys_beyond_capacity_are_dropped_not_the_batch(monkeypatch):
+    monkeypatch.setattr(settings, "track_idle_seconds", 1e9)
+    store = small_store(3)
+    n = np.ones(2)
+    store.append(["a", "b"], np.array([1.0, 2.0]), n, n, n)
+    stored = store.append(["a", "b", "c", "d"], np.full(4, 10.0), np.ones(4), np.ones(4), np.ones(4))
+    assert stored == 3
+    assert {"a", "b"} <= set(store.index)
+    assert len(store) == 3
+    assert store.track("a")["count"] == 2
+
+
+def test_idle_tracks_are_freed(monkeypatch):
+    monkeypatch.setattr(settings, "track_idle_seconds", 60)
+    store = small_store(8)
+    n = np.ones(2)
+    store.append(["a", "b"], np.array([0.0, 0.0]), n, n, n)
+    store.append(["a"], np.array([100.0]), np.ones(1), np.ones(1), np.ones(1))
+    assert set(store.index) == {"a"}
+    assert len(store.free) == 7
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from app.services import vector_store as vector_store_module
+from app.services.vector_store import VectorStore
+from tests.conftest import make_events
+
+
+class SlowClient:
+    """Blocking stand-in for QdrantClient that records what it was sent and from where."""
+
+    def __init__(self, delay: float = 0.02, fail_on: int = -1):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.batches = []
+        self.threads = set()
+
+    def upsert(self, collection_name, points):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        if len(self.batches) == self.fail_on:
+            raise RuntimeError("qdrant down")
+        self.batches.append(points)
+
+    def search(self, **kwargs):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        return []
+
+    def get_collection(self, name):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        return type("Info", (), {"points_count": sum(len(b) for b in self.batches)})()
+
+
+async def ticks_during(coro):
+    """Run coro while counting how often the event loop got to run another task."""
+    ticks = 0
+    done = False
+
+    async def ticker():
+        nonlocal ticks
+        while not done:
+            ticks += 1
+            await asyncio.sleep(0.001)
+
+    task = asyncio.create_task(ticker())
+    try:
+        result = await coro
+    finally:
+        done = True
+        await task
+    return result, ticks
+
+
+def test_upsert_batch_chunks_off_the_loop(monkeypatch):
+    monkeypatch.setattr(vector_store_module, "UPSERT_CHUNK", 100)
+    store = VectorStore()
+    store.client = SlowClient()
+    events = make_events(450)
+    embeddings = np.random.default_rng(0).random((450, 384), dtype=np.float32)
+
+    ok, ticks = asyncio.run(ticks_during(store.upsert_batch(events, embeddings)))
+    assert ok
+    assert [len(b) for b in store.client.batches] == [100, 100, 100, 100, 50]
+    sent = [p for batch in store.client.batches for p in batch]
+    assert [p.id for p in sent] == [e.id for e in events]
+    assert np.allclose(np.array([p.vector for p in sent]), embeddings)
+    assert threading.get_ident() not in store.client.threads
+    assert ticks >= 5  # The loop kept running while the chunks were sent
+
+
+def test_upsert_batch_reports_failure(monkeypatch):
+    monkeypatch.setattr(vector_store_module, "UPSERT_CHUNK", 100)
+    store = VectorStore()
+    store.client = SlowClient(delay=0, fail_on=2)
+    events = make_events(450)
+    assert not asyncio.run(store.upsert_batch(events, np.zeros((450, 384), dtype=np.float32)))
+    assert asyncio.run(store.upsert_batch([], np.zeros((0, 384), dtype=np.float32)))
+    store.client = None
+    assert not asyncio.run(store.upsert_batch(events, np.zeros((450, 384), dtype=np.float32)))
+
+
+def test_search_and_count_off_the_loop():
+    store = VectorStore()
+    store.client = SlowClient()
+    results, ticks = asyncio.run(ticks_during(store.search_similar(np.zeros(384, dtype=np.float32))))
+    assert results == [] and ticks >= 2
+    count, ticks = asyncio.run(ticks_during(store.get_event_count()))
+    assert count == 0 and ticks >= 2
+    assert threading.get_ident() not in store.client.threads
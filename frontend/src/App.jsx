@@ -1,7 +1,7 @@
 import React, { useState, useEffect, useRef, useMemo } from 'react';
 import * as Cesium from 'cesium';
-import { fetchEvents, searchEvents, getRelationships, getStats } from './services/api';
-import { connect, subscribe, disconnect, subscribeStatus } from './services/websocket';
+import { fetchEvents, fetchAircraft, fetchTracks, searchEvents, getRelationships, getStats } from './services/api';
+import { connect, connectAircraft, subscribe, disconnect, subscribeStatus } from './services/websocket';
 import LayerPanel from './components/LayerPanel';
 import EntityDetail from './components/EntityDetail';
 import RelationshipGraph from './components/RelationshipGraph';
@@ -53,9 +53,67 @@ function formatGridRegion(lat, lon) {
   return `${latLabel} ${lonLabel}`;
 }
 
+// The globe draws at most 2500 points, events before aircraft, so aircraft
+// past this cap would rarely be drawn; fetching and ticking them is wasted.
+const AIRCRAFT_LIMIT = 1000;
+
+// Move known aircraft to the dead-reckoned positions of a /ws/aircraft tick.
+// New aircraft appear with the next /api/aircraft poll, which carries their
+// callsign and other details.
+function applyPositions(aircraft, tick) {
+  if (!tick?.icao24?.length || !aircraft.length) return aircraft;
+  const at = new Map(tick.icao24.map((icao24, i) => [icao24, i]));
+  return aircraft.map((ac) => {
+    const i = at.get(ac.metadata.icao24);
+    if (i === undefined || tick.lat[i] == null || tick.lon[i] == null) return ac;
+    return {
+      ...ac,
+      lat: tick.lat[i],
+      lon: tick.lon[i],
+      metadata: { ...ac.metadata, altitude_m: tick.altitude[i], heading: tick.heading[i] },
+    };
+  });
+}
+
+function aircraftToEvents(data) {
+  const a = data?.aircraft;
+  if (!a?.icao24) return [];
+  return a.icao24.map((icao24, i) => {
+    const callsign = a.callsign[i];
+    const origin = a.origin[i];
+    const fix = a.fix_time[i] ?? data.time;
+    return {
+      id: `aircraft-${icao24}`,
+      source: 'opensky',
+      event_type: 'aviation',
+      title: `Aircraft ${callsign || 'Unknown'}` + (origin ? ` (${origin})` : ''),
+      description: a.altitude[i] != null && a.velocity[i] != null && a.heading[i] != null
+        ? `Alt: ${Math.round(a.altitude[i])}m | Speed: ${Math.round(a.velocity[i])}m/s | Heading: ${Math.round(a.heading[i])}°`
+        : 'In flight',
+      lat: a.lat[i],
+      lon: a.lon[i],
+      timestamp: fix ? new Date(fix * 1000).toISOString() : null,
+      severity: 'low',
+      entities: [],
+      metadata: {
+        icao24,
+        callsign,
+        origin_country: origin,
+        altitude_m: a.altitude[i],
+        velocity_ms: a.velocity[i],
+        heading: a.heading[i],
+        on_ground: a.on_ground[i],
+        squawk: a.squawk[i],
+      },
+    };
+  });
+}
+
 export default function App() {
   const [events, setEvents] = useState([]);
   const [filteredEvents, setFilteredEvents] = useState([]);
+  const [aircraft, setAircraft] = useState([]);
+  const [tracks, setTracks] = useState([]);
   const [selectedEvent, setSelectedEvent] = useState(null);
   const [relationships, setRelationships] = useState(null);
   const [stats, setStats] = useState(null);
@@ -333,10 +391,28 @@ export default function App() {
         },
       });
     });
-  }, [filteredEvents, timelineNow]);
+
+    if (activeLayers.has('aviation')) {
+      const trailColor = Cesium.Color.fromCssColorString(TYPE_COLORS_CSS.aviation).withAlpha(0.45);
+      tracks.forEach((track) => {
+        const coords = track.geometry?.coordinates || [];
+        if (coords.length < 2) return;
+        viewer.entities.add({
+          polyline: {
+            positions: Cesium.Cartesian3.fromDegreesArray(coords.flatMap(([lon, lat]) => [lon, lat])),
+            width: 1,
+            material: trailColor,
+            arcType: Cesium.ArcType.GEODESIC,
+          },
+        });
+      });
+    }
+  }, [filteredEvents, timelineNow, tracks, activeLayers]);
 
   useEffect(() => {
     loadEvents();
+    loadAircraft();
+    loadTracks();
     loadStats();
     connect();
 
@@ -367,12 +443,23 @@ export default function App() {
       setWsEventCount(prev => prev + (newEvents?.length || 0));
     });
 
+    // Positions move with every WS tick; the slower poll picks up new
+    // aircraft and details, which change only when OpenSky is polled
+    const closeAircraft = connectAircraft({ limit: AIRCRAFT_LIMIT }, (tick) => {
+      setAircraft(prev => applyPositions(prev, tick));
+    });
+
     const interval = setInterval(loadEvents, 300000);
+    const aircraftInterval = setInterval(loadAircraft, 60000);
+    const tracksInterval = setInterval(loadTracks, 60000);
     return () => {
       unsub();
       unsubStatus();
       disconnect();
+      closeAircraft();
       clearInterval(interval);
+      clearInterval(aircraftInterval);
+      clearInterval(tracksInterval);
     };
   }, []);
 
@@ -380,7 +467,7 @@ export default function App() {
     const maxNow = isPaused && replayCursor ? replayCursor : Date.now();
     const windowMs = TIME_WINDOWS[timeWindow];
 
-    const filtered = events.filter((e) => {
+    const filtered = [...events, ...aircraft].filter((e) => {
       if (!activeLayers.has(e.event_type)) return false;
       if (activeSources.size > 0 && !activeSources.has(e.source)) return false;
       if (!windowMs) return true;
@@ -389,7 +476,7 @@ export default function App() {
     });
 
     setFilteredEvents(filtered);
-  }, [events, activeLayers, activeSources, timeWindow, isPaused, replayCursor]);
+  }, [events, aircraft, activeLayers, activeSources, timeWindow, isPaused, replayCursor]);
 
   const geoStats = (() => {
     let geoCount = 0;
@@ -465,6 +552,29 @@ export default function App() {
     }
   };
 
+  const loadAircraft = async () => {
+    try {
+      // Dead-reckoned to now; /ws/aircraft ticks keep them moving afterwards
+      const incoming = aircraftToEvents(await fetchAircraft({ limit: AIRCRAFT_LIMIT, at: Date.now() / 1000 }));
+      setAircraft(incoming);
+      if (incoming.length > 0) {
+        setActiveSources(prev => (prev.has('opensky') ? prev : new Set([...prev, 'opensky'])));
+      }
+    } catch (e) {
+      console.error('Failed to load aircraft:', e);
+    }
+  };
+
+  const loadTracks = async () => {
+    try {
+      const since = Math.floor(Date.now() / 1000) - 1800;
+      const trails = await fetchTracks({ limit: 1000, since });
+      setTracks(trails.features || []);
+    } catch (e) {
+      console.error('Failed to load tracks:', e);
+    }
+  };
+
   const loadStats = async () => {
     try { setStats(await getStats()); } catch (e) { console.error(e); }
   };
@@ -7,6 +7,20 @@ export async function fetchEvents(params = {}) {
   return resp.json();
 }
 
+export async function fetchAircraft(params = {}) {
+  const qs = new URLSearchParams();
+  Object.entries(params).forEach(([k, v]) => { if (v != null) qs.set(k, v); });
+  const resp = await fetch(`${API_BASE}/api/aircraft?${qs}`);
+  return resp.json();
+}
+
+export async function fetchTracks(params = {}) {
+  const qs = new URLSearchParams();
+  Object.entries(params).forEach(([k, v]) => { if (v != null) qs.set(k, v); });
+  const resp = await fetch(`${API_BASE}/api/tracks?${qs}`);
+  return resp.json();
+}
+
 export async function searchEvents(query) {
   const resp = await fetch(`${API_BASE}/api/search`, {
     method: 'POST',
@@ -51,3 +51,36 @@ export function subscribeStatus(fn) {
   statusListeners.push(fn);
   return () => { statusListeners = statusListeners.filter(f => f !== fn); };
 }
+
+// Dead-reckoned aircraft positions, pushed every AIRCRAFT_TICK_SECONDS.
+// Returns a function that closes the socket and stops reconnecting.
+export function connectAircraft(params, onPositions) {
+  const qs = new URLSearchParams();
+  Object.entries(params).forEach(([k, v]) => { if (v != null) qs.set(k, v); });
+  let socket = null;
+  let timer = null;
+  let closed = false;
+
+  const open = () => {
+    socket = new WebSocket(`${WS_URL}/aircraft?${qs}`);
+    socket.binaryType = 'arraybuffer';
+    socket.onmessage = (event) => {
+      try {
+        onPositions(JSON.parse(new TextDecoder().decode(event.data)));
+      } catch (e) {
+        console.error('Aircraft WS parse error:', e);
+      }
+    };
+    socket.onclose = () => {
+      if (!closed) timer = setTimeout(open, 5000);
+    };
+    socket.onerror = () => socket.close();
+  };
+
+  open();
+  return () => {
+    closed = true;
+    clearTimeout(timer);
+    if (socket) socket.close();
+  };
+}